@@ -0,0 +1,71 @@
+"""Benchmark /api/firms serialization: response_model validation vs pre-encoded catalog fragments.
+
+Usage:
+    python benchmark_serialization.py [--firms 100] [--rounds 200]
+
+The baseline reproduces the original endpoint: every Mongo document goes
+through PropFirm(**doc) and FastAPI then validates and serializes the list
+again for response_model=List[PropFirm]. The fast path joins the per-firm
+JSON fragments the catalog snapshot encodes once per load. Both bodies are
+checked to be byte-identical before timing.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from server import PROP_FIRMS_DATA, PropFirm, catalog
+
+
+def make_documents(count: int) -> List[dict]:
+    documents = []
+    for i in range(count):
+        firm = PropFirm(**PROP_FIRMS_DATA[i % len(PROP_FIRMS_DATA)]).dict()
+        firm["name"] = f"{firm['name']} {i}"
+        documents.append(firm)
+    return documents
+
+
+async def baseline(documents: List[dict], field) -> bytes:
+    firms = [PropFirm(**document) for document in documents]
+    content = await serialize_response(field=field, response_content=firms)
+    return JSONResponse(content).body
+
+
+def fast_path(encoded: List[bytes]) -> bytes:
+    return b"[" + b",".join(encoded) + b"]"
+
+
+async def main(firms: int, rounds: int):
+    documents = make_documents(firms)
+    field = create_response_field(name="Response_get_firms", type_=List[PropFirm])
+    encoded = [catalog.render_json(document) for document in documents]
+
+    assert await baseline(documents, field) == fast_path(encoded), "bodies differ"
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await baseline(documents, field)
+    baseline_seconds = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fast_path(encoded)
+    fast_seconds = (time.perf_counter() - started) / rounds
+
+    print(f"{firms} firms, {rounds} rounds")
+    print(f"  response_model path: {baseline_seconds * 1000:8.3f} ms/request")
+    print(f"  pre-encoded path:    {fast_seconds * 1000:8.3f} ms/request")
+    print(f"  speedup:             {baseline_seconds / fast_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--firms", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.firms, args.rounds))
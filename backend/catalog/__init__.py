@@ -0,0 +1,125 @@
+"""In-memory prop firm catalog served from process memory, with MongoDB as source of truth"""
+from .columns import ColumnStore
+from .compare import comparison_matrix
+from .costs import COST_SORTS, cost_table, funding_costs
+from .countries import COUNTRY_NAMES, ISO_3166, country_code, country_codes
+from .events import CatalogEvents, firm_diffs, sse_message
+from .facets import FACETS, facet_counts, mongo_facet_counts, mongo_facet_pipeline
+from .fees import FEE_SORTS, FeeTable, attach_firms, check_account_sizes, fee_schedule
+from .http_cache import CachedResponse, ResponseCache, conditional_response, render_json
+from .importer import FORMATS as IMPORT_FORMATS
+from .importer import ImportReport, import_firms, iter_file_chunks, iter_lines, rows_from_lines
+from .index import FilterIndex, RangeIndex, TermIndex
+from .indexes import FIRM_INDEXES, IndexSpec, QueryPlan, QueryShape, ensure_indexes, explain_shapes, fee_schedule_query
+from .indexes import firm_query_shapes, inefficient_shapes, plan_problems, suggestion_query
+from .pagination import SCORE_SORT, SORT_FIELDS, Cursor, FirmSort, SortIndexes, decode_cursor, encode_cursor
+from .pagination import mongo_after, mongo_sort
+from .projection import FIELD_PRESETS, mongo_projection, parse_fields
+from .query import FILTER_SPECS, FilterSpec, FirmFilters
+from .ranking import RANKING_CRITERIA, RankingIndex, RankWeights
+from .seed import MongoLock, SeedReport, content_hash, stable_firm_id, sync_firms
+from .reviews import RATING_VALUES, REVIEW_INDEXES, REVIEW_SUMMARY_PROJECTION, add_review, refresh_ratings
+from .reviews import remove_review, review_summary
+from .search import FuzzySearchIndex, SuggestionIndex, fold
+from .similarity import SimilarityIndex, feature_matrix
+from .simulation import ReturnModel, challenge_rules, distinct_rule_sets, simulate_challenges
+from .simulation import simulation_paths, simulation_results
+from .stats import StatisticsAccumulator
+from .store import CatalogSnapshot, CatalogStore, valid_firms, validate_firm
+from .watcher import WATCH_MODES, CatalogWatcher
+
+__all__ = [
+    "COST_SORTS",
+    "COUNTRY_NAMES",
+    "CachedResponse",
+    "CatalogEvents",
+    "CatalogSnapshot",
+    "CatalogStore",
+    "CatalogWatcher",
+    "ColumnStore",
+    "Cursor",
+    "FACETS",
+    "FEE_SORTS",
+    "FIELD_PRESETS",
+    "FILTER_SPECS",
+    "FIRM_INDEXES",
+    "FeeTable",
+    "FilterIndex",
+    "FilterSpec",
+    "FirmFilters",
+    "FirmSort",
+    "FuzzySearchIndex",
+    "IMPORT_FORMATS",
+    "ISO_3166",
+    "ImportReport",
+    "IndexSpec",
+    "MongoLock",
+    "QueryPlan",
+    "QueryShape",
+    "RANKING_CRITERIA",
+    "RATING_VALUES",
+    "REVIEW_INDEXES",
+    "REVIEW_SUMMARY_PROJECTION",
+    "RangeIndex",
+    "RankWeights",
+    "RankingIndex",
+    "ResponseCache",
+    "ReturnModel",
+    "SCORE_SORT",
+    "SORT_FIELDS",
+    "SeedReport",
+    "SimilarityIndex",
+    "SortIndexes",
+    "StatisticsAccumulator",
+    "SuggestionIndex",
+    "TermIndex",
+    "WATCH_MODES",
+    "add_review",
+    "attach_firms",
+    "challenge_rules",
+    "check_account_sizes",
+    "comparison_matrix",
+    "conditional_response",
+    "content_hash",
+    "cost_table",
+    "country_code",
+    "country_codes",
+    "decode_cursor",
+    "distinct_rule_sets",
+    "encode_cursor",
+    "ensure_indexes",
+    "explain_shapes",
+    "facet_counts",
+    "feature_matrix",
+    "fee_schedule",
+    "fee_schedule_query",
+    "firm_diffs",
+    "firm_query_shapes",
+    "fold",
+    "funding_costs",
+    "import_firms",
+    "inefficient_shapes",
+    "iter_file_chunks",
+    "iter_lines",
+    "mongo_after",
+    "mongo_facet_counts",
+    "mongo_facet_pipeline",
+    "mongo_projection",
+    "mongo_sort",
+    "parse_fields",
+    "plan_problems",
+    "refresh_ratings",
+    "remove_review",
+    "render_json",
+    "review_summary",
+    "rows_from_lines",
+    "simulate_challenges",
+    "simulation_paths",
+    "simulation_results",
+    "sse_message",
+    "stable_firm_id",
+    "suggestion_query",
+    "sync_firms",
+    "valid_firms",
+    "validate_firm",
+]
@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def _lowest_fee(firm: Dict[str, Any]) -> float:
+    return min(firm["evaluation_fee"].values(), default=np.nan)
+
+
+def _trader_split(firm: Dict[str, Any]) -> float:
+    return firm["profit_split"][0] if firm["profit_split"] else np.nan
+
+
+def _fee_per_funded_dollar(firm: Dict[str, Any]) -> float:
+    """Cheapest evaluation fee per dollar of funded capital across account sizes"""
+    return min((fee / int(size) for size, fee in firm["evaluation_fee"].items() if int(size) > 0), default=np.nan)
+
+
+# Payouts per month for each payout frequency
+PAYOUTS_PER_MONTH: Dict[str, float] = {"daily": 21.0, "weekly": 4.0, "bi-weekly": 2.0, "monthly": 1.0}
+
+
+# Numeric firm attributes materialized as float64 columns
+COLUMNS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "profit_split": _trader_split,
+    "max_drawdown": lambda firm: firm["max_drawdown"],
+    "daily_drawdown": lambda firm: firm["daily_drawdown"],
+    "profit_target": lambda firm: firm["profit_target"],
+    "min_trading_days": lambda firm: firm["min_trading_days"],
+    "max_trading_days": lambda firm: firm["max_trading_days"],
+    "monthly_fee": lambda firm: firm["monthly_fee"],
+    "min_account_size": lambda firm: firm["min_account_size"],
+    "max_account_size": lambda firm: firm["max_account_size"],
+    "minimum_payout": lambda firm: firm["minimum_payout"],
+    "rating": lambda firm: firm["rating"],
+    "total_reviews": lambda firm: firm["total_reviews"],
+    "lowest_evaluation_fee": _lowest_fee,
+    "fee_per_funded_dollar": _fee_per_funded_dollar,
+    "payouts_per_month": lambda firm: PAYOUTS_PER_MONTH.get(firm["payout_frequency"], np.nan),
+}
+
+
+class ColumnStore:
+    """Column-oriented copy of the numeric firm attributes, one row per catalog position"""
+
+    def __init__(self, ids: List[str], columns: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.columns = columns
+        self.positions = {firm_id: position for position, firm_id in enumerate(ids)}
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]]) -> "ColumnStore":
+        columns = {
+            name: np.fromiter((extract(firm) for firm in firms), dtype=np.float64, count=len(firms))
+            for name, extract in COLUMNS.items()
+        }
+        return cls([firm["id"] for firm in firms], columns)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def take(self, positions: Sequence[int]) -> "ColumnStore":
+        """Row subset in the given order"""
+        positions = np.asarray(positions, dtype=np.int64)
+        return ColumnStore(
+            [self.ids[position] for position in positions],
+            {name: column[positions] for name, column in self.columns.items()},
+        )
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .columns import ColumnStore
+
+# metric -> True when a higher value is better
+COMPARISON_METRICS: Dict[str, bool] = {
+    "fee_per_funded_dollar": False,
+    "profit_split": True,
+    "drawdown_headroom": True,
+    "days_to_pass": False,
+    "rating": True,
+}
+
+
+def comparison_metrics(columns: ColumnStore) -> Dict[str, np.ndarray]:
+    """Derived per-firm metrics used by the comparison matrix"""
+    return {
+        "fee_per_funded_dollar": columns["fee_per_funded_dollar"],
+        "profit_split": columns["profit_split"],
+        # Loss buffer per point of required gain
+        "drawdown_headroom": columns["max_drawdown"] / np.maximum(columns["profit_target"], 1.0),
+        "days_to_pass": columns["min_trading_days"],
+        "rating": columns["rating"],
+    }
+
+
+def comparison_matrix(columns: ColumnStore) -> Dict[str, Any]:
+    """Per-metric winners, normalized scores and deltas plus pairwise wins for N >= 1 firms.
+
+    All metrics are stacked into one (metrics x firms) array and oriented so
+    that higher is always better, which turns every step into a vectorized
+    reduction instead of per-firm Python comparisons. Missing values (NaN)
+    never win and score 0.
+    """
+    names = list(COMPARISON_METRICS)
+    metrics = comparison_metrics(columns)
+    values = np.vstack([metrics[name] for name in names])
+    direction = np.array([1.0 if COMPARISON_METRICS[name] else -1.0 for name in names])[:, None]
+
+    oriented = values * direction
+    ranked = np.where(np.isnan(oriented), -np.inf, oriented)
+    best = np.fmax.reduce(oriented, axis=1, keepdims=True)
+    worst = np.fmin.reduce(oriented, axis=1, keepdims=True)
+    spread = best - worst
+    with np.errstate(divide="ignore", invalid="ignore"):
+        normalized = np.where(spread > 0, (oriented - worst) / spread, 1.0)
+    normalized = np.where(np.isnan(oriented), 0.0, normalized)
+
+    winners = ranked.argmax(axis=1)
+    deltas = values - values[np.arange(len(names)), winners][:, None]
+    pairwise_wins = (ranked[:, :, None] > ranked[:, None, :]).sum(axis=0)
+    overall = normalized.mean(axis=0)
+
+    result_metrics = {}
+    for row, name in enumerate(names):
+        result_metrics[name] = {
+            "higher_is_better": COMPARISON_METRICS[name],
+            "values": _to_json(values[row]),
+            "normalized": _to_json(normalized[row], 4),
+            "delta_to_best": _to_json(deltas[row]),
+            "winner": columns.ids[winners[row]] if not np.isnan(best[row, 0]) else None,
+        }
+
+    return {
+        "firm_ids": list(columns.ids),
+        "metrics": result_metrics,
+        "overall_scores": _to_json(overall, 4),
+        "overall_winner": columns.ids[int(overall.argmax())],
+        "pairwise_wins": pairwise_wins.tolist(),
+    }
+
+
+def _to_json(values: np.ndarray, digits: int = 6) -> List[Any]:
+    """Round and replace NaN with None so the result is valid JSON"""
+    return [round(float(value), digits) if np.isfinite(value) else None for value in values]
@@ -0,0 +1,88 @@
+from typing import Any, Dict
+
+import numpy as np
+
+from .columns import ColumnStore
+from .fees import FeeTable, plain_number
+
+TRADING_DAYS_PER_MONTH = 21
+
+COST_SORTS = ("expected_cost", "cost_per_1k", "expected_days")
+
+
+def funding_costs(sizes: np.ndarray, fees: np.ndarray, monthly_fee: np.ndarray, profit_target: np.ndarray,
+                  min_days: np.ndarray, max_days: np.ndarray, daily_return: float,
+                  pass_rate: float) -> Dict[str, np.ndarray]:
+    """Expected cost of getting funded, one value per (firm, account size) row.
+
+    A trader making ``daily_return`` percent per trading day needs
+    ``profit_target / daily_return`` days, but never fewer than the firm's
+    minimum. When that exceeds the time limit (``max_days`` > 0), an attempt
+    runs out the clock and its pass probability shrinks in proportion to the
+    share of the target reachable in time. Each attempt pays the evaluation
+    fee plus the monthly fee for every month it spans, and the number of
+    attempts is geometric in the per-attempt pass probability.
+    """
+    days_to_target = np.ceil(profit_target / daily_return)
+    limited = (max_days > 0) & (days_to_target > max_days)
+    days = np.where(limited, max_days, np.maximum(days_to_target, min_days))
+    probability = np.where(limited, pass_rate * max_days / np.maximum(days_to_target, 1.0), pass_rate)
+
+    months = np.ceil(days / TRADING_DAYS_PER_MONTH)
+    cost_per_attempt = fees + monthly_fee * months
+    attempts = 1.0 / probability
+    expected_cost = cost_per_attempt * attempts
+    return {
+        "days_per_attempt": days,
+        "pass_probability": probability,
+        "cost_per_attempt": cost_per_attempt,
+        "expected_attempts": attempts,
+        "expected_days": days * attempts,
+        "expected_cost": expected_cost,
+        "cost_per_1k": expected_cost * 1000.0 / sizes,
+    }
+
+
+def cost_table(fees: FeeTable, columns: ColumnStore, rows: np.ndarray, daily_return: float, pass_rate: float,
+               sort: str = "expected_cost", limit: int = 50) -> Dict[str, Any]:
+    """Score the given fee table rows in one vectorized pass and rank them by ``sort``.
+
+    Firm attributes are gathered from the column store by catalog position,
+    so the whole table is a handful of array operations regardless of its
+    size.
+    """
+    positions = fees.positions[rows]
+    costs = funding_costs(
+        fees.sizes[rows].astype(np.float64),
+        fees.fees[rows],
+        columns["monthly_fee"][positions],
+        columns["profit_target"][positions],
+        columns["min_trading_days"][positions],
+        columns["max_trading_days"][positions],
+        daily_return,
+        pass_rate,
+    )
+
+    keys = costs[sort]
+    candidates = np.arange(len(rows))
+    if len(rows) > limit:
+        # Partial sort: only rows up to the ``limit``-th best (ties included) are ordered
+        candidates = candidates[keys <= np.partition(keys, limit - 1)[limit - 1]]
+    order = candidates[np.lexsort((positions[candidates], fees.sizes[rows][candidates], keys[candidates]))][:limit]
+    table = [
+        {
+            "position": int(positions[i]),
+            "account_size": int(fees.sizes[rows[i]]),
+            "evaluation_fee": plain_number(fees.fees[rows[i]]),
+            "monthly_fee": plain_number(columns["monthly_fee"][positions[i]]),
+            "days_per_attempt": int(costs["days_per_attempt"][i]),
+            "pass_probability": round(float(costs["pass_probability"][i]), 4),
+            "expected_attempts": round(float(costs["expected_attempts"][i]), 2),
+            "expected_days": round(float(costs["expected_days"][i]), 1),
+            "cost_per_attempt": round(float(costs["cost_per_attempt"][i]), 2),
+            "expected_cost": round(float(costs["expected_cost"][i]), 2),
+            "cost_per_1k": round(float(costs["cost_per_1k"][i]), 4),
+        }
+        for i in order
+    ]
+    return {"scored": int(len(rows)), "results": table}
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from .http_cache import render_json
+from .store import CatalogSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def firm_diffs(previous: CatalogSnapshot, current: CatalogSnapshot) -> List[Dict[str, Any]]:
+    """Per-firm changes between two snapshots: only the fields that changed for updated firms"""
+    changes: List[Dict[str, Any]] = []
+    for firm_id, firm in current.by_id.items():
+        old = previous.by_id.get(firm_id)
+        if old is None:
+            changes.append({"id": firm_id, "op": "add", "firm": firm})
+        elif old != firm:
+            fields = {name: value for name, value in firm.items() if old.get(name) != value}
+            changes.append({"id": firm_id, "op": "update", "fields": fields})
+    for firm_id in previous.by_id:
+        if firm_id not in current.by_id:
+            changes.append({"id": firm_id, "op": "remove"})
+    return changes
+
+
+def sse_message(event: str, data: bytes, event_id: Optional[str] = None) -> bytes:
+    """One Server-Sent Events message (``data`` is single-line JSON)"""
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\n".encode("utf-8") + b"data: " + data + b"\n\n"
+
+
+class CatalogEvents:
+    """Fan-out of catalog diffs to Server-Sent Events clients.
+
+    Attached to a :class:`CatalogStore` as a listener, so however many
+    clients are connected, the process follows one upstream (its
+    CatalogWatcher) and every diff is computed and encoded once; each client
+    only costs a queue. Event ids are ``<epoch>:<version>``: the epoch is
+    unique to this process, whose catalog versions mean nothing to other
+    workers, so a client reconnecting elsewhere is told to reset instead of
+    being replayed the wrong history.
+    """
+
+    # Signals a subscriber that it has to refetch the full list
+    RESET = object()
+
+    def __init__(self, history: int = 256, queue_size: int = 64):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history)
+        # Every change after this version is in the history
+        self._floor: Optional[int] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def event_id(self, version: int) -> str:
+        return f"{self.epoch}:{version}"
+
+    def on_publish(self, previous: CatalogSnapshot, current: CatalogSnapshot):
+        """CatalogStore listener: turn a new snapshot into one encoded diff shared by every client"""
+        self.version = current.version
+        if self._floor is None or not previous.firms:
+            # Initial load: clients start from the full list, there is nothing to diff against
+            self._floor = current.version
+            return
+        changes = firm_diffs(previous, current)
+        if not changes:
+            return
+        payload = render_json({"version": current.version, "changes": changes})
+        message = sse_message("changes", payload, self.event_id(current.version))
+        if len(self._history) == self._history.maxlen:
+            self._floor = self._history[0][0]
+        self._history.append((current.version, message))
+        for queue in list(self._subscribers):
+            self._offer(queue, message)
+
+    def _offer(self, queue: asyncio.Queue, message: Any):
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A client that cannot keep up skips the backlog and refetches
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(self.RESET)
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> asyncio.Queue:
+        """Queue of the messages for one client, preloaded with what it missed since ``last_event_id``.
+
+        A reset is queued instead when the id is unknown, from another
+        process, or older than the history.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        missed = self._replay(last_event_id) if last_event_id else []
+        if missed is None or len(missed) >= self.queue_size:
+            queue.put_nowait(self.RESET)
+        else:
+            for message in missed:
+                queue.put_nowait(message)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _replay(self, last_event_id: str) -> Optional[List[bytes]]:
+        epoch, _, version = last_event_id.partition(":")
+        if epoch != self.epoch or not version.isdigit() or self._floor is None:
+            return None
+        since = int(version)
+        if since < self._floor or since > self.version:
+            return None
+        return [message for version, message in self._history if version > since]
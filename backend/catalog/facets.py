@@ -0,0 +1,108 @@
+from dataclasses import replace
+from typing import Any, Dict, List, Tuple
+
+from .index import ACCOUNT_SIZE_BUCKETS, FilterIndex
+
+# facet -> (term index it counts, filters on the same attribute)
+# A facet is counted with its own filters lifted, so a selected option still
+# shows how many firms every alternative would return.
+FACETS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "trading_platforms": ("trading_platforms", ("platform",)),
+    "instruments": ("instruments", ("instrument",)),
+    "payout_frequency": ("payout_frequency", ("payout_frequency",)),
+    "news_trading": ("news_trading", ("news_trading",)),
+    "expert_advisors": ("expert_advisors", ("expert_advisors",)),
+    "scaling_plan": ("scaling_plan", ("scaling_plan",)),
+    "weekend_holding": ("weekend_holding", ("weekend_holding",)),
+    "copy_trading": ("copy_trading", ("copy_trading",)),
+    "account_size": ("account_size_bucket", ()),
+}
+
+BOOLEAN_FACETS = ("news_trading", "expert_advisors", "scaling_plan", "weekend_holding", "copy_trading")
+# Facets over array fields: a firm counts once for each of its values
+LIST_FACETS = ("trading_platforms", "instruments")
+
+
+def _bucket(bucket: int) -> Dict[str, Any]:
+    bounds = (0,) + ACCOUNT_SIZE_BUCKETS
+    return {
+        "value": bucket,
+        "min": bounds[bucket] + 1 if bucket else 0,
+        "max": ACCOUNT_SIZE_BUCKETS[bucket] if bucket < len(ACCOUNT_SIZE_BUCKETS) else None,
+    }
+
+
+def _facet_values(facet: str, counts: Dict[Any, int]) -> List[Dict[str, Any]]:
+    """The options of one facet with their counts; ``counts`` holds every value present in the catalog"""
+    if facet in BOOLEAN_FACETS:
+        return [{"value": value, "count": counts.get(value, 0)} for value in (True, False)]
+    if facet == "account_size":
+        return [{**_bucket(bucket), "count": counts.get(bucket, 0)} for bucket in range(len(ACCOUNT_SIZE_BUCKETS) + 1)]
+    values = [{"value": value, "count": count} for value, count in counts.items()]
+    values.sort(key=lambda item: (-item["count"], str(item["value"])))
+    return values
+
+
+def facet_counts(index: FilterIndex, filters) -> Dict[str, Any]:
+    """Counts per facet value for a ``FirmFilters`` state, from the bitmap index.
+
+    Each count is one AND plus a popcount over precomputed posting lists;
+    the filters are resolved once per distinct set of lifted filters, not
+    once per facet.
+    """
+    matched = index.resolve(filters)
+    resolved = {(): matched}
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+
+    for facet, (term, own) in FACETS.items():
+        lifted = tuple(name for name in own if getattr(filters, name) is not None)
+        if lifted not in resolved:
+            resolved[lifted] = index.resolve(replace(filters, **dict.fromkeys(lifted)))
+        bits = resolved[lifted]
+        counts = {value: (bits & posting).bit_count() for value, posting in index.terms[term].postings.items()}
+        facets[facet] = _facet_values(facet, counts)
+
+    return {"total": matched.bit_count(), "facets": facets}
+
+
+def _bucket_expression(field: str) -> Dict[str, Any]:
+    """Aggregation expression of account_size_bucket()"""
+    branches = [{"case": {"$lte": [field, bound]}, "then": bucket} for bucket, bound in enumerate(ACCOUNT_SIZE_BUCKETS)]
+    return {"$switch": {"branches": branches, "default": len(ACCOUNT_SIZE_BUCKETS)}}
+
+
+def mongo_facet_pipeline(filters) -> List[Dict[str, Any]]:
+    """One ``$facet`` aggregation counting what facet_counts() does, for when the catalog is not loaded.
+
+    Every facet runs its own ``$match`` with its own filters lifted. Value
+    lists also collect every value in the collection, so options that the
+    filters exclude are listed with a count of 0 as in the catalog.
+    """
+    stages: Dict[str, List[Dict[str, Any]]] = {"total": [{"$match": filters.to_mongo()}, {"$count": "count"}]}
+    for facet, (term, own) in FACETS.items():
+        match = {"$match": replace(filters, **dict.fromkeys(own)).to_mongo()}
+        if facet == "account_size":
+            stages[facet] = [
+                match,
+                {"$unwind": "$account_sizes"},
+                # A firm counts once per bucket, however many of its sizes fall in it
+                {"$group": {"_id": {"firm": "$_id", "value": _bucket_expression("$account_sizes")}}},
+                {"$group": {"_id": "$_id.value", "count": {"$sum": 1}}},
+            ]
+            continue
+        unwind = [{"$unwind": f"${term}"}] if facet in LIST_FACETS else []
+        stages[facet] = [match, *unwind, {"$group": {"_id": f"${term}", "count": {"$sum": 1}}}]
+        if facet not in BOOLEAN_FACETS:
+            stages[f"{facet}_values"] = [*unwind, {"$group": {"_id": f"${term}"}}]
+    return [{"$facet": stages}]
+
+
+def mongo_facet_counts(result: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """The output of mongo_facet_pipeline() shaped like facet_counts()"""
+    facets: Dict[str, List[Dict[str, Any]]] = {}
+    for facet in FACETS:
+        counts = {value["_id"]: 0 for value in result.get(f"{facet}_values", [])}
+        counts.update({value["_id"]: value["count"] for value in result[facet]})
+        facets[facet] = _facet_values(facet, counts)
+    total = result["total"][0]["count"] if result["total"] else 0
+    return {"total": total, "facets": facets}
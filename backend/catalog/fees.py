@@ -0,0 +1,121 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+FEE_SORTS = ("fee", "fee_per_1k")
+
+
+def check_account_sizes(evaluation_fee: Dict[str, Any]):
+    """Raise ValueError unless every ``evaluation_fee`` key is a positive whole account size"""
+    for size in evaluation_fee:
+        try:
+            value = int(size)
+        except (TypeError, ValueError):
+            raise ValueError(f"evaluation_fee: account size {size!r} is not a number")
+        if value <= 0:
+            raise ValueError(f"evaluation_fee: account size {size!r} must be positive")
+
+
+def fee_schedule(firm: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A firm's ``evaluation_fee`` map as rows sorted by account size"""
+    rows = []
+    for size, fee in firm["evaluation_fee"].items():
+        size = int(size)
+        if size > 0:
+            rows.append({"account_size": size, "fee": fee, "fee_per_1k": round(fee * 1000 / size, 4)})
+    return sorted(rows, key=lambda row: row["account_size"])
+
+
+class FeeTable:
+    """Every (firm, account size, fee) row of the catalog in flat arrays sorted by account size.
+
+    An account size range is two binary searches; the fee cap and any firm
+    filter are vectorized masks over that slice only, and the cheapest rows
+    come out of a partial sort, so a query touches the matching sizes rather
+    than the whole table.
+    """
+
+    def __init__(self, positions: np.ndarray, sizes: np.ndarray, fees: np.ndarray):
+        order = np.lexsort((fees, sizes))
+        self.positions = positions[order]
+        self.sizes = sizes[order]
+        self.fees = fees[order]
+        self.fee_per_1k = self.fees * 1000.0 / self.sizes
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]]) -> "FeeTable":
+        positions, sizes, fees = [], [], []
+        for position, firm in enumerate(firms):
+            for row in fee_schedule(firm):
+                positions.append(position)
+                sizes.append(row["account_size"])
+                fees.append(row["fee"])
+        return cls(
+            np.array(positions, dtype=np.int64),
+            np.array(sizes, dtype=np.int64),
+            np.array(fees, dtype=np.float64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def select(self, min_size: Optional[int] = None, max_size: Optional[int] = None,
+               max_fee: Optional[float] = None, members: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row numbers for accounts in ``[min_size, max_size]`` costing at most ``max_fee``, in table order.
+
+        ``members`` is a boolean mask over catalog positions (e.g. from the
+        filter index).
+        """
+        lo = int(np.searchsorted(self.sizes, min_size, "left")) if min_size is not None else 0
+        hi = int(np.searchsorted(self.sizes, max_size, "right")) if max_size is not None else len(self.sizes)
+        rows = np.arange(lo, hi)
+        if max_fee is not None:
+            rows = rows[self.fees[lo:hi] <= max_fee]
+        if members is not None:
+            rows = rows[members[self.positions[rows]]]
+        return rows
+
+    def cheapest(self, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 max_fee: Optional[float] = None, members: Optional[np.ndarray] = None,
+                 sort: str = "fee", limit: int = 20, one_per_firm: bool = False) -> List[Dict[str, Any]]:
+        """Cheapest :meth:`select` rows, ordered by ``sort`` ("fee" or "fee_per_1k") then account size.
+
+        ``one_per_firm`` keeps each firm's cheapest row.
+        """
+        rows = self.select(min_size, max_size, max_fee, members)
+        keys = (self.fees if sort == "fee" else self.fee_per_1k)[rows]
+        if one_per_firm:
+            # Sort everything, then keep the first (cheapest) row of each firm
+            ranked = rows[np.lexsort((self.positions[rows], self.sizes[rows], keys))]
+            _, first = np.unique(self.positions[ranked], return_index=True)
+            ranked = ranked[np.sort(first)][:limit]
+        else:
+            if len(rows) > limit:
+                # Partial sort: only rows up to the ``limit``-th cheapest (ties included) are ordered
+                kth = np.partition(keys, limit - 1)[limit - 1]
+                cut = keys <= kth
+                rows, keys = rows[cut], keys[cut]
+            ranked = rows[np.lexsort((self.positions[rows], self.sizes[rows], keys))][:limit]
+
+        return [
+            {
+                "position": int(self.positions[row]),
+                "account_size": int(self.sizes[row]),
+                "fee": plain_number(self.fees[row]),
+                "fee_per_1k": round(float(self.fee_per_1k[row]), 4),
+            }
+            for row in ranked
+        ]
+
+
+def attach_firms(rows: List[Dict[str, Any]], firms: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Replace the catalog position of each :meth:`FeeTable.cheapest` row with the firm's id and name"""
+    for row in rows:
+        firm = firms[row.pop("position")]
+        row["firm_id"], row["firm_name"] = firm["id"], firm["name"]
+    return rows
+
+
+def plain_number(value: float) -> Any:
+    """A float64 array value as a JSON number: int when whole (fees are mostly whole amounts)"""
+    return int(value) if float(value).is_integer() else float(value)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def render_json(payload: Any) -> bytes:
+    """Encode a payload exactly like FastAPI's default JSONResponse"""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    # Extra response headers that belong to the representation (e.g. the next page cursor)
+    headers: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def for_body(cls, body: bytes, headers: Optional[Dict[str, str]] = None) -> "CachedResponse":
+        # Strong validator: derived from the exact bytes and headers sent
+        items = tuple(sorted((headers or {}).items()))
+        digest = hashlib.blake2b(body, digest_size=12)
+        for name, value in items:
+            digest.update(f"\n{name}: {value}".encode("utf-8"))
+        return cls(body, '"' + digest.hexdigest() + '"', items)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_response(request: Request, entry: CachedResponse, cache_control: str) -> Response:
+    """200 with the cached body, or 304 when the client already holds it"""
+    headers = {**dict(entry.headers), "ETag": entry.etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """LRU of encoded response bodies for one catalog version.
+
+    Keys are normalized request parameters; entries from an older catalog
+    version are dropped as soon as a newer version is seen.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._version: Optional[int] = None
+
+    def _sync(self, version: int):
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        self._sync(version)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Hashable, version: int, body: bytes,
+            headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        self._sync(version)
+        entry = CachedResponse.for_body(body, headers)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
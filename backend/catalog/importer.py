@@ -0,0 +1,282 @@
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union, get_origin
+
+from .fees import check_account_sizes
+from .seed import content_hash, stable_firm_id, upsert_operation, write_firms
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("ndjson", "csv")
+
+# (row number, parsed row or parse error)
+Row = Tuple[int, Union[Dict[str, Any], Exception]]
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Split a byte stream into text lines without buffering more than one line"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def iter_file_chunks(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+async def parse_ndjson(lines: AsyncIterable[str]) -> AsyncIterator[Row]:
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, e
+
+
+def csv_cell_parser(model) -> Callable[[str, str], Any]:
+    """Build a parser turning CSV cells into values the model can validate.
+
+    Empty cells are null, cells starting with ``[`` or ``{`` are JSON, list
+    fields are ``|`` separated and dict fields are ``key:value|key:value``.
+    """
+    kinds = {name: get_origin(info.annotation) for name, info in model.model_fields.items()}
+
+    def parse(name: str, cell: str) -> Any:
+        cell = cell.strip()
+        if cell == "":
+            return None
+        if cell[0] in "[{":
+            return json.loads(cell)
+        if kinds.get(name) is list:
+            return [item.strip() for item in cell.split("|") if item.strip()]
+        if kinds.get(name) is dict:
+            return dict(item.split(":", 1) for item in cell.split("|") if item.strip())
+        return cell
+
+    return parse
+
+
+async def parse_csv(lines: AsyncIterable[str], model) -> AsyncIterator[Row]:
+    parse_cell = csv_cell_parser(model)
+    # Empty cells of fields with a default are left out so the default applies
+    defaulted = {name for name, info in model.model_fields.items() if not info.is_required()}
+    header: Optional[List[str]] = None
+    record: List[str] = []
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        record.append(line)
+        # A quoted field may span lines; a record is complete once its quotes balance
+        if sum(part.count('"') for part in record) % 2:
+            continue
+        text = "\n".join(record)
+        record = []
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader(io.StringIO(text)))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            yield row_number, {
+                name: parse_cell(name, value)
+                for name, value in zip(header, values)
+                if value.strip() != "" or name not in defaulted
+            }
+        except Exception as e:
+            yield row_number, e
+    if record:
+        yield row_number, ValueError("Unterminated quoted field at end of file")
+
+
+def describe_error(error: Exception) -> str:
+    """One-line description of a parse or validation error"""
+    if hasattr(error, "errors"):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+        )
+    return str(error)
+
+
+def describe_write_error(error: Dict[str, Any]) -> str:
+    """One-line description of a MongoDB write error"""
+    if error.get("code") == 11000:
+        conflict = error.get("keyValue") or "a unique field"
+        return f"Conflicts with a stored firm on {conflict}"
+    return error.get("errmsg") or "Write failed"
+
+
+def _validate_batch(rows: List[Tuple[int, Dict[str, Any]]],
+                    model) -> Tuple[List[Tuple[int, Dict[str, Any], str]], List[Dict[str, Any]]]:
+    """``(row number, firm, content hash)`` of the valid rows and an error per invalid row.
+
+    The hash covers the derived fields, so computing it here also rejects
+    rows whose values they cannot be derived from. A row reusing the id of
+    another firm of the batch is invalid too.
+    """
+    firms, errors = [], []
+    names_by_id: Dict[str, str] = {}
+    for row_number, data in rows:
+        try:
+            firm = model(**data).dict()
+            check_account_sizes(firm["evaluation_fee"])
+            firm["id"] = data.get("id") or stable_firm_id(firm["name"])
+            owner = names_by_id.setdefault(firm["id"], firm["name"])
+            if owner != firm["name"]:
+                raise ValueError(f"id {firm['id']} is already used by '{owner}' in this import")
+            firms.append((row_number, firm, content_hash(firm)))
+        except Exception as e:
+            errors.append({"row": row_number, "error": describe_error(e)})
+    return firms, errors
+
+
+async def import_firms(collection, rows: AsyncIterable[Row], model, batch_size: int = 500,
+                       max_errors: int = 100) -> ImportReport:
+    """Validate and upsert a stream of firm rows in fixed-size batches.
+
+    At most one batch is held in memory. Validation runs in a worker thread
+    so the event loop keeps serving requests, and each batch costs one read
+    of the stored names, ids and content hashes plus one unordered
+    bulk_write of the firms that actually changed. Rows the write rejects
+    (e.g. a duplicate key) are reported like invalid rows and the rest of
+    the batch is still written.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+
+    def record_error(error: Dict[str, Any]):
+        report.failed += 1
+        if len(report.errors) < max_errors:
+            report.errors.append(error)
+
+    async def flush(batch: List[Tuple[int, Dict[str, Any]]]):
+        firms, errors = await loop.run_in_executor(None, _validate_batch, batch, model)
+        for error in errors:
+            record_error(error)
+        if not firms:
+            return
+        names = [firm["name"] for _, firm, _ in firms]
+        ids = [firm["id"] for _, firm, _ in firms]
+        cursor = collection.find(
+            {"$or": [{"name": {"$in": names}}, {"id": {"$in": ids}}]},
+            {"_id": 0, "name": 1, "id": 1, "content_hash": 1},
+        )
+        existing, owners = {}, {}
+        async for document in cursor:
+            existing[document["name"]] = document.get("content_hash")
+            owners[document.get("id")] = document["name"]
+        now = datetime.utcnow()
+        operations, updated = [], []
+        # (row number, inserts a new firm) per operation
+        sources: List[Tuple[int, bool]] = []
+        for row_number, firm, digest in firms:
+            inserting = firm["name"] not in existing
+            if inserting and owners.get(firm["id"], firm["name"]) != firm["name"]:
+                # Ids are only written on insert; a stored firm already holds this one
+                record_error({"row": row_number, "error": f"id {firm['id']} already belongs to '{owners[firm['id']]}'"})
+                continue
+            if not inserting and existing[firm["name"]] == digest:
+                report.unchanged += 1
+                continue
+            if not inserting:
+                updated.append(firm["name"])
+            existing[firm["name"]] = digest
+            owners[firm["id"]] = firm["name"]
+            operations.append(upsert_operation(firm, digest, now))
+            sources.append((row_number, inserting))
+        if not operations:
+            return
+
+        write_errors = {error["index"]: error for error in await write_firms(collection, operations, updated)}
+        for index, (row_number, inserting) in enumerate(sources):
+            if index in write_errors:
+                record_error({"row": row_number, "error": describe_write_error(write_errors[index])})
+            elif inserting:
+                report.inserted += 1
+            else:
+                report.updated += 1
+
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    async for row_number, data in rows:
+        report.rows += 1
+        if isinstance(data, Exception):
+            record_error({"row": row_number, "error": describe_error(data)})
+            continue
+        if not isinstance(data, dict):
+            record_error({"row": row_number, "error": "Row is not an object"})
+            continue
+        batch.append((row_number, data))
+        if len(batch) >= batch_size:
+            await flush(batch)
+            batch = []
+    if batch:
+        await flush(batch)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        f"Imported {report.rows} rows in {report.elapsed_seconds:.2f}s ({report.rows_per_second} rows/s): "
+        f"{report.inserted} inserted, {report.updated} updated, {report.unchanged} unchanged, {report.failed} failed"
+    )
+    return report
+
+
+def rows_from_lines(lines: AsyncIterable[str], file_format: str, model) -> AsyncIterator[Row]:
+    if file_format == "ndjson":
+        return parse_ndjson(lines)
+    if file_format == "csv":
+        return parse_csv(lines, model)
+    raise ValueError(f"Unsupported import format: {file_format}")
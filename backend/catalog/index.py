@@ -0,0 +1,226 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .countries import country_codes
+
+# Bitsets are plain Python ints: bit ``i`` is set when the firm at position
+# ``i`` of the catalog snapshot belongs to the set. Intersections and unions
+# are single big-int operations, which stay in the microsecond range even
+# for tens of thousands of records.
+
+_BIT_OFFSETS = np.arange(8)
+
+def bitset_from_positions(positions: Sequence[int], size: int) -> int:
+    """Pack catalog positions into a bitset"""
+    mask = np.zeros(size, dtype=bool)
+    mask[list(positions)] = True
+    return int.from_bytes(np.packbits(mask, bitorder="little").tobytes(), "little")
+
+
+def positions_from_bitset(bits: int, size: int, limit: Optional[int] = None) -> List[int]:
+    """Positions of the set bits in ascending order, up to ``limit``"""
+    if not bits:
+        return []
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    occupied = np.flatnonzero(raw != 0)
+    if limit is not None:
+        # Every occupied byte holds at least one member
+        occupied = occupied[:limit]
+    hits = np.unpackbits(raw[occupied][:, None], axis=1, bitorder="little") != 0
+    positions = (occupied[:, None] * 8 + _BIT_OFFSETS)[hits]
+    if limit is not None:
+        positions = positions[:limit]
+    return positions.tolist()
+
+
+def mask_from_bitset(bits: int, size: int) -> np.ndarray:
+    """Boolean membership array of length ``size``"""
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, count=size, bitorder="little").astype(bool)
+
+
+# Upper bounds of the account size facet buckets; the last bucket is open ended
+ACCOUNT_SIZE_BUCKETS = (10_000, 25_000, 50_000, 100_000, 200_000)
+
+
+def account_size_bucket(size: int) -> int:
+    """Index of the bucket holding ``size`` (``len(ACCOUNT_SIZE_BUCKETS)`` above the last bound)"""
+    return bisect_left(ACCOUNT_SIZE_BUCKETS, size)
+
+
+# Attributes indexed as posting lists (value -> bitset)
+TERM_FIELDS: Dict[str, Callable[[Dict[str, Any]], Iterable[Any]]] = {
+    "trading_platforms": lambda firm: firm["trading_platforms"],
+    "instruments": lambda firm: firm["instruments"],
+    "payout_frequency": lambda firm: [firm["payout_frequency"]],
+    "news_trading": lambda firm: [firm["news_trading"]],
+    "expert_advisors": lambda firm: [firm["expert_advisors"]],
+    "scaling_plan": lambda firm: [firm["scaling_plan"]],
+    "weekend_holding": lambda firm: [firm["weekend_holding"]],
+    "copy_trading": lambda firm: [firm["copy_trading"]],
+    "restricted_country_codes": lambda firm: country_codes(firm["countries_restricted"]),
+    "account_size_bucket": lambda firm: {account_size_bucket(size) for size in firm["account_sizes"]},
+}
+
+# Attributes indexed as sorted arrays for range predicates
+RANGE_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "min_account_size": lambda firm: firm["min_account_size"],
+    "max_account_size": lambda firm: firm["max_account_size"],
+    "profit_split": lambda firm: firm["profit_split"][0] if firm["profit_split"] else None,
+    "rating": lambda firm: firm["rating"],
+    "monthly_fee": lambda firm: firm["monthly_fee"],
+    "lowest_evaluation_fee": lambda firm: min(firm["evaluation_fee"].values(), default=None),
+}
+
+
+class TermIndex:
+    """Posting lists mapping each distinct value to the bitset of firms holding it"""
+
+    def __init__(self, postings: Dict[Any, int]):
+        self.postings = postings
+        self.counts = {value: bits.bit_count() for value, bits in postings.items()}
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]], extract: Callable[[Dict[str, Any]], Iterable[Any]]) -> "TermIndex":
+        positions: Dict[Any, List[int]] = {}
+        for position, firm in enumerate(firms):
+            for value in extract(firm):
+                positions.setdefault(value, []).append(position)
+        return cls({value: bitset_from_positions(members, len(firms)) for value, members in positions.items()})
+
+    def eq(self, value: Any) -> int:
+        return self.postings.get(value, 0)
+
+    def count(self, value: Any) -> int:
+        return self.counts.get(value, 0)
+
+    def any_of(self, values: Iterable[Any]) -> int:
+        bits = 0
+        for value in values:
+            bits |= self.postings.get(value, 0)
+        return bits
+
+
+class RangeIndex:
+    """Sorted distinct values with per-value bitsets for range predicates.
+
+    Every ``CHECKPOINT`` keys the suffix union (all firms with a value >= that
+    key) is precomputed, so a range lookup is a binary search plus at most
+    ``CHECKPOINT - 1`` unions regardless of the attribute's cardinality.
+    """
+
+    CHECKPOINT = 32
+
+    def __init__(self, keys: List[Any], postings: List[int]):
+        self.keys = keys
+        self.postings = postings
+        self._suffix: Dict[int, int] = {}
+        # _suffix_counts[i]: number of firms with a value >= keys[i]
+        self._suffix_counts = [0] * (len(keys) + 1)
+        running = 0
+        for i in range(len(keys) - 1, -1, -1):
+            running |= postings[i]
+            self._suffix_counts[i] = self._suffix_counts[i + 1] + postings[i].bit_count()
+            if i % self.CHECKPOINT == 0:
+                self._suffix[i] = running
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]], extract: Callable[[Dict[str, Any]], Any]) -> "RangeIndex":
+        by_value: Dict[Any, List[int]] = {}
+        for position, firm in enumerate(firms):
+            value = extract(firm)
+            if value is not None:
+                by_value.setdefault(value, []).append(position)
+        keys = sorted(by_value)
+        return cls(keys, [bitset_from_positions(by_value[key], len(firms)) for key in keys])
+
+    def _from(self, i: int) -> int:
+        """Union of the postings for keys[i:]"""
+        if i >= len(self.keys):
+            return 0
+        checkpoint = -(-i // self.CHECKPOINT) * self.CHECKPOINT
+        bits = self._suffix.get(checkpoint, 0)
+        for j in range(i, min(checkpoint, len(self.keys))):
+            bits |= self.postings[j]
+        return bits
+
+    def ge(self, value: Any) -> int:
+        return self._from(bisect_left(self.keys, value))
+
+    def gt(self, value: Any) -> int:
+        return self._from(bisect_right(self.keys, value))
+
+    def le(self, value: Any) -> int:
+        return self._from(0) & ~self._from(bisect_right(self.keys, value))
+
+    def lt(self, value: Any) -> int:
+        return self._from(0) & ~self._from(bisect_left(self.keys, value))
+
+    def count_ge(self, value: Any) -> int:
+        return self._suffix_counts[bisect_left(self.keys, value)]
+
+    def count_le(self, value: Any) -> int:
+        return self._suffix_counts[0] - self._suffix_counts[bisect_right(self.keys, value)]
+
+
+class FilterIndex:
+    """Bitmap index over a catalog snapshot for the /api/firms filters"""
+
+    def __init__(self, size: int, terms: Dict[str, TermIndex], ranges: Dict[str, RangeIndex]):
+        self.size = size
+        self.all_bits = (1 << size) - 1
+        self.terms = terms
+        self.ranges = ranges
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]]) -> "FilterIndex":
+        terms = {name: TermIndex.build(firms, extract) for name, extract in TERM_FIELDS.items()}
+        ranges = {name: RangeIndex.build(firms, extract) for name, extract in RANGE_FIELDS.items()}
+        return cls(len(firms), terms, ranges)
+
+    def predicate_bits(self, attribute: str, op: str, value: Any) -> int:
+        if op == "eq":
+            return self.terms[attribute].eq(value)
+        if op == "ne":
+            return self.all_bits & ~self.terms[attribute].eq(value)
+        if op == "ge":
+            return self.ranges[attribute].ge(value)
+        if op == "le":
+            return self.ranges[attribute].le(value)
+        raise ValueError(f"Unsupported filter operator: {op}")
+
+    def estimate(self, attribute: str, op: str, value: Any) -> int:
+        """Exact number of firms a single predicate keeps, from precomputed counts"""
+        if op == "eq":
+            return self.terms[attribute].count(value)
+        if op == "ne":
+            return self.size - self.terms[attribute].count(value)
+        if op == "ge":
+            return self.ranges[attribute].count_ge(value)
+        return self.ranges[attribute].count_le(value)
+
+    def plan(self, filters) -> List[Tuple[str, str, Any]]:
+        """The predicates of a ``FirmFilters`` instance, most selective first"""
+        return sorted(filters.predicates(), key=lambda predicate: self.estimate(*predicate))
+
+    def resolve(self, filters) -> int:
+        """Intersect the bitsets selected by a ``FirmFilters`` instance.
+
+        Predicates run most selective first, so an empty intersection is
+        usually reached after the first lookup and the rest are skipped.
+        """
+        bits = self.all_bits
+        for predicate in self.plan(filters):
+            bits &= self.predicate_bits(*predicate)
+            if not bits:
+                break
+        return bits
+
+    def members(self, bits: int, limit: Optional[int] = None) -> List[int]:
+        """Positions of the set bits in ascending order, up to ``limit``"""
+        return positions_from_bitset(bits, self.size, limit)
+
+    def mask(self, bits: int) -> np.ndarray:
+        return mask_from_bitset(bits, self.size)
@@ -0,0 +1,238 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+from .pagination import SORT_FIELDS, FirmSort, mongo_sort
+from .query import FirmFilters
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    name: str
+    keys: Tuple[Tuple[str, Any], ...]
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+# Every index the prop_firms collection needs; anything not listed here is left alone
+FIRM_INDEXES: List[IndexSpec] = [
+    # /firms/{id}, /firms/compare and the catalog lookups
+    IndexSpec("id_unique", (("id", ASCENDING),), {"unique": True}),
+    # Seed sync and the importer upsert by name
+    IndexSpec("name_unique", (("name", ASCENDING),), {"unique": True}),
+    # Keyset pagination: one (field, _id) index per sort, walked in either direction
+    *(
+        IndexSpec(f"sort_{name}", ((mongo_field, ASCENDING), ("_id", ASCENDING)))
+        for name, (_, mongo_field, _) in SORT_FIELDS.items()
+    ),
+    # /firms filters not already led by a sort index
+    IndexSpec("platform_rating", (("trading_platforms", ASCENDING), ("rating", DESCENDING))),
+    IndexSpec("payout_frequency_rating", (("payout_frequency", ASCENDING), ("rating", DESCENDING))),
+    IndexSpec("instruments_rating", (("instruments", ASCENDING), ("rating", DESCENDING))),
+    IndexSpec("max_account_size", (("max_account_size", ASCENDING),)),
+    IndexSpec("monthly_fee", (("monthly_fee", ASCENDING),)),
+    # /fees/cheapest fallback: $elemMatch on account size and fee
+    IndexSpec("fee_schedule", (("fee_schedule.account_size", ASCENDING), ("fee_schedule.fee", ASCENDING))),
+    IndexSpec("news_ea_rating", (("news_trading", ASCENDING), ("expert_advisors", ASCENDING), ("rating", DESCENDING))),
+    IndexSpec("expert_advisors_rating", (("expert_advisors", ASCENDING), ("rating", DESCENDING))),
+    # Yes/no rule filters, with the default _id page order in the same index walk
+    IndexSpec("scaling_plan_id", (("scaling_plan", ASCENDING), ("_id", ASCENDING))),
+    IndexSpec("weekend_holding_id", (("weekend_holding", ASCENDING), ("_id", ASCENDING))),
+    IndexSpec("copy_trading_id", (("copy_trading", ASCENDING), ("_id", ASCENDING))),
+    # max_evaluation_fee is served by sort_evaluation_fee (lowest_evaluation_fee, _id); country has no index,
+    # see the filter_country query shape
+    # Catalog watcher polling when change streams are unavailable: every (_id, updated_at) pair, covered
+    IndexSpec("poll_updated_at", (("updated_at", DESCENDING), ("_id", ASCENDING))),
+    # Full text fallback for search and suggestions while the catalog is not loaded
+    IndexSpec(
+        "firm_text",
+        (("name", TEXT), ("description", TEXT), ("headquarters", TEXT), ("pros", TEXT), ("cons", TEXT)),
+        {"weights": {"name": 10, "headquarters": 3, "pros": 2, "cons": 1, "description": 1},
+         "default_language": "spanish"},
+    ),
+]
+
+
+async def ensure_indexes(collection, specs: Sequence[IndexSpec] = FIRM_INDEXES) -> List[str]:
+    """Create missing indexes; existing identical ones are a no-op.
+
+    An index that cannot be built (e.g. duplicate values under a unique
+    index, or a same-named index with other options) is logged and skipped
+    so it never blocks startup. Returns the names that are in place.
+    """
+    created = []
+    for spec in specs:
+        try:
+            await collection.create_index(list(spec.keys), name=spec.name, **spec.options)
+            created.append(spec.name)
+        except OperationFailure as e:
+            logger.error(f"Could not create index {spec.name} on {collection.name}: {e}")
+    return created
+
+
+def suggestion_query(q: str) -> Dict[str, Any]:
+    """Typeahead fallback: name substrings (scanning the name index) or full text matches"""
+    return {"$or": [{"name": {"$regex": re.escape(q), "$options": "i"}}, {"$text": {"$search": q}}]}
+
+
+def fee_schedule_query(min_size: Optional[int], max_size: Optional[int], max_fee: Optional[float]) -> Dict[str, Any]:
+    """Firms with at least one challenge in the size range and under the fee cap"""
+    row: Dict[str, Any] = {}
+    if min_size is not None or max_size is not None:
+        row["account_size"] = {
+            operator: value for operator, value in (("$gte", min_size), ("$lte", max_size)) if value is not None
+        }
+    if max_fee is not None:
+        row["fee"] = {"$lte": max_fee}
+    return {"fee_schedule": {"$elemMatch": row}} if row else {}
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """A query as issued by an endpoint, with representative values"""
+    name: str
+    filter: Dict[str, Any]
+    sort: Optional[List[Tuple[str, int]]] = None
+    # Set when reading the whole collection is the intended plan, saying why
+    accepted_scan: Optional[str] = None
+
+
+def firm_query_shapes() -> List[QueryShape]:
+    """The MongoDB queries behind every read endpoint.
+
+    Filters are explained without the page order: what is checked is that
+    an index narrows the filter, and under an ``_id`` sort the planner could
+    always walk ``_id_`` instead of ever reporting a scan. Orders have their
+    own unfiltered shapes.
+    """
+    shapes = [
+        QueryShape("get_firm", {"id": "00000000-0000-0000-0000-000000000000"}),
+        QueryShape("compare_firms", {"id": {"$in": ["a", "b", "c", "d"]}}),
+        QueryShape("seed_sync_by_name", {"name": {"$in": ["FTMO", "FundedNext"]}}),
+        QueryShape("list_firms", {}, mongo_sort(FirmSort())),
+        QueryShape("search_text", {"$text": {"$search": "metatrader"}}),
+        QueryShape("suggestions", suggestion_query("ftm")),
+        QueryShape("cheapest_challenges", fee_schedule_query(50000, 100000, 400)),
+        QueryShape("watcher_poll", {}, [("updated_at", DESCENDING), ("_id", ASCENDING)]),
+    ]
+    filters = {
+        "min_account_size": FirmFilters(min_account_size=10000),
+        "max_account_size": FirmFilters(max_account_size=100000),
+        "platform": FirmFilters(platform="MetaTrader 5"),
+        "min_profit_split": FirmFilters(min_profit_split=80),
+        "payout_frequency": FirmFilters(payout_frequency="monthly"),
+        "news_trading": FirmFilters(news_trading=True),
+        "expert_advisors": FirmFilters(expert_advisors=True),
+        "min_rating": FirmFilters(min_rating=4.5),
+        "instrument": FirmFilters(instrument="Forex"),
+        "scaling_plan": FirmFilters(scaling_plan=True),
+        "weekend_holding": FirmFilters(weekend_holding=True),
+        "copy_trading": FirmFilters(copy_trading=True),
+        "max_monthly_fee": FirmFilters(max_monthly_fee=0),
+        "max_evaluation_fee": FirmFilters(max_evaluation_fee=300),
+    }
+    for name, filters in filters.items():
+        shapes.append(QueryShape(f"filter_{name}", filters.to_mongo()))
+    # Keeps the firms whose restriction list lacks the country: nearly all of them, and $ne on an
+    # array cannot be narrowed by an index, so reading every firm is about as cheap as any plan
+    shapes.append(QueryShape(
+        "filter_country", FirmFilters(country="USA").to_mongo(), accepted_scan="negation matching nearly every firm",
+    ))
+    for name in SORT_FIELDS:
+        for descending in (False, True):
+            sort = FirmSort(name, descending)
+            shapes.append(QueryShape(f"sort_{sort.token}", {}, mongo_sort(sort)))
+    return shapes
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """Winning plan and execution statistics of one explained query shape"""
+    stages: FrozenSet[str]
+    indexes: FrozenSet[str]
+    returned: int
+    keys_examined: int
+    docs_examined: int
+
+
+def plan_stages(plan: Any) -> Set[str]:
+    """Every stage name in an explain() plan tree"""
+    stages = set()
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.add(plan["stage"])
+        for value in plan.values():
+            stages |= plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            stages |= plan_stages(item)
+    return stages
+
+
+def plan_indexes(plan: Any) -> Set[str]:
+    """Names of the indexes scanned anywhere in an explain() plan tree"""
+    indexes = set()
+    if isinstance(plan, dict):
+        if plan.get("stage") == "IXSCAN" and "indexName" in plan:
+            indexes.add(plan["indexName"])
+        for value in plan.values():
+            indexes |= plan_indexes(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            indexes |= plan_indexes(item)
+    return indexes
+
+
+async def explain_shapes(collection, shapes: Sequence[QueryShape]) -> Dict[str, QueryPlan]:
+    """Run every query shape under ``explain`` with ``executionStats``"""
+    plans = {}
+    for shape in shapes:
+        find: Dict[str, Any] = {"find": collection.name, "filter": shape.filter}
+        if shape.sort:
+            find["sort"] = dict(shape.sort)
+        explained = await collection.database.command({"explain": find, "verbosity": "executionStats"})
+        winning = explained["queryPlanner"]["winningPlan"]
+        stats = explained["executionStats"]
+        plans[shape.name] = QueryPlan(
+            stages=frozenset(plan_stages(winning)),
+            indexes=frozenset(plan_indexes(winning)),
+            returned=stats["nReturned"],
+            keys_examined=stats["totalKeysExamined"],
+            docs_examined=stats["totalDocsExamined"],
+        )
+    return plans
+
+
+def plan_problems(shape: QueryShape, plan: QueryPlan, max_examined_ratio: float = 3.0) -> List[str]:
+    """Why a query shape is not served by an index; empty when it is.
+
+    The examined/returned ratio is only meaningful against representative
+    data, the plan checks hold for any collection. Shapes with an
+    ``accepted_scan`` reason are not checked.
+    """
+    problems = []
+    if shape.accepted_scan:
+        return problems
+    if "COLLSCAN" in plan.stages:
+        problems.append("collection scan")
+    if shape.filter and plan.indexes <= {"_id_"}:
+        problems.append("filter is not narrowed by any index")
+    if plan.docs_examined > max_examined_ratio * max(plan.returned, 1):
+        problems.append(f"examined {plan.docs_examined} documents to return {plan.returned}")
+    return problems
+
+
+def inefficient_shapes(shapes: Sequence[QueryShape], plans: Dict[str, QueryPlan],
+                       max_examined_ratio: float = 3.0) -> Dict[str, List[str]]:
+    """Problems of every query shape that reads more of the collection than it returns"""
+    problems = {}
+    for shape in shapes:
+        found = plan_problems(shape, plans[shape.name], max_examined_ratio)
+        if found:
+            problems[shape.name] = found
+    return problems
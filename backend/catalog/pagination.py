@@ -0,0 +1,186 @@
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import ColumnStore
+from .ranking import RankingIndex, RankWeights
+
+# API sort name -> (ColumnStore column, stored Mongo field, descending by default).
+# Every ordering is made total by breaking ties on the Mongo ``_id``.
+SORT_FIELDS: Dict[str, Tuple[str, str, bool]] = {
+    "rating": ("rating", "rating", True),
+    "profit_split": ("profit_split", "trader_profit_split", True),
+    "evaluation_fee": ("lowest_evaluation_fee", "lowest_evaluation_fee", False),
+    "account_size": ("min_account_size", "min_account_size", False),
+    "total_reviews": ("total_reviews", "total_reviews", True),
+}
+
+# Weighted ranking (see RankWeights): best first by default, not a stored field
+SCORE_SORT = "score"
+
+
+@dataclass(frozen=True)
+class FirmSort:
+    """Ordering of a /api/firms page; ``name=None`` is insertion (``_id``) order.
+
+    ``weights`` is set for the weighted ranking (``name == SCORE_SORT``) only.
+    """
+    name: Optional[str] = None
+    descending: bool = False
+    weights: Optional[RankWeights] = None
+
+    @classmethod
+    def parse(cls, sort: Optional[str], order: Optional[str], weights: Optional[str] = None) -> "FirmSort":
+        if sort == SCORE_SORT:
+            return cls(sort, order != "asc", RankWeights.parse(weights))
+        if weights is not None:
+            raise ValueError(f"weights only apply to sort={SCORE_SORT}")
+        if sort is None:
+            return cls(None, order == "desc")
+        if sort not in SORT_FIELDS:
+            expected = ", ".join([*SORT_FIELDS, SCORE_SORT])
+            raise ValueError(f"Unsupported sort '{sort}', expected one of: {expected}")
+        descending = SORT_FIELDS[sort][2] if order is None else order == "desc"
+        return cls(sort, descending)
+
+    @property
+    def column(self) -> Optional[str]:
+        return SORT_FIELDS[self.name][0] if self.name in SORT_FIELDS else None
+
+    @property
+    def field(self) -> Optional[str]:
+        return SORT_FIELDS[self.name][1] if self.name in SORT_FIELDS else None
+
+    @property
+    def token(self) -> str:
+        name = f"{SCORE_SORT}({self.weights.token})" if self.weights else self.name or "_id"
+        return f"{name}:{'desc' if self.descending else 'asc'}"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position right after the last firm of a page: its sort value and ``_id``"""
+    sort: FirmSort
+    value: Any
+    object_id: str
+
+
+def _json_number(value: Any) -> Any:
+    # Catalog columns are float64; keep cursors identical to the Mongo path
+    if isinstance(value, float):
+        if np.isnan(value):
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    payload = json.dumps([cursor.sort.token, _json_number(cursor.value), cursor.object_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort: FirmSort) -> Cursor:
+    """Parse a cursor issued for ``sort``; ValueError when malformed or issued for another ordering"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        sort_token, value, object_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if sort_token != sort.token:
+        raise ValueError("Cursor was issued for a different sort order")
+    if not isinstance(object_id, str) or not (value is None or isinstance(value, (int, float))):
+        raise ValueError("Malformed cursor")
+    if sort.weights is not None and value is None:
+        raise ValueError("Malformed cursor")
+    return Cursor(sort, value, object_id)
+
+
+def mongo_sort(sort: FirmSort) -> List[Tuple[str, int]]:
+    direction = -1 if sort.descending else 1
+    keys = [(sort.field, direction)] if sort.field else []
+    return keys + [("_id", direction)]
+
+
+def mongo_after(cursor: Cursor, object_id: Any) -> Dict[str, Any]:
+    """Filter matching every document strictly after ``cursor`` in its sort order.
+
+    Missing values (null) sort before every number, as they do in MongoDB.
+    ``object_id`` is ``cursor.object_id`` converted to the collection's id type.
+    """
+    sort = cursor.sort
+    past = "$lt" if sort.descending else "$gt"
+    if sort.field is None:
+        return {"_id": {past: object_id}}
+
+    field, value = sort.field, cursor.value
+    tie = {field: value, "_id": {past: object_id}}
+    if value is None:
+        if sort.descending:
+            return tie
+        return {"$or": [tie, {field: {"$ne": None}}]}
+    beyond = {field: {past: value}}
+    if sort.descending:
+        return {"$or": [beyond, tie, {field: None}]}
+    return {"$or": [beyond, tie]}
+
+
+class SortIndex:
+    """Catalog positions pre-sorted by ``(value, _id)`` ascending, NaN first.
+
+    A page is a binary search for the cursor followed by a vectorized mask
+    over the remaining positions, so its cost does not grow with its depth.
+    """
+
+    def __init__(self, values: np.ndarray, object_ids: Sequence[str]):
+        keys = np.where(np.isnan(values), -np.inf, values)
+        ids = np.array(object_ids, dtype=str) if len(object_ids) else np.array([], dtype="<U24")
+        self.order = np.lexsort((ids, keys))
+        self.keys = keys[self.order]
+        self.object_ids = ids[self.order]
+
+    def _boundary(self, value: Any, object_id: str, side: str) -> int:
+        key = -np.inf if value is None else float(value)
+        lo = int(np.searchsorted(self.keys, key, "left"))
+        hi = int(np.searchsorted(self.keys, key, "right"))
+        return lo + int(np.searchsorted(self.object_ids[lo:hi], object_id, side))
+
+    def page(self, mask: np.ndarray, descending: bool, cursor: Optional[Cursor], limit: int) -> List[int]:
+        """Up to ``limit`` masked positions following ``cursor`` in the requested direction"""
+        order = self.order
+        if descending:
+            if cursor is not None:
+                order = order[:self._boundary(cursor.value, cursor.object_id, "left")]
+            order = order[::-1]
+        elif cursor is not None:
+            order = order[self._boundary(cursor.value, cursor.object_id, "right"):]
+        return order[mask[order]][:limit].tolist()
+
+
+class SortIndexes:
+    """One :class:`SortIndex` per supported sort plus ``_id`` order for a snapshot"""
+
+    def __init__(self, columns: ColumnStore, object_ids: Sequence[str]):
+        self.object_ids = list(object_ids)
+        self.columns = columns
+        # No sort value at all: the order is decided by ``_id`` alone
+        unsorted = np.full(len(self.object_ids), np.nan)
+        self.indexes = {None: SortIndex(unsorted, self.object_ids)}
+        for name, (column, _, _) in SORT_FIELDS.items():
+            self.indexes[name] = SortIndex(columns[column], self.object_ids)
+        self.ranking = RankingIndex(columns, self.object_ids)
+
+    def page(self, mask: np.ndarray, sort: FirmSort, cursor: Optional[Cursor], limit: int) -> List[int]:
+        if sort.weights is not None:
+            after = (cursor.value, cursor.object_id) if cursor is not None else None
+            return self.ranking.page(mask, sort.weights, sort.descending, after, limit)
+        return self.indexes[sort.name].page(mask, sort.descending, cursor, limit)
+
+    def cursor_after(self, position: int, sort: FirmSort) -> Cursor:
+        if sort.weights is not None:
+            return Cursor(sort, float(self.ranking.scores(sort.weights)[position]), self.object_ids[position])
+        value = self.columns[sort.column][position] if sort.column else None
+        return Cursor(sort, _json_number(float(value)) if value is not None else None, self.object_ids[position])
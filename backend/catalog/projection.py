@@ -0,0 +1,51 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+# Named field sets for ``fields=``; None selects every field
+FIELD_PRESETS: Dict[str, Optional[Tuple[str, ...]]] = {
+    # Everything the listing card in the frontend renders
+    "card": (
+        "id", "name", "logo_url", "website_url", "description", "min_account_size", "profit_split",
+        "max_drawdown", "evaluation_fee", "payout_frequency", "minimum_payout", "news_trading",
+        "expert_advisors", "scaling_plan", "rating", "total_reviews",
+    ),
+    "full": None,
+}
+
+
+def parse_fields(value: Optional[str], available: Sequence[str]) -> Optional[Tuple[str, ...]]:
+    """Resolve a ``fields=`` value (field names and presets, comma separated).
+
+    Returns the selected fields in model order, always including ``id``, or
+    None when every field is selected. Raises ValueError on unknown names.
+    """
+    if not value or not value.strip():
+        return None
+
+    selected = {"id"}
+    for name in (part.strip() for part in value.split(",")):
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            preset = FIELD_PRESETS[name]
+            if preset is None:
+                return None
+            selected.update(preset)
+        elif name in available:
+            selected.add(name)
+        else:
+            raise ValueError(
+                f"Unknown field '{name}', expected a preset ({', '.join(FIELD_PRESETS)}) or a firm field"
+            )
+
+    if selected.issuperset(available):
+        return None
+    return tuple(name for name in available if name in selected)
+
+
+def mongo_projection(fields: Optional[Iterable[str]], *extra: Optional[str]) -> Optional[Dict[str, int]]:
+    """Projection document for ``fields`` plus any extra fields the query needs (e.g. a sort key)"""
+    if fields is None:
+        return None
+    projection = dict.fromkeys(fields, 1)
+    projection.update(dict.fromkeys((name for name in extra if name), 1))
+    return projection
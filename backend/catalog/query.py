@@ -0,0 +1,96 @@
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+from .countries import country_code
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """How one /api/firms filter maps onto the catalog indexes and onto MongoDB"""
+    attribute: str  # TERM_FIELDS or RANGE_FIELDS entry of the filter index
+    op: str  # "eq", "ne" (list attribute does not contain the value), "ge" or "le"
+    mongo_field: str
+
+
+# Every filter of FirmFilters; adding a filter is one field there and one entry here
+FILTER_SPECS: Dict[str, FilterSpec] = {
+    "min_account_size": FilterSpec("min_account_size", "ge", "min_account_size"),
+    "max_account_size": FilterSpec("max_account_size", "le", "max_account_size"),
+    "platform": FilterSpec("trading_platforms", "eq", "trading_platforms"),
+    "instrument": FilterSpec("instruments", "eq", "instruments"),
+    "min_profit_split": FilterSpec("profit_split", "ge", "trader_profit_split"),
+    "payout_frequency": FilterSpec("payout_frequency", "eq", "payout_frequency"),
+    "news_trading": FilterSpec("news_trading", "eq", "news_trading"),
+    "expert_advisors": FilterSpec("expert_advisors", "eq", "expert_advisors"),
+    "scaling_plan": FilterSpec("scaling_plan", "eq", "scaling_plan"),
+    "weekend_holding": FilterSpec("weekend_holding", "eq", "weekend_holding"),
+    "copy_trading": FilterSpec("copy_trading", "eq", "copy_trading"),
+    "min_rating": FilterSpec("rating", "ge", "rating"),
+    "max_monthly_fee": FilterSpec("monthly_fee", "le", "monthly_fee"),
+    # At least one challenge at or below this price
+    "max_evaluation_fee": FilterSpec("lowest_evaluation_fee", "le", "lowest_evaluation_fee"),
+    # Firms that accept traders from this country (ISO 3166-1 alpha-2, see FirmFilters)
+    "country": FilterSpec("restricted_country_codes", "ne", "restricted_country_codes"),
+}
+
+_MONGO_OPERATORS = {"ne": "$ne", "ge": "$gte", "le": "$lte"}
+
+# (attribute, op, value) as evaluated by FilterIndex
+Predicate = Tuple[str, str, Any]
+
+
+@dataclass(frozen=True)
+class FirmFilters:
+    """Normalized, hashable /api/firms filter state, usable against Mongo or the in-memory catalog.
+
+    Unset filters are None and ``country`` is reduced to its ISO code; two
+    requests selecting the same firms through the same filters compare (and
+    hash) equal, which makes this a cache key. Raises ValueError for an
+    unknown country.
+    """
+    min_account_size: Optional[int] = None
+    max_account_size: Optional[int] = None
+    platform: Optional[str] = None
+    instrument: Optional[str] = None
+    min_profit_split: Optional[int] = None
+    payout_frequency: Optional[str] = None
+    news_trading: Optional[bool] = None
+    expert_advisors: Optional[bool] = None
+    scaling_plan: Optional[bool] = None
+    weekend_holding: Optional[bool] = None
+    copy_trading: Optional[bool] = None
+    min_rating: Optional[float] = None
+    max_monthly_fee: Optional[int] = None
+    max_evaluation_fee: Optional[int] = None
+    country: Optional[str] = None
+
+    def __post_init__(self):
+        for item in fields(self):
+            value = getattr(self, item.name)
+            if isinstance(value, str):
+                value = value.strip()
+                object.__setattr__(self, item.name, value or None)
+        if self.country is not None:
+            code = country_code(self.country)
+            if code is None:
+                raise ValueError(f"Unknown country '{self.country}', expected an ISO 3166 code or a country name")
+            object.__setattr__(self, "country", code)
+
+    def active(self) -> List[Tuple[str, Any]]:
+        """``(filter name, value)`` of every filter that is set"""
+        return [(name, getattr(self, name)) for name in FILTER_SPECS if getattr(self, name) is not None]
+
+    def predicates(self) -> List[Predicate]:
+        return [(FILTER_SPECS[name].attribute, FILTER_SPECS[name].op, value) for name, value in self.active()]
+
+    def to_mongo(self) -> Dict[str, Any]:
+        """Build the equivalent MongoDB filter document"""
+        filter_query: Dict[str, Any] = {}
+        for name, value in self.active():
+            spec = FILTER_SPECS[name]
+            condition = value if spec.op == "eq" else {_MONGO_OPERATORS[spec.op]: value}
+            if spec.mongo_field in filter_query:
+                filter_query.setdefault("$and", []).append({spec.mongo_field: condition})
+            else:
+                filter_query[spec.mongo_field] = condition
+        return filter_query
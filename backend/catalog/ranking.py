@@ -0,0 +1,128 @@
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .columns import ColumnStore
+
+# criterion -> True when a higher value is better
+RANKING_CRITERIA: Dict[str, bool] = {
+    "split": True,
+    "fee": False,
+    "drawdown": True,
+    "payout_frequency": True,
+    "rating": True,
+    "reviews": True,
+}
+
+
+def ranking_criteria(columns: ColumnStore) -> Dict[str, np.ndarray]:
+    """Raw per-firm value of every ranking criterion"""
+    return {
+        "split": columns["profit_split"],
+        # Cheapest evaluation per funded dollar, so small and large accounts compare fairly
+        "fee": columns["fee_per_funded_dollar"],
+        "drawdown": columns["max_drawdown"],
+        "payout_frequency": columns["payouts_per_month"],
+        "rating": columns["rating"],
+        # Diminishing returns: 10 -> 100 reviews matters more than 1000 -> 1090
+        "reviews": np.log1p(columns["total_reviews"]),
+    }
+
+
+@dataclass(frozen=True)
+class RankWeights:
+    """Client-supplied weight of every ranking criterion; hashable, so part of cache keys"""
+    split: float = 0.0
+    fee: float = 0.0
+    drawdown: float = 0.0
+    payout_frequency: float = 0.0
+    rating: float = 0.0
+    reviews: float = 0.0
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> "RankWeights":
+        """Parse ``"split:3,fee:2,rating:1"``; all criteria weigh 1 when ``value`` is empty.
+
+        Raises ValueError for unknown criteria, negative or non-numeric
+        weights, or when every weight is 0.
+        """
+        if not value or not value.strip():
+            return cls(**{name: 1.0 for name in RANKING_CRITERIA})
+        weights: Dict[str, float] = {}
+        for item in value.split(","):
+            name, _, weight = item.partition(":")
+            name = name.strip()
+            if name not in RANKING_CRITERIA:
+                raise ValueError(f"Unknown ranking criterion '{name}', expected one of: {', '.join(RANKING_CRITERIA)}")
+            try:
+                weights[name] = float(weight) if weight.strip() else 1.0
+            except ValueError:
+                raise ValueError(f"Invalid weight for '{name}': {weight.strip()!r}")
+            if not np.isfinite(weights[name]) or weights[name] < 0:
+                raise ValueError(f"Weight for '{name}' must be a non-negative number")
+        if not any(weights.values()):
+            raise ValueError("At least one ranking weight must be positive")
+        return cls(**weights)
+
+    @property
+    def token(self) -> str:
+        """Canonical text form, e.g. ``fee=2,split=3`` (used in cursors)"""
+        return ",".join(f"{item.name}={getattr(self, item.name):g}" for item in fields(self) if getattr(self, item.name))
+
+    def vector(self) -> np.ndarray:
+        values = np.array([getattr(self, name) for name in RANKING_CRITERIA])
+        return values / values.sum()
+
+
+class RankingIndex:
+    """Per-firm criterion values normalized to [0, 1] (1 = best in the catalog), ready to be weighted.
+
+    A firm's score is the weighted mean of its normalized criteria: one
+    matrix-vector product for the whole catalog. Missing values score 0.
+    Ties are broken on ``_id`` like every other /api/firms ordering.
+    """
+
+    def __init__(self, columns: ColumnStore, object_ids: Sequence[str]):
+        criteria = ranking_criteria(columns)
+        values = np.column_stack([criteria[name] for name in RANKING_CRITERIA]) if len(columns) else \
+            np.zeros((0, len(RANKING_CRITERIA)))
+        direction = np.array([1.0 if higher else -1.0 for higher in RANKING_CRITERIA.values()])
+        oriented = values * direction
+        best = np.fmax.reduce(oriented, axis=0, initial=-np.inf)
+        worst = np.fmin.reduce(oriented, axis=0, initial=np.inf)
+        spread = best - worst
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normalized = np.where(spread > 0, (oriented - worst) / spread, 1.0)
+        self.features = np.where(np.isnan(oriented), 0.0, normalized)
+        self.object_ids = np.array(object_ids, dtype=str) if len(object_ids) else np.array([], dtype="<U24")
+
+    def scores(self, weights: RankWeights) -> np.ndarray:
+        return self.features @ weights.vector()
+
+    def page(self, mask: np.ndarray, weights: RankWeights, descending: bool,
+             after: Optional[Tuple[float, str]], limit: int) -> List[int]:
+        """Up to ``limit`` masked positions ordered by ``(score, _id)``, following ``after`` (score, _id).
+
+        Only the candidates up to the ``limit``-th best score (ties
+        included) are sorted, so a page costs a scan plus a partial sort of
+        the matching firms however many there are.
+        """
+        scores = self.scores(weights)
+        candidates = np.flatnonzero(mask)
+        if after is not None:
+            score, object_id = after
+            ids = self.object_ids[candidates]
+            if descending:
+                keep = (scores[candidates] < score) | ((scores[candidates] == score) & (ids < object_id))
+            else:
+                keep = (scores[candidates] > score) | ((scores[candidates] == score) & (ids > object_id))
+            candidates = candidates[keep]
+
+        keys = -scores[candidates] if descending else scores[candidates]
+        if len(candidates) > limit:
+            candidates = candidates[keys <= np.partition(keys, limit - 1)[limit - 1]]
+        order = np.lexsort((self.object_ids[candidates], scores[candidates]))
+        if descending:
+            order = order[::-1]
+        return candidates[order][:limit].tolist()
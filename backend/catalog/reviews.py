@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+
+from .indexes import IndexSpec
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+# Firm fields maintained from the review aggregates; seed and import content only sets them on insert
+# and otherwise updates the editorial baseline (baseline_rating, baseline_reviews) they are blended with
+REVIEW_OWNED_FIELDS = ("rating", "total_reviews")
+
+REVIEW_INDEXES: List[IndexSpec] = [
+    IndexSpec("id_unique", (("id", ASCENDING),), {"unique": True}),
+    # A firm's reviews newest first, resumed from the last ``_id`` of the previous page
+    IndexSpec("firm_newest", (("firm_id", ASCENDING), ("_id", DESCENDING))),
+]
+
+# Firm fields needed to summarize its reviews
+REVIEW_SUMMARY_PROJECTION = {"_id": 0, "id": 1, "rating": 1, "total_reviews": 1, "review_stats": 1}
+
+
+def _number(path: str) -> Dict[str, Any]:
+    return {"$ifNull": [f"${path}", 0]}
+
+
+# Update pipeline stages publishing rating and total_reviews: the editorial baseline blended with the
+# user reviews, as if the baseline were ``baseline_reviews`` reviews averaging ``baseline_rating``
+RATING_STAGES: List[Dict[str, Any]] = [
+    {"$set": {"total_reviews": {"$add": [_number("baseline_reviews"), _number("review_stats.count")]}}},
+    {"$set": {"rating": {"$cond": [
+        {"$gt": ["$total_reviews", 0]},
+        {"$round": [
+            {"$divide": [
+                {"$add": [
+                    {"$multiply": [_number("baseline_rating"), _number("baseline_reviews")]},
+                    _number("review_stats.sum"),
+                ]},
+                "$total_reviews",
+            ]},
+            2,
+        ]},
+        # Nothing to blend: the editorial rating stands on its own
+        _number("baseline_rating"),
+    ]}}},
+]
+
+
+def review_update(rating: int, now: datetime, sign: int = 1) -> List[Dict[str, Any]]:
+    """Update pipeline folding one review into (``sign=1``) or out of (``sign=-1``) a firm.
+
+    Counters and the published rating change in the same single-document
+    update, so concurrent writes can neither lose an increment nor publish a
+    rating computed from stale counters.
+    """
+    deltas = {"count": sign, "sum": sign * rating, f"histogram.{rating}": sign}
+    counters = {f"review_stats.{name}": {"$add": [_number(f"review_stats.{name}"), delta]} for name, delta in deltas.items()}
+    return [
+        {"$set": {
+            # Firms stored before reviews existed take their current numbers as the baseline
+            "baseline_rating": {"$ifNull": ["$baseline_rating", "$rating"]},
+            "baseline_reviews": {"$ifNull": ["$baseline_reviews", "$total_reviews"]},
+            **counters,
+            "updated_at": now,
+        }},
+        *RATING_STAGES,
+    ]
+
+
+def review_summary(firm: Dict[str, Any]) -> Dict[str, Any]:
+    """Published rating plus the user review aggregates of a firm document, without reading any review"""
+    stats = firm.get("review_stats") or {}
+    count = stats.get("count", 0)
+    histogram = stats.get("histogram") or {}
+    return {
+        "firm_id": firm["id"],
+        "rating": firm["rating"],
+        "total_reviews": firm["total_reviews"],
+        "user_reviews": count,
+        "user_average": round(stats["sum"] / count, 2) if count else None,
+        "histogram": {str(value): histogram.get(str(value), 0) for value in RATING_VALUES},
+    }
+
+
+async def add_review(firms, reviews, review: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Store ``review`` and fold it into its firm; returns the firm's new summary, None for an unknown firm.
+
+    The firm is updated first so an unknown firm costs no write. Without a
+    multi-document transaction the review insert is a second write; when it
+    fails the firm update is reverted.
+    """
+    now = review["created_at"]
+    firm = await firms.find_one_and_update(
+        {"id": review["firm_id"]}, review_update(review["rating"], now),
+        projection=REVIEW_SUMMARY_PROJECTION, return_document=ReturnDocument.AFTER,
+    )
+    if firm is None:
+        return None
+    try:
+        await reviews.insert_one(dict(review))
+    except Exception:
+        await firms.update_one({"id": review["firm_id"]}, review_update(review["rating"], now, -1))
+        raise
+    return review_summary(firm)
+
+
+async def remove_review(firms, reviews, review_id: str) -> Optional[Dict[str, Any]]:
+    """Delete a review and take it out of its firm's aggregates; returns the deleted review or None"""
+    review = await reviews.find_one_and_delete({"id": review_id}, projection={"_id": 0})
+    if review is not None:
+        await firms.update_one({"id": review["firm_id"]}, review_update(review["rating"], datetime.utcnow(), -1))
+    return review
+
+
+async def refresh_ratings(firms, query: Dict[str, Any]) -> int:
+    """Republish rating and total_reviews of the matching firms, e.g. after their baseline changed"""
+    result = await firms.update_many(query, [*RATING_STAGES, {"$set": {"updated_at": datetime.utcnow()}}])
+    return result.modified_count
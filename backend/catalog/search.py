@@ -0,0 +1,317 @@
+import re
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from .index import bitset_from_positions, positions_from_bitset
+from .text import fold
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+
+@lru_cache(maxsize=65536)
+def tokenize(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_RE.findall(fold(text)))
+
+
+def trigrams(text: str) -> List[str]:
+    return [text[i:i + 3] for i in range(len(text) - 2)]
+
+
+def popularity(firm: Dict[str, Any]) -> Tuple[int, float]:
+    return firm["total_reviews"], firm["rating"]
+
+
+class _TrieNode:
+    __slots__ = ("children", "entries", "counts")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.entries: List[Tuple[int, int]] = []  # (tier, rank), best first
+        self.counts = [0, 0]
+
+
+class SuggestionIndex:
+    """Typeahead index: a prefix trie on firm names plus trigrams over names and descriptions.
+
+    Results are ranked by match tier (full name prefix, name word prefix,
+    name substring, description substring) and then by popularity.
+    Every trie node keeps its best ``NODE_CAPACITY`` entries precomputed, so
+    a prefix lookup never walks the subtree.
+    """
+
+    NODE_CAPACITY = 16
+
+    FULL_NAME_PREFIX = 0
+    NAME_WORD_PREFIX = 1
+    NAME_SUBSTRING = 2
+    DESCRIPTION_SUBSTRING = 3
+
+    def __init__(self, firms: Sequence[Dict[str, Any]]):
+        # Everything below is keyed by popularity rank (0 = most popular)
+        # rather than catalog position, so candidates come out best first
+        self.size = len(firms)
+        self.order = sorted(range(self.size), key=lambda i: popularity(firms[i]), reverse=True)
+        self.names = [fold(firms[position]["name"]) for position in self.order]
+        self.descriptions = [fold(firms[position]["description"]) for position in self.order]
+
+        self.root = _TrieNode()
+        for rank, name in enumerate(self.names):
+            self._insert(name, self.FULL_NAME_PREFIX, rank)
+            for token in _TOKEN_RE.findall(name):
+                self._insert(token, self.NAME_WORD_PREFIX, rank)
+        self._finalize(self.root)
+
+        self.name_trigrams = self._trigram_postings(self.names)
+        self.description_trigrams = self._trigram_postings(self.descriptions)
+
+    def _trigram_postings(self, texts: Sequence[str]) -> Dict[str, int]:
+        # Program variants of one firm share their texts, so trigrams are
+        # extracted once per distinct text
+        by_text: Dict[str, List[int]] = {}
+        for rank, text in enumerate(texts):
+            by_text.setdefault(text, []).append(rank)
+        postings: Dict[str, List[int]] = {}
+        for text, ranks in by_text.items():
+            for gram in set(trigrams(text)):
+                postings.setdefault(gram, []).extend(ranks)
+        return {gram: bitset_from_positions(members, self.size) for gram, members in postings.items()}
+
+    def _insert(self, key: str, tier: int, rank: int):
+        # Keys arrive in popularity order, so the first entries of each tier
+        # are the best ones and the rest can be dropped on the spot
+        node = self.root
+        for ch in key:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+            if node.counts[tier] < self.NODE_CAPACITY:
+                node.entries.append((tier, rank))
+                node.counts[tier] += 1
+
+    def _finalize(self, node: _TrieNode):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            best: Dict[int, int] = {}
+            for tier, rank in current.entries:
+                if tier < best.get(rank, tier + 1):
+                    best[rank] = tier
+            current.entries = sorted((tier, rank) for rank, tier in best.items())[:self.NODE_CAPACITY]
+            current.counts = None
+            stack.extend(current.children.values())
+
+    def _prefix(self, key: str) -> List[Tuple[int, int]]:
+        node = self.root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.entries
+
+    def _candidates(self, postings: Dict[str, int], key: str) -> List[int]:
+        """Ranks sharing every trigram of ``key``, most popular first"""
+        if len(key) < 3:
+            return []
+        bits = (1 << self.size) - 1
+        for gram in set(trigrams(key)):
+            bits &= postings.get(gram, 0)
+            if not bits:
+                return []
+        return positions_from_bitset(bits, self.size)
+
+    def suggest(self, query: str, limit: int = 5) -> List[int]:
+        """Catalog positions of the best matches for ``query``"""
+        key = fold(query).strip()
+        if not key:
+            return []
+
+        tiers: Dict[int, int] = {}
+        for tier, rank in self._prefix(key):
+            tiers[rank] = tier
+
+        # Trigram candidates are verified, since sharing every trigram does
+        # not guarantee a contiguous match. Candidates arrive in popularity
+        # order, so each tier stops as soon as it has enough matches.
+        for tier, postings, texts in (
+            (self.NAME_SUBSTRING, self.name_trigrams, self.names),
+            (self.DESCRIPTION_SUBSTRING, self.description_trigrams, self.descriptions),
+        ):
+            if len(tiers) >= limit:
+                break
+            found = 0
+            for rank in self._candidates(postings, key):
+                if rank not in tiers and key in texts[rank]:
+                    tiers[rank] = tier
+                    found += 1
+                    if found >= limit:
+                        break
+
+        ranked = sorted(tiers, key=lambda rank: (tiers[rank], rank))
+        return [self.order[rank] for rank in ranked[:limit]]
+
+
+@lru_cache(maxsize=65536)
+def term_counts(text: str) -> Tuple[Tuple[str, int], ...]:
+    return tuple(Counter(tokenize(text)).items())
+
+
+def name_tokens(name: str) -> List[str]:
+    """Name words plus CamelCase parts and the compacted name ("TopStepTrader" -> top, step, trader, topsteptrader)"""
+    words = list(tokenize(name))
+    parts = [fold(part) for part in _CAMEL_RE.findall(name)]
+    tokens = words + [part for part in parts if part not in words]
+    compact = "".join(words)
+    return tokens if compact in tokens else tokens + [compact]
+
+
+def deletes(word: str, distance: int) -> Set[str]:
+    """Every string obtained by deleting up to ``distance`` characters from ``word``"""
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {candidate[:i] + candidate[i + 1:] for candidate in frontier for i in range(len(candidate))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, bound: int) -> int:
+    """Levenshtein distance between ``a`` and ``b``, or ``bound + 1`` once it is exceeded"""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+def max_typos(token: str) -> int:
+    if len(token) <= 3:
+        return 0
+    if len(token) <= 7:
+        return 1
+    return 2
+
+
+class FuzzySearchIndex:
+    """Typo-tolerant, accent-insensitive full text index with BM25 ranking.
+
+    Per-term BM25 impacts (field-weighted term frequency, length
+    normalization and idf) are precomputed into arrays, so a query is a few
+    vectorized gathers once its tokens have been expanded to vocabulary
+    terms by exact, prefix and bounded edit-distance matching.
+    """
+
+    FIELD_WEIGHTS: Dict[str, float] = {
+        "name": 3.0,
+        "trading_platforms": 2.0,
+        "headquarters": 1.5,
+        "description": 1.0,
+        "pros": 1.0,
+        "cons": 0.75,
+    }
+    K1 = 1.2
+    B = 0.75
+    MAX_DISTANCE = 2
+    MIN_PREFIX = 3
+    MAX_EXPANSIONS = 32
+    PREFIX_WEIGHT = 0.8
+    TYPO_WEIGHT = 0.6  # per edit
+
+    def __init__(self, firms: Sequence[Dict[str, Any]]):
+        self.size = len(firms)
+        frequencies: Dict[str, Dict[int, float]] = {}
+        lengths = np.zeros(self.size, dtype=np.float64)
+
+        for position, firm in enumerate(firms):
+            for field, weight in self.FIELD_WEIGHTS.items():
+                value = firm[field]
+                if field == "name":
+                    counts = tuple(Counter(name_tokens(value)).items())
+                else:
+                    counts = term_counts(" ".join(value) if isinstance(value, list) else value)
+                for token, count in counts:
+                    lengths[position] += weight * count
+                    postings = frequencies.setdefault(token, {})
+                    postings[position] = postings.get(position, 0.0) + weight * count
+
+        average_length = lengths.mean() if self.size else 0.0
+        norms = self.K1 * (1 - self.B + self.B * lengths / average_length) if self.size else lengths
+
+        self.terms = sorted(frequencies)
+        self.term_ids = {term: term_id for term_id, term in enumerate(self.terms)}
+        self.postings: List[np.ndarray] = []
+        self.impacts: List[np.ndarray] = []
+        for term in self.terms:
+            docs = np.fromiter(frequencies[term].keys(), dtype=np.int64)
+            tf = np.fromiter(frequencies[term].values(), dtype=np.float64)
+            idf = np.log(1 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings.append(docs)
+            self.impacts.append(idf * tf * (self.K1 + 1) / (tf + norms[docs]))
+
+        self.deletes: Dict[str, List[int]] = {}
+        for term_id, term in enumerate(self.terms):
+            if len(term) > 3:
+                for variant in deletes(term, self.MAX_DISTANCE):
+                    self.deletes.setdefault(variant, []).append(term_id)
+
+    def expand(self, token: str) -> Dict[int, float]:
+        """Vocabulary terms matching ``token`` with their match weight.
+
+        Matching falls back from exact to prefix to bounded edit distance,
+        so a looser match never competes with a stricter one.
+        """
+        if token in self.term_ids:
+            return {self.term_ids[token]: 1.0}
+
+        matches: Dict[int, float] = {}
+        if len(token) >= self.MIN_PREFIX:
+            start = bisect_left(self.terms, token)
+            for term_id in range(start, min(start + self.MAX_EXPANSIONS, len(self.terms))):
+                if not self.terms[term_id].startswith(token):
+                    break
+                matches[term_id] = self.PREFIX_WEIGHT
+        if matches:
+            return matches
+
+        bound = max_typos(token)
+        if bound:
+            for variant in deletes(token, bound):
+                for term_id in self.deletes.get(variant, ()):
+                    if term_id not in matches:
+                        distance = edit_distance(token, self.terms[term_id], bound)
+                        if distance <= bound:
+                            matches[term_id] = self.TYPO_WEIGHT ** distance
+        return matches
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, float]]:
+        """Catalog positions and BM25 scores of the best matches, best first"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.size:
+            return []
+
+        scores = np.zeros(self.size, dtype=np.float64)
+        for token in tokens:
+            # A token contributes through its best matching term only, so a
+            # typo with many close neighbours does not outweigh an exact hit
+            best = np.zeros(self.size, dtype=np.float64)
+            for term_id, weight in self.expand(token).items():
+                docs = self.postings[term_id]
+                best[docs] = np.maximum(best[docs], weight * self.impacts[term_id])
+            scores += best
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = np.sort(matched[np.argpartition(-scores[matched], limit - 1)[:limit]])
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(int(position), float(scores[position])) for position in ranked]
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from .countries import country_codes
+from .fees import fee_schedule
+from .reviews import REVIEW_OWNED_FIELDS, refresh_ratings
+
+logger = logging.getLogger(__name__)
+
+# Namespace for deterministic firm ids, so every worker and every deploy
+# derives the same id for the same firm
+FIRM_ID_NAMESPACE = uuid.UUID("6f1c2b9e-3d7a-4e51-9a0c-5b8e7d2f4a61")
+
+# Fields owned by the database rather than by the seed content
+VOLATILE_FIELDS = ("id", "created_at", "updated_at", "content_hash")
+
+
+def stable_firm_id(name: str) -> str:
+    # Derived from the exact name, the key firms are upserted on: two names
+    # the upsert keeps apart must never share an id
+    return str(uuid.uuid5(FIRM_ID_NAMESPACE, name))
+
+
+def derived_fields(firm: Dict[str, Any]) -> Dict[str, Any]:
+    """Scalar copies of nested values, stored so MongoDB can sort and index on them"""
+    fees = list(firm["evaluation_fee"].values())
+    return {
+        "trader_profit_split": firm["profit_split"][0] if firm["profit_split"] else None,
+        "lowest_evaluation_fee": min(fees) if fees else None,
+        "restricted_country_codes": country_codes(firm["countries_restricted"]),
+        # Array of {account_size, fee, fee_per_1k} so fees can be range-queried with $elemMatch
+        "fee_schedule": fee_schedule(firm),
+    }
+
+
+def content_hash(firm: Dict[str, Any]) -> str:
+    """Hash of a firm's stored content, ignoring ids and timestamps"""
+    content = {key: value for key, value in firm.items() if key not in VOLATILE_FIELDS}
+    # Derived fields are part of what gets written, so adding one rewrites every firm once
+    content.update(derived_fields(firm))
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SeedReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.removed)
+
+
+def upsert_operation(firm: Dict[str, Any], digest: str, now: datetime) -> UpdateOne:
+    """Upsert keyed on the firm name; ``firm["id"]`` and the creation time are only written on insert.
+
+    The content's rating and review count become the editorial baseline;
+    the published values are only written on insert, afterwards they are
+    republished from the baseline and the user reviews (see reviews.py).
+    """
+    content = {key: value for key, value in firm.items() if key not in VOLATILE_FIELDS}
+    owned = {name: content.pop(name) for name in REVIEW_OWNED_FIELDS}
+    baseline = {"baseline_rating": owned["rating"], "baseline_reviews": owned["total_reviews"]}
+    return UpdateOne(
+        {"name": firm["name"]},
+        {
+            "$set": {**content, **derived_fields(firm), **baseline, "content_hash": digest, "updated_at": now},
+            "$setOnInsert": {"id": firm["id"], "created_at": now, **owned},
+        },
+        upsert=True,
+    )
+
+
+async def write_firms(collection, operations: List[UpdateOne], updated: List[str]) -> List[Dict[str, Any]]:
+    """Apply upserts, then republish the ratings of the ``updated`` (previously stored) firms.
+
+    The write is unordered, so a failing operation does not stop the
+    others. Failures are returned (MongoDB write errors, each with the
+    ``index`` of its operation) instead of raised.
+    """
+    try:
+        await collection.bulk_write(operations, ordered=False)
+        errors = []
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+    if updated:
+        # Republishing is idempotent, so a firm whose update failed is unharmed
+        await refresh_ratings(collection, {"name": {"$in": updated}})
+    return errors
+
+
+async def sync_firms(collection, firms_data: Iterable[Dict[str, Any]], model: Callable[..., Any],
+                     prune: bool = False) -> SeedReport:
+    """Bring ``collection`` in line with ``firms_data`` writing only what changed.
+
+    Firms are matched by name and compared by content hash; new or changed
+    firms are upserted in one bulk_write, unchanged ones are not touched.
+    With ``prune`` firms missing from ``firms_data`` are deleted.
+    """
+    report = SeedReport()
+    existing = {
+        document["name"]: document.get("content_hash")
+        async for document in collection.find({}, {"_id": 0, "name": 1, "content_hash": 1})
+    }
+
+    now = datetime.utcnow()
+    operations: List[UpdateOne] = []
+    updated: List[str] = []
+    seen = set()
+    for firm_data in firms_data:
+        firm = model(**firm_data).dict()
+        firm["id"] = firm_data.get("id") or stable_firm_id(firm["name"])
+        seen.add(firm["name"])
+        digest = content_hash(firm)
+        if firm["name"] not in existing:
+            report.inserted += 1
+        elif existing[firm["name"]] != digest:
+            report.updated += 1
+            updated.append(firm["name"])
+        else:
+            report.unchanged += 1
+            continue
+        operations.append(upsert_operation(firm, digest, now))
+
+    if operations:
+        errors = await write_firms(collection, operations, updated)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    if prune:
+        stale = [name for name in existing if name not in seen]
+        if stale:
+            result = await collection.delete_many({"name": {"$in": stale}})
+            report.removed = result.deleted_count
+
+    return report
+
+
+class MongoLock:
+    """Lease-style mutex stored in a MongoDB collection, shared by all workers.
+
+    The lease expires after ``ttl`` seconds so a crashed holder cannot block
+    startup forever.
+    """
+
+    def __init__(self, collection, name: str, ttl: float = 60.0):
+        self._collection = collection
+        self.name = name
+        self.ttl = ttl
+        self.owner = uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        try:
+            await self._collection.insert_one({"_id": self.name, "owner": self.owner, "expires_at": expires_at})
+            return True
+        except DuplicateKeyError:
+            taken = await self._collection.find_one_and_update(
+                {"_id": self.name, "expires_at": {"$lt": now}},
+                {"$set": {"owner": self.owner, "expires_at": expires_at}},
+            )
+            return taken is not None
+
+    async def release(self):
+        await self._collection.delete_one({"_id": self.name, "owner": self.owner})
+
+    async def wait_released(self, timeout: float = 30.0, interval: float = 0.5) -> bool:
+        """Wait for another holder to finish; False if the lease is still held after ``timeout``"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            if await self._collection.find_one({"_id": self.name}) is None:
+                return True
+            await asyncio.sleep(interval)
+        return False
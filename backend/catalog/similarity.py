@@ -0,0 +1,121 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .index import ACCOUNT_SIZE_BUCKETS
+
+# Trading terms compared on a z-score scale (sizes and fees on a log scale)
+TERM_FEATURES: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "profit_split": lambda firm: firm["profit_split"][0] if firm["profit_split"] else np.nan,
+    "max_drawdown": lambda firm: firm["max_drawdown"],
+    "daily_drawdown": lambda firm: firm["daily_drawdown"],
+    "profit_target": lambda firm: firm["profit_target"],
+    "min_trading_days": lambda firm: firm["min_trading_days"],
+    "monthly_fee": lambda firm: np.log1p(firm["monthly_fee"]),
+    "min_account_size": lambda firm: np.log1p(firm["min_account_size"]),
+    "max_account_size": lambda firm: np.log1p(firm["max_account_size"]),
+}
+
+# Yes/no rules, encoded as +1/-1 so that sharing a "no" counts as much as sharing a "yes"
+RULE_FLAGS: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    "news_trading": lambda firm: firm["news_trading"],
+    "expert_advisors": lambda firm: firm["expert_advisors"],
+    "scaling_plan": lambda firm: firm["scaling_plan"],
+    "weekend_holding": lambda firm: firm["weekend_holding"],
+    "copy_trading": lambda firm: firm["copy_trading"],
+    "time_limit": lambda firm: firm["max_trading_days"] > 0,
+}
+
+# Share of the similarity carried by each group of features
+FEATURE_WEIGHTS = {
+    "trading_platforms": 1.0,
+    "instruments": 1.0,
+    "payout_frequency": 0.5,
+    "rules": 1.0,
+    "terms": 1.5,
+    "fee_curve": 1.0,
+}
+
+
+def fee_curve(firm: Dict[str, Any]) -> np.ndarray:
+    """Evaluation fee per $1k of funded capital at every ``ACCOUNT_SIZE_BUCKETS`` size.
+
+    Sizes a firm does not offer are interpolated between its neighbours (and
+    clamped at the ends), so firms with different account ladders remain
+    comparable.
+    """
+    schedule = sorted((int(size), fee) for size, fee in firm["evaluation_fee"].items() if int(size) > 0)
+    if not schedule:
+        return np.full(len(ACCOUNT_SIZE_BUCKETS), np.nan)
+    sizes = np.array([size for size, _ in schedule], dtype=np.float64)
+    per_1k = np.array([fee * 1000.0 / size for size, fee in schedule])
+    return np.log1p(np.interp(np.log(ACCOUNT_SIZE_BUCKETS), np.log(sizes), per_1k))
+
+
+def _standardized(values: np.ndarray) -> np.ndarray:
+    """Per-column z-scores; missing values and constant columns become 0 (the average)"""
+    mean = np.nanmean(values, axis=0) if len(values) else 0.0
+    std = np.nanstd(values, axis=0) if len(values) else 1.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = np.where(std > 0, (values - mean) / std, 0.0)
+    return np.nan_to_num(scores)
+
+
+def _multi_hot(values: Sequence[Sequence[str]]) -> np.ndarray:
+    """Rows of a set-valued attribute as unit vectors over its vocabulary (cosine = set overlap)"""
+    vocabulary = {term: column for column, term in enumerate(sorted({term for terms in values for term in terms}))}
+    block = np.zeros((len(values), len(vocabulary)))
+    for row, terms in enumerate(values):
+        block[row, [vocabulary[term] for term in terms]] = 1.0
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return np.divide(block, norms, out=np.zeros_like(block), where=norms > 0)
+
+
+def feature_matrix(firms: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """One L2-normalized feature vector per firm, so a dot product is the cosine similarity.
+
+    Each group of features is scaled to unit norm on average before being
+    weighted by ``FEATURE_WEIGHTS``; a group with many columns (e.g. a long
+    instrument list) therefore does not drown out the others.
+    """
+    blocks = {
+        "trading_platforms": _multi_hot([firm["trading_platforms"] for firm in firms]),
+        "instruments": _multi_hot([firm["instruments"] for firm in firms]),
+        "payout_frequency": _multi_hot([[firm["payout_frequency"]] for firm in firms]),
+    }
+    flags = np.array([[flag(firm) for flag in RULE_FLAGS.values()] for firm in firms], dtype=np.float64)
+    blocks["rules"] = (2.0 * flags - 1.0).reshape(len(firms), len(RULE_FLAGS)) / np.sqrt(len(RULE_FLAGS))
+    terms = np.array([[feature(firm) for feature in TERM_FEATURES.values()] for firm in firms], dtype=np.float64)
+    blocks["terms"] = _standardized(terms.reshape(len(firms), len(TERM_FEATURES))) / np.sqrt(len(TERM_FEATURES))
+    curves = np.array([fee_curve(firm) for firm in firms]).reshape(len(firms), len(ACCOUNT_SIZE_BUCKETS))
+    blocks["fee_curve"] = _standardized(curves) / np.sqrt(len(ACCOUNT_SIZE_BUCKETS))
+
+    matrix = np.hstack([blocks[name] * FEATURE_WEIGHTS[name] for name in FEATURE_WEIGHTS])
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class SimilarityIndex:
+    """Precomputed firm feature vectors answering "firms like this one" with one matrix-vector product"""
+
+    def __init__(self, matrix: np.ndarray):
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, firms: Sequence[Dict[str, Any]]) -> "SimilarityIndex":
+        return cls(feature_matrix(firms))
+
+    def similar(self, position: int, limit: int = 5,
+                members: Optional[Sequence[bool]] = None) -> List[Tuple[int, float]]:
+        """``(position, cosine similarity)`` of the ``limit`` firms closest to ``position``, best first.
+
+        ``members`` is a boolean mask over catalog positions restricting the
+        candidates (e.g. from the filter index).
+        """
+        scores = self.matrix @ self.matrix[position]
+        candidates = np.flatnonzero(members) if members is not None else np.arange(len(scores))
+        candidates = candidates[candidates != position]
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(int(candidate), float(scores[candidate])) for candidate in ranked]
@@ -0,0 +1,162 @@
+import math
+import time
+import warnings
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .columns import ColumnStore
+
+# Rule columns a challenge is simulated against
+RULE_COLUMNS = ("profit_target", "max_drawdown", "daily_drawdown", "min_trading_days", "max_trading_days")
+
+
+@dataclass(frozen=True)
+class ReturnModel:
+    """A trader's daily return distribution, in percent of the initial balance.
+
+    Without ``win_rate`` daily returns are normal. With it, every day is a
+    win of ``win`` or a loss of ``loss`` with those sizes chosen so the
+    distribution still has the requested mean and volatility.
+    """
+    mean: float
+    volatility: float
+    win_rate: Optional[float] = None
+
+    def __post_init__(self):
+        if self.volatility <= 0:
+            raise ValueError("volatility must be positive")
+        if self.win_rate is not None:
+            if not 0 < self.win_rate < 1:
+                raise ValueError("win_rate must be between 0 and 1")
+            if self.win <= 0 or self.loss <= 0:
+                raise ValueError("mean, volatility and win_rate leave no room for both winning and losing days")
+
+    @property
+    def _spread(self) -> float:
+        # win + loss of the two-point distribution with this volatility
+        return self.volatility / math.sqrt(self.win_rate * (1 - self.win_rate))
+
+    @property
+    def win(self) -> float:
+        return self.mean + (1 - self.win_rate) * self._spread
+
+    @property
+    def loss(self) -> float:
+        return self.win_rate * self._spread - self.mean
+
+    def sample(self, rng: np.random.Generator, paths: int, days: int) -> np.ndarray:
+        if self.win_rate is None:
+            return rng.normal(self.mean, self.volatility, size=(paths, days))
+        wins = rng.random((paths, days)) < self.win_rate
+        return np.where(wins, self.win, -self.loss)
+
+
+def simulation_paths(requested: int, rule_sets: int, days: int, max_cells: int, min_paths: int = 100) -> int:
+    """Largest path count within ``requested`` whose (rule set x path x day) arrays fit ``max_cells``"""
+    return max(min_paths, min(requested, max_cells // max(rule_sets * days, 1)))
+
+
+def simulate_challenges(rules: Dict[str, List[float]], model: ReturnModel, paths: int, seed: int,
+                        horizon: int, deadline: Optional[float] = None,
+                        chunk_cells: int = 1 << 21) -> Dict[str, List[float]]:
+    """Monte Carlo pass probability of every challenge in ``rules`` (one list per ``RULE_COLUMNS`` name).
+
+    Every firm is evaluated on the same simulated paths, which keeps the
+    comparison between firms fair and lets firms with identical rules share
+    one evaluation. Per path the challenge is passed when the cumulative
+    return reaches the profit target before breaching the maximum drawdown
+    (from the initial balance) or losing more than the daily drawdown in a
+    single day, within the time limit (``horizon`` days when unlimited).
+    The trader stops trading once the target is hit, but cannot pass before
+    the minimum trading days.
+
+    Paths are simulated in chunks of about ``chunk_cells`` (rule set x path
+    x day) cells. Raises TimeoutError once ``deadline`` (a ``time.time()``
+    value) passes, so abandoned work frees its worker instead of running to
+    completion. Takes and returns plain lists so it can run in a worker
+    process.
+    """
+    table = np.column_stack([np.asarray(rules[name], dtype=np.float64) for name in RULE_COLUMNS])
+    limits = np.where(table[:, 4] > 0, table[:, 4], horizon).astype(np.int64)
+    table[:, 4] = limits
+    unique, firm_rule = np.unique(table, axis=0, return_inverse=True)
+    firm_rule = firm_rule.reshape(-1)
+
+    days = int(limits.max()) if len(limits) else 0
+    rng = np.random.default_rng(seed)
+    chunk = max(1, chunk_cells // max(len(unique) * days, 1))
+    counts = {name: np.zeros(len(unique)) for name in ("passed", "drawdown", "daily", "timeout")}
+    pass_days: List[np.ndarray] = []
+    for start in range(0, paths, chunk):
+        if deadline is not None and time.time() > deadline:
+            raise TimeoutError(f"Simulation ran out of time after {start} of {paths} paths")
+        passed, drawdown, daily, days_to_pass = _simulate_chunk(unique, model.sample(rng, min(chunk, paths - start), days))
+        counts["passed"] += passed.sum(axis=1)
+        counts["drawdown"] += drawdown.sum(axis=1)
+        counts["daily"] += daily.sum(axis=1)
+        counts["timeout"] += (~passed & ~drawdown & ~daily).sum(axis=1)
+        pass_days.append(np.where(passed, days_to_pass, np.nan))
+
+    pass_probability = counts["passed"] / paths
+    with warnings.catch_warnings():
+        # All-NaN rows (rules nobody passes) have no median
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median_days = np.nanmedian(np.hstack(pass_days), axis=1) if pass_days else np.full(len(unique), np.nan)
+
+    per_rule = {
+        "pass_probability": pass_probability,
+        "standard_error": np.sqrt(pass_probability * (1 - pass_probability) / paths),
+        "drawdown_breach_probability": counts["drawdown"] / paths,
+        "daily_breach_probability": counts["daily"] / paths,
+        "timeout_probability": counts["timeout"] / paths,
+        "median_days_to_pass": median_days,
+    }
+    return {name: values[firm_rule].tolist() for name, values in per_rule.items()}
+
+
+def _simulate_chunk(unique: np.ndarray, returns: np.ndarray):
+    """Per (rule set, path): passed, failed on the maximum drawdown, failed on the daily drawdown, days to pass"""
+    days = returns.shape[1]
+    equity = np.cumsum(returns, axis=1)
+
+    target, max_dd, daily_dd, min_days, limit = (unique[:, i, None, None] for i in range(5))
+    day = np.arange(days)[None, None, :]
+    in_time = day < limit
+    hit = (equity[None] >= target) & in_time
+    breach = ((equity[None] <= -max_dd) | (returns[None] <= -daily_dd)) & in_time
+
+    never = days + 1
+    first_hit = np.where(hit.any(axis=2), hit.argmax(axis=2), never)
+    first_breach = np.where(breach.any(axis=2), breach.argmax(axis=2), never)
+    daily_breach = ((returns[None] <= -daily_dd) & in_time)
+    first_daily = np.where(daily_breach.any(axis=2), daily_breach.argmax(axis=2), never)
+
+    passed = first_hit < first_breach
+    failed = ~passed & (first_breach < never)
+    days_to_pass = np.maximum(first_hit + 1, min_days[:, :, 0])
+    return passed, failed & (first_daily != first_breach), failed & (first_daily == first_breach), days_to_pass
+
+
+def challenge_rules(columns: ColumnStore) -> Dict[str, List[float]]:
+    return {name: columns[name].tolist() for name in RULE_COLUMNS}
+
+
+def distinct_rule_sets(columns: ColumnStore, horizon: int) -> int:
+    table = np.column_stack([columns[name] for name in RULE_COLUMNS])
+    table[:, 4] = np.where(table[:, 4] > 0, table[:, 4], horizon)
+    return len(np.unique(table, axis=0)) if len(table) else 0
+
+
+def simulation_results(firms: List[Dict[str, Any]], results: Dict[str, List[float]]) -> List[Dict[str, Any]]:
+    """Per-firm result rows (``firms`` aligned with the simulated columns), most likely to pass first"""
+    rows = []
+    for i, firm in enumerate(firms):
+        row: Dict[str, Any] = {"firm_id": firm["id"], "firm_name": firm["name"]}
+        for name, values in results.items():
+            value = values[i]
+            row[name] = round(value, 4) if math.isfinite(value) else None
+        rows.append(row)
+    rows.sort(key=lambda row: -row["pass_probability"])
+    return rows
@@ -0,0 +1,76 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_PLATFORM = "MetaTrader 5"
+DEFAULT_HIGHEST_PAYOUT = 10000
+
+
+class StatisticsAccumulator:
+    """Running aggregates behind /api/statistics.
+
+    Firms are added and removed one at a time, so keeping the aggregates in
+    sync costs O(changed firms) and reading them is a dictionary lookup.
+    Minimum and maximum are kept as value multisets so a removal never needs
+    a rescan of the catalog.
+    """
+
+    def __init__(self):
+        self.total_firms = 0
+        self.profit_split_sum = 0
+        # Firms without a profit split are left out of its average, like $avg does
+        self.profit_split_count = 0
+        self.rating_sum = 0.0
+        self.platforms: Counter = Counter()
+        self.fees: Counter = Counter()
+        self.payouts: Counter = Counter()
+        self._snapshot: Optional[Dict[str, Any]] = None
+
+    def add(self, firm: Dict[str, Any]):
+        self._apply(firm, 1)
+
+    def remove(self, firm: Dict[str, Any]):
+        self._apply(firm, -1)
+
+    def replace(self, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        if old is not None:
+            self.remove(old)
+        if new is not None:
+            self.add(new)
+
+    def _apply(self, firm: Dict[str, Any], sign: int):
+        self.total_firms += sign
+        if firm["profit_split"]:
+            self.profit_split_sum += sign * firm["profit_split"][0]
+            self.profit_split_count += sign
+        self.rating_sum += sign * firm["rating"]
+        _update(self.platforms, firm["trading_platforms"], sign)
+        _update(self.fees, firm["evaluation_fee"].values(), sign)
+        if firm.get("maximum_payout") is not None:
+            _update(self.payouts, [firm["maximum_payout"]], sign)
+        self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current statistics, recomputed only after a change"""
+        if self._snapshot is None:
+            total = self.total_firms
+            self._snapshot = {
+                "total_firms": total,
+                "avg_profit_split": (
+                    round(self.profit_split_sum / self.profit_split_count, 1) if self.profit_split_count else 0
+                ),
+                "avg_rating": round(self.rating_sum / total, 1) if total else 0,
+                "most_popular_platform": (
+                    min(self.platforms, key=lambda name: (-self.platforms[name], name))
+                    if self.platforms else DEFAULT_PLATFORM
+                ),
+                "lowest_evaluation_fee": min(self.fees) if self.fees else 0,
+                "highest_payout": max(self.payouts) if self.payouts else DEFAULT_HIGHEST_PAYOUT,
+            }
+        return self._snapshot
+
+
+def _update(counter: Counter, values: Iterable[Any], sign: int):
+    for value in values:
+        counter[value] += sign
+        if counter[value] <= 0:
+            del counter[value]
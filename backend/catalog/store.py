@@ -0,0 +1,303 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .columns import ColumnStore
+from .costs import cost_table
+from .facets import facet_counts
+from .fees import FeeTable, attach_firms, check_account_sizes
+from .http_cache import render_json
+from .index import FilterIndex
+from .pagination import Cursor, FirmSort, SortIndexes
+from .query import FirmFilters
+from .search import FuzzySearchIndex, SuggestionIndex
+from .similarity import SimilarityIndex
+from .stats import StatisticsAccumulator
+
+logger = logging.getLogger(__name__)
+
+
+def validate_firm(document: Dict[str, Any], model: Callable[..., Any]) -> Optional[Dict[str, Any]]:
+    """A stored firm document validated through ``model``; None (logged) when it cannot be served"""
+    try:
+        firm = model(**{key: value for key, value in document.items() if key != "_id"}).dict()
+        # The columns, fee table and similarity index parse these keys; one bad firm must not fail the build
+        check_account_sizes(firm["evaluation_fee"])
+        return firm
+    except Exception as e:
+        logger.warning(f"Skipping invalid firm document {document.get('id')}: {e}")
+        return None
+
+
+def valid_firms(documents: Sequence[Dict[str, Any]],
+                model: Callable[..., Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """The servable documents and their validated firms, skipping the rest exactly as the catalog does"""
+    kept, firms = [], []
+    for document in documents:
+        firm = validate_firm(document, model)
+        if firm is not None:
+            kept.append(document)
+            firms.append(firm)
+    return kept, firms
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable, fully validated copy of the prop firm collection"""
+    firms: Tuple[Dict[str, Any], ...] = ()
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Pre-encoded JSON of every firm, aligned with ``firms``
+    encoded: Tuple[bytes, ...] = ()
+    positions: Dict[str, int] = field(default_factory=dict)
+    index: FilterIndex = field(default_factory=lambda: FilterIndex.build(()))
+    suggestions: SuggestionIndex = field(default_factory=lambda: SuggestionIndex(()))
+    search: FuzzySearchIndex = field(default_factory=lambda: FuzzySearchIndex(()))
+    columns: ColumnStore = field(default_factory=lambda: ColumnStore.build(()))
+    sorts: SortIndexes = field(default_factory=lambda: SortIndexes(ColumnStore.build(()), ()))
+    fees: FeeTable = field(default_factory=lambda: FeeTable.build(()))
+    similarity: SimilarityIndex = field(default_factory=lambda: SimilarityIndex.build(()))
+    version: int = 0
+    # Lazily filled pre-encoded firms per sparse field selection
+    projected: Dict[Tuple[str, ...], Tuple[bytes, ...]] = field(default_factory=dict)
+
+    # Distinct field selections kept encoded; rarer ones are encoded per request
+    MAX_PROJECTIONS = 16
+
+    def encode(self, position: int, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """Pre-encoded JSON of one firm, restricted to ``fields`` when given"""
+        if fields is None:
+            return self.encoded[position]
+        encoded = self.projected.get(fields)
+        if encoded is None:
+            if len(self.projected) >= self.MAX_PROJECTIONS:
+                firm = self.firms[position]
+                return render_json({name: firm[name] for name in fields})
+            encoded = tuple(render_json({name: firm[name] for name in fields}) for firm in self.firms)
+            self.projected[fields] = encoded
+        return encoded[position]
+
+
+class CatalogStore:
+    """In-process catalog of prop firms backed by a MongoDB collection.
+
+    Mongo remains the source of truth: the store only ever reads from it,
+    validates every document once through ``model`` and swaps in a new
+    snapshot atomically, so readers never see a half-built catalog.
+    """
+
+    def __init__(self, collection, model: Callable[..., Any]):
+        self._collection = collection
+        self._model = model
+        self._snapshot = CatalogSnapshot()
+        self._lock = asyncio.Lock()
+        self.statistics = StatisticsAccumulator()
+        self.loaded = False
+        self._pending_reload: Optional[asyncio.Task] = None
+        self._listeners: List[Callable[[CatalogSnapshot, CatalogSnapshot], None]] = []
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    async def load(self) -> CatalogSnapshot:
+        """(Re)load the whole collection from MongoDB"""
+        async with self._lock:
+            # ``_id`` order is the default listing order and the tiebreaker of every sort
+            documents = await self._collection.find({}).sort("_id", 1).to_list(length=None)
+            # Validation and index builds are CPU bound; keep them off the event loop
+            loop = asyncio.get_running_loop()
+            previous = self._snapshot
+            self._publish(previous, await loop.run_in_executor(None, self._build, documents, previous.version + 1))
+            self.loaded = True
+            logger.info(f"Catalog loaded {len(self._snapshot.firms)} firms (version {self._snapshot.version})")
+            return self._snapshot
+
+    def add_listener(self, listener: Callable[[CatalogSnapshot, CatalogSnapshot], None]):
+        """Call ``listener(previous, current)`` on the event loop whenever a new snapshot is published"""
+        self._listeners.append(listener)
+
+    def _publish(self, previous: CatalogSnapshot, snapshot: CatalogSnapshot):
+        self._snapshot = snapshot
+        self._update_statistics(previous, snapshot)
+        for listener in self._listeners:
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error(f"Catalog listener failed on version {snapshot.version}: {e}")
+
+    def schedule_reload(self, delay: float = 1.0):
+        """Reload in ``delay`` seconds; every request made until then is served by that one reload"""
+        if self._pending_reload is None or self._pending_reload.done():
+            self._pending_reload = asyncio.ensure_future(self._reload_after(delay))
+
+    async def _reload_after(self, delay: float):
+        await asyncio.sleep(delay)
+        # Writes from here on need a later reload: this one may have read past them already
+        self._pending_reload = None
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"Catalog reload failed, still serving version {self.version}: {e}")
+
+    async def apply_changes(self, documents: List[Dict[str, Any]], removed: Sequence[str] = ()) -> bool:
+        """Patch the catalog with changed documents (as stored, with ``_id``) and removed ``_id`` values.
+
+        Only the given documents are validated and encoded; every other firm
+        is carried over from the current snapshot. Documents identical to
+        what is already served are ignored. Returns whether a new version
+        was published.
+        """
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            previous = self._snapshot
+            snapshot = await loop.run_in_executor(None, self._patch, previous, documents, removed)
+            if snapshot is None:
+                return False
+            self._publish(previous, snapshot)
+            logger.info(
+                f"Catalog patched with {len(documents)} changed and {len(removed)} removed firms "
+                f"(version {snapshot.version})"
+            )
+            return True
+
+    def _build(self, documents: List[Dict[str, Any]], version: int) -> CatalogSnapshot:
+        documents, firms = valid_firms(documents, self._model)
+        object_ids = [str(document["_id"]) for document in documents]
+        return self._assemble(firms, object_ids, [render_json(firm) for firm in firms], version)
+
+    def _patch(self, previous: CatalogSnapshot, documents: List[Dict[str, Any]],
+               removed: Sequence[str]) -> Optional[CatalogSnapshot]:
+        entries = {
+            object_id: (firm, encoded)
+            for object_id, firm, encoded in zip(previous.sorts.object_ids, previous.firms, previous.encoded)
+        }
+        changed = False
+        for object_id in removed:
+            changed |= entries.pop(str(object_id), None) is not None
+        for document in documents:
+            object_id = str(document["_id"])
+            firm = validate_firm(document, self._model)
+            if firm is None:
+                changed |= entries.pop(object_id, None) is not None
+            elif object_id not in entries or entries[object_id][0] != firm:
+                entries[object_id] = (firm, render_json(firm))
+                changed = True
+        if not changed:
+            return None
+
+        # Same ``_id`` order as a full load (ObjectId hex strings sort like the ids themselves)
+        object_ids = sorted(entries)
+        firms = [entries[object_id][0] for object_id in object_ids]
+        encoded = [entries[object_id][1] for object_id in object_ids]
+        return self._assemble(firms, object_ids, encoded, previous.version + 1)
+
+    def _assemble(self, firms: List[Dict[str, Any]], object_ids: List[str], encoded: List[bytes],
+                  version: int) -> CatalogSnapshot:
+        columns = ColumnStore.build(firms)
+        return CatalogSnapshot(
+            firms=tuple(firms),
+            by_id={firm["id"]: firm for firm in firms},
+            encoded=tuple(encoded),
+            positions={firm["id"]: position for position, firm in enumerate(firms)},
+            index=FilterIndex.build(firms),
+            suggestions=SuggestionIndex(firms),
+            search=FuzzySearchIndex(firms),
+            columns=columns,
+            sorts=SortIndexes(columns, object_ids),
+            fees=FeeTable.build(firms),
+            similarity=SimilarityIndex.build(firms),
+            version=version,
+        )
+
+    def _update_statistics(self, previous: CatalogSnapshot, current: CatalogSnapshot):
+        """Apply only the firms that changed between two snapshots to the running statistics"""
+        for firm_id, firm in previous.by_id.items():
+            if firm_id not in current.by_id:
+                self.statistics.remove(firm)
+        for firm_id, firm in current.by_id.items():
+            old = previous.by_id.get(firm_id)
+            if old != firm:
+                self.statistics.replace(old, firm)
+
+    def query(self, filters: FirmFilters, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return firms matching ``filters`` in collection order"""
+        snapshot = self._snapshot
+        positions = snapshot.index.members(snapshot.index.resolve(filters), limit)
+        return [snapshot.firms[position] for position in positions]
+
+    def page_json(self, filters: FirmFilters, sort: FirmSort, cursor: Optional[Cursor], limit: int,
+                  fields: Optional[Tuple[str, ...]] = None) -> Tuple[bytes, Optional[Cursor]]:
+        """One keyset page of matching firms as a JSON array built from pre-encoded firms.
+
+        ``fields`` restricts every firm to a sparse field selection. Returns
+        the body and the cursor of the next page (None on the last page).
+        """
+        snapshot = self._snapshot
+        mask = snapshot.index.mask(snapshot.index.resolve(filters))
+        positions = snapshot.sorts.page(mask, sort, cursor, limit + 1)
+        next_cursor = snapshot.sorts.cursor_after(positions[limit - 1], sort) if len(positions) > limit else None
+        body = b"[" + b",".join(snapshot.encode(position, fields) for position in positions[:limit]) + b"]"
+        return body, next_cursor
+
+    def facets(self, filters: FirmFilters) -> Dict[str, Any]:
+        """Per-value firm counts for the filter sidebar under ``filters``"""
+        return facet_counts(self._snapshot.index, filters)
+
+    def cheapest_challenges(self, filters: FirmFilters, **query) -> List[Dict[str, Any]]:
+        """Cheapest evaluation rows (see :meth:`FeeTable.cheapest`) among firms matching ``filters``"""
+        snapshot = self._snapshot
+        members = snapshot.index.mask(snapshot.index.resolve(filters)) if filters.active() else None
+        return attach_firms(snapshot.fees.cheapest(members=members, **query), snapshot.firms)
+
+    def funding_costs(self, filters: FirmFilters, min_size: Optional[int], max_size: Optional[int],
+                      **model) -> Dict[str, Any]:
+        """Ranked expected cost of funding (see :func:`cost_table`) for every matching firm and account size"""
+        snapshot = self._snapshot
+        members = snapshot.index.mask(snapshot.index.resolve(filters)) if filters.active() else None
+        rows = snapshot.fees.select(min_size, max_size, members=members)
+        table = cost_table(snapshot.fees, snapshot.columns, rows, **model)
+        attach_firms(table["results"], snapshot.firms)
+        return table
+
+    def challenge_columns(self, filters: FirmFilters) -> Tuple[List[Dict[str, Any]], ColumnStore]:
+        """Matching firms in catalog order with their aligned column store rows (e.g. for the simulator)"""
+        snapshot = self._snapshot
+        positions = snapshot.index.members(snapshot.index.resolve(filters))
+        return [snapshot.firms[position] for position in positions], snapshot.columns.take(positions)
+
+    def similar(self, firm_id: str, filters: FirmFilters,
+                limit: int = 5) -> Optional[List[Tuple[Dict[str, Any], float]]]:
+        """``(firm, similarity)`` pairs of the matching firms closest to ``firm_id``; None for an unknown firm"""
+        snapshot = self._snapshot
+        position = snapshot.positions.get(firm_id)
+        if position is None:
+            return None
+        members = snapshot.index.mask(snapshot.index.resolve(filters)) if filters.active() else None
+        return [(snapshot.firms[other], score) for other, score in snapshot.similarity.similar(position, limit, members)]
+
+    def suggest(self, q: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Return the best typeahead matches for ``q``, best first"""
+        snapshot = self._snapshot
+        return [snapshot.firms[position] for position in snapshot.suggestions.suggest(q, limit)]
+
+    def search(self, q: str, limit: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """Return ``(firm, score)`` pairs for a fuzzy full text query, best first"""
+        snapshot = self._snapshot
+        return [(snapshot.firms[position], score) for position, score in snapshot.search.search(q, limit)]
+
+    def get(self, firm_id: str) -> Optional[Dict[str, Any]]:
+        return self._snapshot.by_id.get(firm_id)
+
+    def get_json(self, firm_id: str, fields: Optional[Tuple[str, ...]] = None) -> Optional[bytes]:
+        position = self._snapshot.positions.get(firm_id)
+        return self._snapshot.encode(position, fields) if position is not None else None
+
+    def get_many(self, firm_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Look up several firms at once, aligned with ``firm_ids`` (None when unknown)"""
+        by_id = self._snapshot.by_id
+        return [by_id.get(firm_id) for firm_id in firm_ids]
@@ -0,0 +1,13 @@
+import re
+import unicodedata
+from functools import lru_cache
+
+_COMBINING_RE = re.compile("[\u0300-\u036f]")
+
+
+@lru_cache(maxsize=65536)
+def fold(text: str) -> str:
+    """Lowercase and strip accents so "Rápido" and "rapido" compare equal"""
+    if text.isascii():
+        return text.lower()
+    return _COMBINING_RE.sub("", unicodedata.normalize("NFKD", text)).casefold()
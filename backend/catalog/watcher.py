@@ -0,0 +1,208 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo.errors import OperationFailure
+
+from .store import CatalogStore
+
+logger = logging.getLogger(__name__)
+
+WATCH_MODES = ("auto", "change_stream", "poll", "off")
+
+# Change stream errors meaning the resume token can no longer be used
+_HISTORY_LOST_CODES = {136, 280, 286}
+
+
+class CatalogWatcher:
+    """Keeps a :class:`CatalogStore` in line with its collection, whichever process wrote to it.
+
+    Every worker runs one watcher. With a replica set it follows a change
+    stream; against a standalone mongod (no change streams) it polls the
+    ``(_id, updated_at)`` pair of every firm, a covered read of the
+    poll_updated_at index, and fetches the firms whose pair is new, gone or
+    different. A stamp that moved backwards (a writer with a slow clock)
+    counts as a change like any other. Either way changed firms are
+    fetched by themselves and patched into the catalog, which publishes a
+    new version and with it invalidates cached responses, indexes and
+    statistics.
+
+    Edits that bypass ``updated_at`` are only seen by change streams; in
+    polling mode a periodic full comparison (``full_reload_interval``)
+    bounds how long they can go unnoticed.
+    """
+
+    def __init__(self, store: CatalogStore, collection, mode: str = "auto", poll_interval: float = 5.0,
+                 batch_delay: float = 0.2, full_reload_interval: float = 60.0):
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown watch mode '{mode}', expected one of: {', '.join(WATCH_MODES)}")
+        self._store = store
+        self._collection = collection
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.batch_delay = batch_delay
+        self.full_reload_interval = full_reload_interval
+        self._stream = None
+        # Event consumed while opening the stream, handed over to _follow
+        self._backlog: List[Dict[str, Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        # "change_stream" or "poll" once started
+        self.active: Optional[str] = None
+
+    async def start(self):
+        """Open the change stream (or note the poll watermark), load the catalog, then follow changes.
+
+        The stream is opened before the initial load so no write can fall
+        between the two.
+        """
+        if self.mode == "off":
+            await self._store.load()
+            return
+        if self.mode in ("auto", "change_stream"):
+            try:
+                self._stream = await self._open_stream(None)
+                self.active = "change_stream"
+            except Exception as e:
+                if self.mode == "change_stream":
+                    raise
+                logger.info(f"Change streams unavailable ({e}); polling every {self.poll_interval}s instead")
+        if self.active is None:
+            self.active = "poll"
+            stamps = await self._poll_state()
+            await self._store.load()
+            self._task = asyncio.ensure_future(self._poll(stamps))
+        else:
+            await self._store.load()
+            self._task = asyncio.ensure_future(self._follow())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self._stream is not None:
+            await self._stream.close()
+            self._stream = None
+        self.active = None
+
+    async def _open_stream(self, resume_token):
+        stream = self._collection.watch(
+            full_document="updateLookup",
+            resume_after=resume_token,
+            max_await_time_ms=int(self.batch_delay * 1000),
+        )
+        # Run the aggregate now so an unsupported deployment fails here rather than on first use
+        first = await stream.try_next()
+        if first is not None:
+            self._backlog.append(first)
+        return stream
+
+    async def _follow(self):
+        """Apply change events in batches: whatever arrived until the stream has been idle for ``batch_delay``"""
+        backoff = 1.0
+        pending, self._backlog = self._backlog, []
+        while True:
+            try:
+                change = await self._stream.try_next()
+                backoff = 1.0
+                if change is not None:
+                    pending.append(change)
+                    if len(pending) < 1000:
+                        continue
+                if pending:
+                    events, pending = pending, []
+                    try:
+                        applied = await self._apply_events(events)
+                    except Exception:
+                        # Already consumed from the stream: apply them again once it is reopened
+                        pending = events
+                        raise
+                    if not applied:
+                        # The stream ended (collection dropped or renamed): reload and watch afresh
+                        await self._reopen(None)
+                        pending, self._backlog = self._backlog, []
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                token = self._stream.resume_token if self._stream is not None else None
+                if isinstance(e, OperationFailure) and e.code in _HISTORY_LOST_CODES:
+                    token = None
+                logger.warning(f"Catalog change stream failed ({e}); reopening in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+                try:
+                    await self._reopen(token)
+                    # Without a token the store was reloaded from scratch, which already holds what was pending
+                    pending, self._backlog = (pending if token is not None else []) + self._backlog, []
+                except Exception as reopen_error:
+                    logger.warning(f"Could not reopen catalog change stream: {reopen_error}")
+
+    async def _reopen(self, token):
+        if self._stream is not None:
+            await self._stream.close()
+            self._stream = None
+        self._stream = await self._open_stream(token)
+        if token is None:
+            # Events since the last one seen are gone; start over from a full load
+            await self._store.load()
+
+    async def _apply_events(self, events: List[Dict[str, Any]]) -> bool:
+        """Patch the catalog with a batch of events; False when the stream has to be restarted"""
+        documents: Dict[str, Dict[str, Any]] = {}
+        removed: Set[str] = set()
+        for event in events:
+            operation = event["operationType"]
+            if operation in ("drop", "rename", "dropDatabase", "invalidate"):
+                return False
+            object_id = str(event["documentKey"]["_id"])
+            document = event.get("fullDocument")
+            if operation == "delete" or document is None:
+                # A looked-up document is None when it was deleted before the lookup
+                documents.pop(object_id, None)
+                removed.add(object_id)
+            else:
+                removed.discard(object_id)
+                documents[object_id] = document
+        await self._store.apply_changes(list(documents.values()), sorted(removed))
+        return True
+
+    async def _resync(self):
+        """Compare the whole collection with the catalog; a new version is only published for differences"""
+        documents = await self._collection.find({}).to_list(length=None)
+        stored = {str(document["_id"]) for document in documents}
+        removed = [object_id for object_id in self._store.snapshot.sorts.object_ids if object_id not in stored]
+        await self._store.apply_changes(documents, removed)
+
+    async def _poll_state(self) -> Dict[Any, Any]:
+        """``updated_at`` of every stored firm by ``_id``, read from the poll_updated_at index alone"""
+        cursor = self._collection.find({}, {"_id": 1, "updated_at": 1}).sort([("updated_at", -1), ("_id", 1)])
+        return {document["_id"]: document.get("updated_at") async for document in cursor}
+
+    async def _poll(self, stamps: Dict[Any, Any]):
+        loop = asyncio.get_running_loop()
+        next_full_reload = loop.time() + self.full_reload_interval
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if loop.time() >= next_full_reload:
+                    stamps = await self._poll_state()
+                    await self._resync()
+                    next_full_reload = loop.time() + self.full_reload_interval
+                    continue
+
+                current = await self._poll_state()
+                changed = [object_id for object_id, stamp in current.items()
+                           if object_id not in stamps or stamps[object_id] != stamp]
+                removed = [str(object_id) for object_id in stamps if object_id not in current]
+                if changed or removed:
+                    documents = await self._collection.find({"_id": {"$in": changed}}).to_list(length=None) if changed else []
+                    await self._store.apply_changes(documents, removed)
+                # Only advanced once applied, so a failed poll is retried in full
+                stamps = current
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Catalog poll failed: {e}")
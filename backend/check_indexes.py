@@ -0,0 +1,54 @@
+"""Create the managed indexes and verify that no endpoint query scans the whole collection.
+
+Usage:
+    python check_indexes.py            # ensure indexes, explain every query shape
+    python check_indexes.py --no-create
+
+Exits with status 1 when any query shape's winning plan is a COLLSCAN, a
+filtered shape is only served by the ``_id_`` index, or a shape examines
+far more documents than it returns. Run it against representative data:
+on a near-empty collection every ratio looks fine.
+"""
+import argparse
+import asyncio
+import sys
+
+from server import catalog, client, db
+
+
+async def main(create: bool, max_examined_ratio: float) -> int:
+    try:
+        if create:
+            created = await catalog.ensure_indexes(db.prop_firms)
+            print(f"Indexes in place: {', '.join(created)}")
+        shapes = catalog.firm_query_shapes()
+        plans = await catalog.explain_shapes(db.prop_firms, shapes)
+    finally:
+        client.close()
+
+    width = max(len(name) for name in plans)
+    for shape in shapes:
+        plan = plans[shape.name]
+        accepted = f"  (accepted scan: {shape.accepted_scan})" if shape.accepted_scan else ""
+        print(
+            f"{shape.name.ljust(width)}  {plan.docs_examined}/{plan.returned} docs  "
+            f"{', '.join(sorted(plan.stages))}  [{', '.join(sorted(plan.indexes))}]{accepted}"
+        )
+
+    problems = catalog.inefficient_shapes(shapes, plans, max_examined_ratio)
+    if problems:
+        print()
+        for name, found in problems.items():
+            print(f"{name}: {'; '.join(found)}")
+        return 1
+    print("\nEvery query shape is served by an index")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ensure MongoDB indexes and check query plans")
+    parser.add_argument("--no-create", dest="create", action="store_false", help="only explain, do not create indexes")
+    parser.add_argument("--max-examined-ratio", type=float, default=3.0,
+                        help="most documents examined per document returned (default 3)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.create, args.max_examined_ratio)))
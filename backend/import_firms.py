@@ -0,0 +1,35 @@
+"""Stream a firm catalog from an NDJSON or CSV file into MongoDB.
+
+Usage:
+    python import_firms.py firms.ndjson
+    python import_firms.py firms.csv --format csv --batch-size 1000
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from server import PropFirm, catalog, client, db
+
+
+async def main(path: str, file_format: str, batch_size: int) -> int:
+    lines = catalog.iter_lines(catalog.iter_file_chunks(path))
+    rows = catalog.rows_from_lines(lines, file_format, PropFirm)
+    try:
+        report = await catalog.import_firms(db.prop_firms, rows, PropFirm, batch_size=batch_size)
+    finally:
+        client.close()
+
+    print(json.dumps(report.as_dict(), indent=2, ensure_ascii=False))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import prop firms from an NDJSON or CSV file")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=catalog.IMPORT_FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    sys.exit(asyncio.run(main(args.path, file_format, args.batch_size)))
@@ -1,15 +1,28 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Query
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from bson.errors import InvalidId
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
 import os
+import secrets
+import time
 import uuid
 import logging
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    from . import catalog
+except ImportError:
+    import catalog
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -19,6 +32,38 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
+# In-memory catalog; set CATALOG_CACHE_ENABLED=false to query MongoDB on every request
+CATALOG_CACHE_ENABLED = os.environ.get('CATALOG_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Largest number of firms accepted by /api/firms/compare and /api/firms/compare/matrix
+MAX_COMPARE_FIRMS = int(os.environ.get('MAX_COMPARE_FIRMS', '4'))
+MAX_COMPARE_MATRIX_FIRMS = int(os.environ.get('MAX_COMPARE_MATRIX_FIRMS', '50'))
+
+# Serialize documents we wrote ourselves without re-validating them through PropFirm
+TRUSTED_READS = os.environ.get('TRUSTED_READS', 'true').lower() == 'true'
+
+# Cache-Control sent with cacheable read endpoints (also honored by nginx)
+API_CACHE_CONTROL = os.environ.get('API_CACHE_CONTROL', 'public, max-age=30, stale-while-revalidate=120')
+
+# How every worker keeps its catalog current: auto (change streams, else polling), change_stream, poll or off
+CATALOG_WATCH = os.environ.get('CATALOG_WATCH', 'auto').lower()
+CATALOG_POLL_INTERVAL = float(os.environ.get('CATALOG_POLL_INTERVAL', '5'))
+
+# /api/catalog/events: seconds between keep-alive comments and most concurrent clients per worker
+EVENTS_HEARTBEAT = float(os.environ.get('EVENTS_HEARTBEAT', '15'))
+EVENTS_MAX_CLIENTS = int(os.environ.get('EVENTS_MAX_CLIENTS', '10000'))
+
+# Without a watcher: seconds to wait before reloading the catalog after a review, so bursts share one reload
+CATALOG_RELOAD_DELAY = float(os.environ.get('CATALOG_RELOAD_DELAY', '2'))
+
+# Shared secret for /api/admin endpoints; the admin API is disabled when unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+# Monte Carlo simulator: worker processes, largest (rule set x path x day) array per request, time budget
+SIMULATION_WORKERS = int(os.environ.get('SIMULATION_WORKERS', '2'))
+SIMULATION_MAX_CELLS = int(os.environ.get('SIMULATION_MAX_CELLS', '20000000'))
+SIMULATION_TIMEOUT = float(os.environ.get('SIMULATION_TIMEOUT', '15'))
+
 # Create FastAPI app
 app = FastAPI(title="Prop Firm Comparison API", version="1.0.0")
 api_router = APIRouter(prefix="/api")
@@ -30,6 +75,7 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Link", "X-Next-Cursor"],
 )
 
 # Pydantic Models
@@ -77,6 +123,42 @@ class SearchSuggestion(BaseModel):
     query: str
     suggestions: List[str]
 
+class SearchHit(BaseModel):
+    score: float
+    firm: PropFirm
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+
+class SimilarFirms(BaseModel):
+    firm_id: str
+    results: List[SearchHit]
+
+class ReviewCreate(BaseModel):
+    rating: int = Field(..., ge=1, le=5)
+    author_name: str = Field(..., min_length=1, max_length=80)
+    title: Optional[str] = Field(None, max_length=120)
+    comment: str = Field("", max_length=4000)
+
+class Review(ReviewCreate):
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    firm_id: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ReviewSummary(BaseModel):
+    firm_id: str
+    rating: float
+    total_reviews: int
+    user_reviews: int
+    user_average: Optional[float]
+    histogram: Dict[str, int]
+
+class ReviewPage(BaseModel):
+    summary: ReviewSummary
+    reviews: List[Review]
+    next_cursor: Optional[str]
+
 class Statistics(BaseModel):
     total_firms: int
     avg_profit_split: float
@@ -85,6 +167,147 @@ class Statistics(BaseModel):
     lowest_evaluation_fee: int
     highest_payout: int
 
+catalog_store = catalog.CatalogStore(db.prop_firms, PropFirm)
+catalog_watcher = catalog.CatalogWatcher(catalog_store, db.prop_firms, CATALOG_WATCH, CATALOG_POLL_INTERVAL)
+catalog_events = catalog.CatalogEvents()
+catalog_store.add_listener(catalog_events.on_publish)
+
+def catalog_ready() -> bool:
+    return CATALOG_CACHE_ENABLED and catalog_store.loaded
+
+def catalog_changed():
+    """Local write to prop_firms: reload unless the watcher is going to pick it up anyway"""
+    if CATALOG_CACHE_ENABLED and not catalog_watcher.active:
+        catalog_store.schedule_reload(CATALOG_RELOAD_DELAY)
+
+response_cache = catalog.ResponseCache()
+
+_simulation_pool: Optional[ProcessPoolExecutor] = None
+
+def simulation_pool() -> ProcessPoolExecutor:
+    """Worker processes for CPU-bound simulations, started on first use.
+
+    Spawned rather than forked so workers never inherit the event loop or
+    the Mongo client's sockets.
+    """
+    global _simulation_pool
+    if _simulation_pool is None:
+        _simulation_pool = ProcessPoolExecutor(SIMULATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _simulation_pool
+
+async def cached_json(request: Request, key, build):
+    """Serve ``build()`` as JSON with a strong ETag, honoring If-None-Match.
+
+    ``build()`` returns the payload, or a ``(payload, headers)`` pair when the
+    representation carries headers of its own. With the catalog loaded the
+    encoded response is cached per key and catalog version, so repeat
+    requests skip both the lookup and the serialization.
+    """
+    async def render():
+        result = await build()
+        payload, headers = result if isinstance(result, tuple) else (result, None)
+        return encode_payload(payload), headers
+
+    if catalog_ready():
+        version = catalog_store.version
+        entry = response_cache.get(key, version)
+        if entry is None:
+            entry = response_cache.put(key, version, *await render())
+    else:
+        entry = catalog.CachedResponse.for_body(*await render())
+    return catalog.conditional_response(request, entry, API_CACHE_CONTROL)
+
+def encode_payload(payload) -> bytes:
+    # Pre-encoded bodies (trusted catalog reads) are passed through untouched
+    return payload if isinstance(payload, bytes) else catalog.render_json(payload)
+
+def trusted_firm(document: Dict[str, Any], fields=None) -> Dict[str, Any]:
+    """Shape a stored firm document like PropFirm without re-validating it"""
+    return {name: document.get(name) for name in fields or PropFirm.model_fields}
+
+def firm_payload(document: Dict[str, Any], fields=None):
+    """A stored firm as returned by the firm endpoints, restricted to ``fields`` when given"""
+    if TRUSTED_READS:
+        return trusted_firm(document, fields)
+    firm = PropFirm(**document)
+    return firm if fields is None else {name: getattr(firm, name) for name in fields}
+
+def firm_projection(fields, *extra):
+    # Untrusted reads validate whole documents, so only trusted reads are projected
+    return catalog.mongo_projection(fields, *extra) if TRUSTED_READS else None
+
+def parse_fields(fields: Optional[str]):
+    try:
+        return catalog.parse_fields(fields, list(PropFirm.model_fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="Admin API is disabled")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+async def fetch_firms_by_ids(firm_ids: List[str]):
+    """Resolve firm ids in one batch, preserving the requested order.
+
+    Returns the found firms and the ids that do not exist. Served from the
+    catalog when it is warm, otherwise with a single $in query.
+    """
+    firm_ids = list(dict.fromkeys(firm_ids))
+    if catalog_ready():
+        found = catalog_store.get_many(firm_ids)
+    else:
+        cursor = db.prop_firms.find({"id": {"$in": firm_ids}}, {"_id": 0})
+        _, valid = catalog.valid_firms(await cursor.to_list(length=len(firm_ids)), PropFirm)
+        by_id = {firm["id"]: firm for firm in valid}
+        found = [by_id.get(firm_id) for firm_id in firm_ids]
+
+    firms = [firm for firm in found if firm is not None]
+    missing_ids = [firm_id for firm_id, firm in zip(firm_ids, found) if firm is None]
+    return firms, missing_ids
+
+async def fetch_firms_page(filters: catalog.FirmFilters, firm_sort: catalog.FirmSort,
+                           after: Optional[catalog.Cursor], limit: int, fields=None):
+    """Keyset page straight from MongoDB, walking the compound sort index"""
+    if firm_sort.weights is not None:
+        return await fetch_ranked_page(filters, firm_sort, after, limit, fields)
+    query = filters.to_mongo()
+    if after is not None:
+        try:
+            object_id = ObjectId(after.object_id)
+        except InvalidId:
+            object_id = after.object_id
+        query = {"$and": [query, catalog.mongo_after(after, object_id)]}
+
+    projection = firm_projection(fields, firm_sort.field)
+    cursor = db.prop_firms.find(query, projection).sort(catalog.mongo_sort(firm_sort)).limit(limit + 1)
+    documents = await cursor.to_list(length=limit + 1)
+    next_cursor = None
+    if len(documents) > limit:
+        last = documents[limit - 1]
+        value = last.get(firm_sort.field) if firm_sort.field else None
+        next_cursor = catalog.Cursor(firm_sort, value, str(last["_id"]))
+
+    return [firm_payload(firm, fields) for firm in documents[:limit]], next_cursor
+
+async def fetch_ranked_page(filters: catalog.FirmFilters, firm_sort: catalog.FirmSort,
+                            after: Optional[catalog.Cursor], limit: int, fields=None):
+    """Weighted ranking page without the catalog.
+
+    Scores are relative to the whole collection, so every firm is loaded and
+    ranked in memory exactly as the catalog would.
+    """
+    documents, firms = catalog.valid_firms(await db.prop_firms.find({}).sort("_id", 1).to_list(length=None), PropFirm)
+    object_ids = [str(document["_id"]) for document in documents]
+    matching = set(await db.prop_firms.distinct("id", filters.to_mongo())) if filters.active() else None
+    mask = [matching is None or firm["id"] in matching for firm in firms]
+
+    sorts = catalog.SortIndexes(catalog.ColumnStore.build(firms), object_ids)
+    positions = sorts.page(mask, firm_sort, after, limit + 1)
+    next_cursor = sorts.cursor_after(positions[limit - 1], firm_sort) if len(positions) > limit else None
+    return [firm_payload(documents[position], fields) for position in positions[:limit]], next_cursor
+
 # Sample prop firm data
 PROP_FIRMS_DATA = [
     {
@@ -296,119 +519,458 @@ PROP_FIRMS_DATA = [
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database with prop firms data"""
+    """Sync the seed prop firms into the database and load the catalog"""
+    seed_lock = catalog.MongoLock(db.locks, "seed_prop_firms")
     try:
-        # Clear existing data to update with Spanish content
-        await db.prop_firms.delete_many({})
-        
-        # Add unique IDs and insert firms
-        firms_with_ids = []
-        for firm_data in PROP_FIRMS_DATA:
-            firm = PropFirm(**firm_data)
-            firms_with_ids.append(firm.dict())
-        
-        await db.prop_firms.insert_many(firms_with_ids)
-        logging.info(f"Seeded database with {len(firms_with_ids)} Spanish prop firms")
+        # Only one worker seeds; the others wait for it before loading the catalog
+        if await seed_lock.acquire():
+            try:
+                report = await catalog.sync_firms(db.prop_firms, PROP_FIRMS_DATA, PropFirm)
+                logging.info(
+                    f"Seed sync: {report.inserted} inserted, {report.updated} updated, "
+                    f"{report.unchanged} unchanged"
+                )
+            finally:
+                await seed_lock.release()
+        elif not await seed_lock.wait_released():
+            logging.warning("Timed out waiting for another worker to seed the database")
+        await catalog.ensure_indexes(db.prop_firms)
+        await catalog.ensure_indexes(db.reviews, catalog.REVIEW_INDEXES)
     except Exception as e:
         logging.error(f"Error initializing database: {e}")
 
-# API Routes
-@api_router.get("/")
-async def root():
-    return {"message": "Prop Firm Comparison API", "version": "1.0.0"}
+    if CATALOG_CACHE_ENABLED:
+        try:
+            await catalog_watcher.start()
+        except Exception as e:
+            logging.error(f"Error loading catalog, falling back to MongoDB queries: {e}")
 
-@api_router.get("/firms", response_model=List[PropFirm])
-async def get_firms(
+def firm_filters(
     min_account_size: Optional[int] = Query(None),
     max_account_size: Optional[int] = Query(None),
     platform: Optional[str] = Query(None),
+    instrument: Optional[str] = Query(None),
     min_profit_split: Optional[int] = Query(None),
     payout_frequency: Optional[str] = Query(None),
     news_trading: Optional[bool] = Query(None),
     expert_advisors: Optional[bool] = Query(None),
+    scaling_plan: Optional[bool] = Query(None),
+    weekend_holding: Optional[bool] = Query(None),
+    copy_trading: Optional[bool] = Query(None),
     min_rating: Optional[float] = Query(None),
-    limit: int = Query(50, le=100)
+    max_monthly_fee: Optional[int] = Query(None),
+    max_evaluation_fee: Optional[int] = Query(None, description="Cheapest challenge at or below this price"),
+    country: Optional[str] = Query(None, description="Only firms that accept traders from this country (ISO code or name)"),
+) -> catalog.FirmFilters:
+    """Filter query parameters shared by /firms and /firms/facets"""
+    try:
+        return catalog.FirmFilters(
+            min_account_size=min_account_size,
+            max_account_size=max_account_size,
+            platform=platform,
+            instrument=instrument,
+            min_profit_split=min_profit_split,
+            payout_frequency=payout_frequency,
+            news_trading=news_trading,
+            expert_advisors=expert_advisors,
+            scaling_plan=scaling_plan,
+            weekend_holding=weekend_holding,
+            copy_trading=copy_trading,
+            min_rating=min_rating,
+            max_monthly_fee=max_monthly_fee,
+            max_evaluation_fee=max_evaluation_fee,
+            country=country,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# API Routes
+@api_router.get("/")
+async def root():
+    return {"message": "Prop Firm Comparison API", "version": "1.0.0"}
+
+@api_router.get("/firms", response_model=List[PropFirm])
+async def get_firms(
+    request: Request,
+    filters: catalog.FirmFilters = Depends(firm_filters),
+    sort: Optional[str] = Query(None, description=f"One of: {', '.join([*catalog.SORT_FIELDS, catalog.SCORE_SORT])}"),
+    order: Optional[str] = Query(None, pattern="^(asc|desc)$"),
+    weights: Optional[str] = Query(
+        None,
+        description=f"With sort={catalog.SCORE_SORT}: comma separated criterion:weight pairs "
+                    f"({', '.join(catalog.RANKING_CRITERIA)}), e.g. split:3,fee:2,rating:1",
+    ),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma separated firm fields and/or presets (card, full)"),
+    limit: int = Query(50, ge=1, le=100)
 ):
-    """Get all prop firms with optional filtering"""
+    """Get prop firms with optional filtering, sorting and cursor pagination.
+
+    ``sort=score`` ranks firms by the weighted mean of the criteria in
+    ``weights``, each scaled from the worst (0) to the best (1) value in the
+    catalog. The response body is the page of firms; when more firms follow,
+    the cursor of the next page is returned in X-Next-Cursor and a Link
+    header.
+    """
     try:
-        # Build filter query
-        filter_query = {}
-        
-        if min_account_size:
-            filter_query["min_account_size"] = {"$gte": min_account_size}
-        if max_account_size:
-            filter_query["max_account_size"] = {"$lte": max_account_size}
-        if platform:
-            filter_query["trading_platforms"] = {"$in": [platform]}
-        if min_profit_split:
-            filter_query["profit_split.0"] = {"$gte": min_profit_split}
-        if payout_frequency:
-            filter_query["payout_frequency"] = payout_frequency
-        if news_trading is not None:
-            filter_query["news_trading"] = news_trading
-        if expert_advisors is not None:
-            filter_query["expert_advisors"] = expert_advisors
-        if min_rating:
-            filter_query["rating"] = {"$gte": min_rating}
-        
-        cursor = db.prop_firms.find(filter_query).limit(limit)
-        firms = await cursor.to_list(length=limit)
-        
-        return [PropFirm(**firm) for firm in firms]
+        firm_sort = catalog.FirmSort.parse(sort, order, weights)
+        after = catalog.decode_cursor(cursor, firm_sort) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    selected = parse_fields(fields)
+
+    try:
+        async def build():
+            if catalog_ready():
+                body, next_cursor = catalog_store.page_json(filters, firm_sort, after, limit, selected)
+            else:
+                body, next_cursor = await fetch_firms_page(filters, firm_sort, after, limit, selected)
+            headers = {"X-Next-Cursor": catalog.encode_cursor(next_cursor)} if next_cursor else None
+            return body, headers
+
+        response = await cached_json(request, ("firms", filters, firm_sort, after, limit, selected), build)
+        next_token = response.headers.get("X-Next-Cursor")
+        if next_token:
+            response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_token)}>; rel="next"'
+        return response
     except Exception as e:
         logging.error(f"Error fetching firms: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/firms/facets")
+async def get_firm_facets(request: Request, filters: catalog.FirmFilters = Depends(firm_filters)):
+    """Firm counts per platform, instrument, payout frequency, flag and account size bucket.
+
+    Takes the same filters as /firms. Each facet is counted with its own
+    filter lifted, so the sidebar can show what every alternative returns.
+    """
+    try:
+        async def build():
+            if catalog_ready():
+                return catalog_store.facets(filters)
+            result = await db.prop_firms.aggregate(catalog.mongo_facet_pipeline(filters)).to_list(length=1)
+            return catalog.mongo_facet_counts(result[0])
+
+        return await cached_json(request, ("facets", filters), build)
+    except Exception as e:
+        logging.error(f"Error computing facets: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/firms/search", response_model=SearchResults)
+async def search_firms(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    """Typo-tolerant, accent-insensitive full text search over the catalog.
+
+    Without the catalog it falls back to the MongoDB text index, which only
+    matches whole (stemmed) words.
+    """
+    try:
+        if catalog_ready():
+            hits = catalog_store.search(q, limit)
+        else:
+            cursor = db.prop_firms.find(
+                {"$text": {"$search": q}}, {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            hits = [(firm_payload(firm), firm["score"]) for firm in await cursor.to_list(length=limit)]
+
+        results = [{"score": round(score, 4), "firm": firm} for firm, score in hits]
+        return {"query": q, "results": results}
+    except Exception as e:
+        logging.error(f"Error searching firms: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @api_router.get("/firms/{firm_id}", response_model=PropFirm)
-async def get_firm(firm_id: str):
+async def get_firm(
+    firm_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma separated firm fields and/or presets (card, full)"),
+):
     """Get a specific prop firm by ID"""
+    selected = parse_fields(fields)
     try:
-        firm = await db.prop_firms.find_one({"id": firm_id})
+        async def build():
+            if catalog_ready():
+                firm = catalog_store.get_json(firm_id, selected)
+                if not firm:
+                    raise HTTPException(status_code=404, detail="Firm not found")
+                return firm
+
+            firm = await db.prop_firms.find_one({"id": firm_id}, firm_projection(selected))
+            if not firm:
+                raise HTTPException(status_code=404, detail="Firm not found")
+            return firm_payload(firm, selected)
+
+        return await cached_json(request, ("firm", firm_id, selected), build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error fetching firm {firm_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/firms/{firm_id}/similar", response_model=SimilarFirms)
+async def get_similar_firms(
+    firm_id: str,
+    request: Request,
+    filters: catalog.FirmFilters = Depends(firm_filters),
+    limit: int = Query(5, ge=1, le=20),
+):
+    """Firms most similar to ``firm_id`` in platforms, instruments, rules, split, drawdowns and fees.
+
+    Accepts the /firms filters to restrict which firms are recommended.
+    """
+    try:
+        async def build():
+            if catalog_ready():
+                hits = catalog_store.similar(firm_id, filters, limit)
+            else:
+                cursor = db.prop_firms.find({}, {"_id": 0}).sort("_id", 1)
+                _, firms = catalog.valid_firms(await cursor.to_list(length=None), PropFirm)
+                position = next((i for i, firm in enumerate(firms) if firm["id"] == firm_id), None)
+                hits = None
+                if position is not None:
+                    members = None
+                    if filters.active():
+                        matching = set(await db.prop_firms.distinct("id", filters.to_mongo()))
+                        members = [firm["id"] in matching for firm in firms]
+                    similar = catalog.SimilarityIndex.build(firms).similar(position, limit, members)
+                    hits = [(firms[other], score) for other, score in similar]
+            if hits is None:
+                raise HTTPException(status_code=404, detail="Firm not found")
+            return {"firm_id": firm_id, "results": [{"score": round(score, 4), "firm": firm} for firm, score in hits]}
+
+        return await cached_json(request, ("similar", firm_id, filters, limit), build)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error finding firms similar to {firm_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/firms/{firm_id}/reviews", response_model=ReviewPage)
+async def get_firm_reviews(
+    firm_id: str,
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """A firm's rating summary and its user reviews, newest first.
+
+    The summary comes from the aggregates stored on the firm, so it costs
+    one document read however many reviews the firm has.
+    """
+    query: Dict[str, Any] = {"firm_id": firm_id}
+    if cursor:
+        try:
+            query["_id"] = {"$lt": ObjectId(cursor)}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Malformed cursor")
+    try:
+        firm = await db.prop_firms.find_one({"id": firm_id}, catalog.REVIEW_SUMMARY_PROJECTION)
         if not firm:
             raise HTTPException(status_code=404, detail="Firm not found")
-        return PropFirm(**firm)
+        documents = await db.reviews.find(query).sort("_id", -1).limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = str(documents[limit - 1]["_id"]) if len(documents) > limit else None
+        return {
+            "summary": catalog.review_summary(firm),
+            "reviews": [Review(**document) for document in documents[:limit]],
+            "next_cursor": next_cursor,
+        }
     except HTTPException:
         raise
     except Exception as e:
-        logging.error(f"Error fetching firm {firm_id}: {e}")
+        logging.error(f"Error fetching reviews of {firm_id}: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.post("/firms/{firm_id}/reviews", status_code=201)
+async def create_firm_review(firm_id: str, review: ReviewCreate):
+    """Post a review; the firm's rating, review count and histogram are updated in the same write"""
+    try:
+        stored = Review(firm_id=firm_id, **review.dict())
+        summary = await catalog.add_review(db.prop_firms, db.reviews, stored.dict())
+        if summary is None:
+            raise HTTPException(status_code=404, detail="Firm not found")
+        catalog_changed()
+        return {"review": stored, "summary": summary}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error creating review for {firm_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @api_router.post("/firms/compare")
 async def compare_firms(comparison: FirmComparison):
     """Compare multiple prop firms"""
     try:
-        if len(comparison.firm_ids) > 4:
-            raise HTTPException(status_code=400, detail="Maximum 4 firms can be compared")
+        if len(comparison.firm_ids) > MAX_COMPARE_FIRMS:
+            raise HTTPException(status_code=400, detail=f"Maximum {MAX_COMPARE_FIRMS} firms can be compared")
         
-        firms = []
-        for firm_id in comparison.firm_ids:
-            firm = await db.prop_firms.find_one({"id": firm_id})
-            if firm:
-                firms.append(PropFirm(**firm))
+        firms, missing_ids = await fetch_firms_by_ids(comparison.firm_ids)
         
         if not firms:
             raise HTTPException(status_code=404, detail="No firms found")
         
-        return {"firms": firms, "comparison_count": len(firms)}
+        return {"firms": firms, "comparison_count": len(firms), "missing_ids": missing_ids}
     except HTTPException:
         raise
     except Exception as e:
         logging.error(f"Error comparing firms: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.post("/firms/compare/matrix")
+async def compare_firms_matrix(comparison: FirmComparison):
+    """Server-side comparison matrix: per-metric winners, normalized scores, deltas and pairwise wins"""
+    try:
+        if len(comparison.firm_ids) > MAX_COMPARE_MATRIX_FIRMS:
+            raise HTTPException(status_code=400, detail=f"Maximum {MAX_COMPARE_MATRIX_FIRMS} firms can be compared")
+        
+        firm_ids = list(dict.fromkeys(comparison.firm_ids))
+        if catalog_ready():
+            columns = catalog_store.snapshot.columns
+            positions = [columns.positions[firm_id] for firm_id in firm_ids if firm_id in columns.positions]
+            missing_ids = [firm_id for firm_id in firm_ids if firm_id not in columns.positions]
+            columns = columns.take(positions)
+        else:
+            firms, missing_ids = await fetch_firms_by_ids(firm_ids)
+            columns = catalog.ColumnStore.build(firms)
+        
+        if not len(columns):
+            raise HTTPException(status_code=404, detail="No firms found")
+        
+        matrix = catalog.comparison_matrix(columns)
+        matrix["missing_ids"] = missing_ids
+        return matrix
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error building comparison matrix: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/challenges/cheapest")
+async def get_cheapest_challenges(
+    request: Request,
+    filters: catalog.FirmFilters = Depends(firm_filters),
+    min_size: Optional[int] = Query(None, ge=0, description="Smallest account size"),
+    max_size: Optional[int] = Query(None, ge=0, description="Largest account size"),
+    max_fee: Optional[float] = Query(None, ge=0, description="Highest evaluation fee"),
+    sort: str = Query("fee", pattern=f"^({'|'.join(catalog.FEE_SORTS)})$"),
+    one_per_firm: bool = Query(False, description="Keep only each firm's cheapest matching challenge"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Cheapest evaluation programs for an account size range, e.g. $50k-$100k under $400.
+
+    Accepts the /firms filters to restrict which firms are considered.
+    """
+    query = dict(min_size=min_size, max_size=max_size, max_fee=max_fee, sort=sort, limit=limit, one_per_firm=one_per_firm)
+    try:
+        async def build():
+            if catalog_ready():
+                challenges = catalog_store.cheapest_challenges(filters, **query)
+            else:
+                mongo_query = {"$and": [filters.to_mongo(), catalog.fee_schedule_query(min_size, max_size, max_fee)]}
+                cursor = db.prop_firms.find(mongo_query, {"_id": 0, "id": 1, "name": 1, "evaluation_fee": 1}).sort("_id", 1)
+                firms = await cursor.to_list(length=None)
+                challenges = catalog.attach_firms(catalog.FeeTable.build(firms).cheapest(**query), firms)
+            return {"challenges": challenges}
+
+        return await cached_json(request, ("cheapest_challenges", filters, tuple(sorted(query.items()))), build)
+    except Exception as e:
+        logging.error(f"Error finding cheapest challenges: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/calculator/funding-cost")
+async def get_funding_cost(
+    request: Request,
+    filters: catalog.FirmFilters = Depends(firm_filters),
+    account_size: Optional[int] = Query(None, gt=0, description="Exact account size (sets min_size and max_size)"),
+    min_size: Optional[int] = Query(None, ge=0),
+    max_size: Optional[int] = Query(None, ge=0),
+    daily_return: float = Query(0.5, gt=0, le=100, description="Expected gain per trading day, in percent"),
+    pass_rate: float = Query(0.3, gt=0, le=1, description="Chance of passing an attempt that reaches the target in time"),
+    sort: str = Query("expected_cost", pattern=f"^({'|'.join(catalog.COST_SORTS)})$"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Expected cost to get funded for every matching firm and account size, cheapest first.
+
+    Combines the evaluation fee, monthly fee, minimum/maximum trading days
+    and profit target with the trader's expected daily return and pass rate.
+    """
+    if account_size is not None:
+        min_size = max_size = account_size
+    model = dict(daily_return=daily_return, pass_rate=pass_rate, sort=sort, limit=limit)
+    try:
+        async def build():
+            if catalog_ready():
+                return catalog_store.funding_costs(filters, min_size, max_size, **model)
+
+            cursor = db.prop_firms.find(filters.to_mongo(), {"_id": 0}).sort("_id", 1)
+            _, firms = catalog.valid_firms(await cursor.to_list(length=None), PropFirm)
+            fees = catalog.FeeTable.build(firms)
+            table = catalog.cost_table(fees, catalog.ColumnStore.build(firms), fees.select(min_size, max_size), **model)
+            catalog.attach_firms(table["results"], firms)
+            return table
+
+        key = ("funding_cost", filters, min_size, max_size, tuple(sorted(model.items())))
+        return await cached_json(request, key, build)
+    except Exception as e:
+        logging.error(f"Error computing funding costs: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.get("/simulator/pass-probability")
+async def simulate_pass_probability(
+    filters: catalog.FirmFilters = Depends(firm_filters),
+    mean: float = Query(..., ge=-100, le=100, description="Mean daily return, in percent of the initial balance"),
+    volatility: float = Query(..., gt=0, le=100, description="Standard deviation of the daily return, in percent"),
+    win_rate: Optional[float] = Query(None, gt=0, lt=1, description="Share of winning days; omit for normally distributed returns"),
+    paths: int = Query(2000, ge=100, le=20000, description="Simulated paths per firm (capped by the server's budget)"),
+    seed: Optional[int] = Query(None, ge=0, description="Random seed; repeat it to reproduce a result"),
+    horizon: int = Query(60, ge=1, le=365, description="Trading days simulated for challenges without a time limit"),
+):
+    """Monte Carlo probability of passing each matching firm's challenge for a given trading profile.
+
+    All firms are simulated on the same paths in a worker process. The seed
+    and the path count actually used are returned with the results.
+    """
+    try:
+        model = catalog.ReturnModel(mean, volatility, win_rate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if seed is None:
+        seed = secrets.randbits(32)
+
+    try:
+        if catalog_ready():
+            firms, columns = catalog_store.challenge_columns(filters)
+        else:
+            cursor = db.prop_firms.find(filters.to_mongo(), {"_id": 0}).sort("_id", 1)
+            _, firms = catalog.valid_firms(await cursor.to_list(length=None), PropFirm)
+            columns = catalog.ColumnStore.build(firms)
+        if not firms:
+            return {"seed": seed, "paths": 0, "horizon": horizon, "results": []}
+
+        days = max(horizon, int(columns["max_trading_days"].max()))
+        paths = catalog.simulation_paths(paths, catalog.distinct_rule_sets(columns, horizon), days, SIMULATION_MAX_CELLS)
+        # The worker gives up at the deadline itself, including when the job waited that long in the queue,
+        # so a request that timed out never keeps a worker busy
+        deadline = time.time() + SIMULATION_TIMEOUT
+        job = asyncio.get_running_loop().run_in_executor(
+            simulation_pool(), catalog.simulate_challenges,
+            catalog.challenge_rules(columns), model, paths, seed, horizon, deadline,
+        )
+        results = await asyncio.wait_for(job, SIMULATION_TIMEOUT + 1)
+        return {"seed": seed, "paths": paths, "horizon": horizon, "results": catalog.simulation_results(firms, results)}
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Simulation took too long, try fewer paths")
+    except Exception as e:
+        logging.error(f"Error simulating challenges: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @api_router.get("/firms/search/suggestions")
 async def get_search_suggestions(q: str = Query(..., min_length=1)):
     """Get search suggestions based on query"""
     try:
+        if catalog_ready():
+            suggestions = [firm["name"] for firm in catalog_store.suggest(q, limit=5)]
+            return {"query": q, "suggestions": suggestions}
+
         # Search in firm names and descriptions
-        regex_pattern = {"$regex": q, "$options": "i"}
-        
-        cursor = db.prop_firms.find({
-            "$or": [
-                {"name": regex_pattern},
-                {"description": regex_pattern}
-            ]
-        }).limit(5)
+        cursor = db.prop_firms.find(catalog.suggestion_query(q)).limit(5)
         
         firms = await cursor.to_list(length=5)
         suggestions = [firm["name"] for firm in firms]
@@ -418,54 +980,156 @@ async def get_search_suggestions(q: str = Query(..., min_length=1)):
         logging.error(f"Error getting suggestions: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@api_router.get("/catalog/version")
+async def get_catalog_version():
+    """Catalog version served by this worker and how it follows changes to the collection"""
+    return {
+        "version": catalog_store.version,
+        "firms": len(catalog_store.snapshot.firms),
+        "loaded": catalog_ready(),
+        "watch": catalog_watcher.active,
+    }
+
+@api_router.get("/catalog/events")
+async def stream_catalog_events(request: Request, last_event_id: Optional[str] = Header(None)):
+    """Server-Sent Events feed of catalog changes, so clients patch their firm list instead of refetching it.
+
+    Events:
+    - ``hello`` ``{"version"}``: sent on a fresh connection.
+    - ``changes`` ``{"version", "changes"}``: one per new catalog version.
+      Each change is ``{"id", "op": "update", "fields"}`` (only the changed
+      fields), ``{"id", "op": "add", "firm"}`` or ``{"id", "op": "remove"}``.
+    - ``reset`` ``{"version"}``: changes were missed (e.g. a reconnect to
+      another worker or a client that fell behind); refetch /api/firms.
+
+    Browsers resume through Last-Event-ID and get the changes they missed
+    replayed. All clients share this worker's one catalog watcher.
+    """
+    if not catalog_ready():
+        raise HTTPException(status_code=503, detail="Catalog events are not available")
+    if len(catalog_events) >= EVENTS_MAX_CLIENTS:
+        raise HTTPException(status_code=503, detail="Too many event stream clients")
+    queue = catalog_events.subscribe(last_event_id)
+
+    def position(event: str) -> bytes:
+        version = catalog_events.version
+        return catalog.sse_message(event, catalog.render_json({"version": version}), catalog_events.event_id(version))
+
+    async def stream():
+        try:
+            yield b"retry: 3000\n\n"
+            if not last_event_id:
+                yield position("hello")
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                yield position("reset") if message is catalog.CatalogEvents.RESET else message
+        finally:
+            catalog_events.unsubscribe(queue)
+
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+
 @api_router.get("/statistics", response_model=Statistics)
-async def get_statistics():
+async def get_statistics(request: Request):
     """Get platform statistics"""
     try:
-        total_firms = await db.prop_firms.count_documents({})
-        
-        # Calculate average profit split
-        pipeline = [
-            {"$group": {
-                "_id": None,
-                "avg_profit_split": {"$avg": {"$arrayElemAt": ["$profit_split", 0]}},
-                "avg_rating": {"$avg": "$rating"}
-            }}
-        ]
-        stats = await db.prop_firms.aggregate(pipeline).to_list(1)
-        
-        # Get most popular platform
-        platform_pipeline = [
-            {"$unwind": "$trading_platforms"},
-            {"$group": {"_id": "$trading_platforms", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 1}
-        ]
-        platform_stats = await db.prop_firms.aggregate(platform_pipeline).to_list(1)
-        
-        # Get min evaluation fee
-        min_fee_pipeline = [
-            {"$project": {"min_fee": {"$min": {"$objectToArray": "$evaluation_fee.v"}}}},
-            {"$group": {"_id": None, "lowest_fee": {"$min": "$min_fee"}}}
-        ]
+        return await cached_json(request, ("statistics",), compute_statistics)
+    except Exception as e:
+        logging.error(f"Error getting statistics: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+async def compute_statistics():
+    """Statistics from the materialized snapshot, or aggregated in MongoDB when the catalog is off"""
+    if catalog_ready():
+        return catalog_store.statistics.snapshot()
+
+    total_firms = await db.prop_firms.count_documents({})
+    
+    # Calculate average profit split
+    pipeline = [
+        {"$group": {
+            "_id": None,
+            "avg_profit_split": {"$avg": {"$arrayElemAt": ["$profit_split", 0]}},
+            "avg_rating": {"$avg": "$rating"}
+        }}
+    ]
+    stats = await db.prop_firms.aggregate(pipeline).to_list(1)
+    
+    # Get most popular platform
+    platform_pipeline = [
+        {"$unwind": "$trading_platforms"},
+        {"$group": {"_id": "$trading_platforms", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 1}
+    ]
+    platform_stats = await db.prop_firms.aggregate(platform_pipeline).to_list(1)
+    
+    # Get min evaluation fee
+    min_fee_pipeline = [
+        {"$project": {"min_fee": {"$min": {"$map": {
+            "input": {"$objectToArray": "$evaluation_fee"},
+            "as": "fee",
+            "in": "$$fee.v"
+        }}}}},
+        {"$group": {"_id": None, "lowest_fee": {"$min": "$min_fee"}}}
+    ]
+    min_fee_stats = await db.prop_firms.aggregate(min_fee_pipeline).to_list(1)
+    
+    # Get max payout
+    max_payout_pipeline = [
+        {"$match": {"maximum_payout": {"$ne": None}}},
+        {"$group": {"_id": None, "highest_payout": {"$max": "$maximum_payout"}}}
+    ]
+    max_payout_stats = await db.prop_firms.aggregate(max_payout_pipeline).to_list(1)
+    
+    return Statistics(
+        total_firms=total_firms,
+        avg_profit_split=round(stats[0]["avg_profit_split"], 1) if stats else 0,
+        avg_rating=round(stats[0]["avg_rating"], 1) if stats else 0,
+        most_popular_platform=platform_stats[0]["_id"] if platform_stats else "MetaTrader 5",
+        lowest_evaluation_fee=(min_fee_stats[0]["lowest_fee"] or 0) if min_fee_stats else 0,
+        highest_payout=max_payout_stats[0]["highest_payout"] if max_payout_stats else 10000
+    )
+
+@api_router.post("/admin/firms/import", dependencies=[Depends(require_admin)])
+async def import_firms_endpoint(
+    request: Request,
+    format: str = Query("ndjson"),
+    batch_size: int = Query(500, ge=1, le=5000)
+):
+    """Stream an NDJSON or CSV firm catalog from the request body into the database"""
+    if format not in catalog.IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format, expected one of {list(catalog.IMPORT_FORMATS)}")
+    try:
+        lines = catalog.iter_lines(request.stream())
+        rows = catalog.rows_from_lines(lines, format, PropFirm)
+        report = await catalog.import_firms(db.prop_firms, rows, PropFirm, batch_size=batch_size)
         
-        # Get max payout
-        max_payout_pipeline = [
-            {"$match": {"maximum_payout": {"$ne": None}}},
-            {"$group": {"_id": None, "highest_payout": {"$max": "$maximum_payout"}}}
-        ]
-        max_payout_stats = await db.prop_firms.aggregate(max_payout_pipeline).to_list(1)
+        if report.changed and CATALOG_CACHE_ENABLED:
+            await catalog_store.load()
         
-        return Statistics(
-            total_firms=total_firms,
-            avg_profit_split=round(stats[0]["avg_profit_split"], 1) if stats else 0,
-            avg_rating=round(stats[0]["avg_rating"], 1) if stats else 0,
-            most_popular_platform=platform_stats[0]["_id"] if platform_stats else "MetaTrader 5",
-            lowest_evaluation_fee=49,  # Based on our data
-            highest_payout=max_payout_stats[0]["highest_payout"] if max_payout_stats else 10000
-        )
+        return report.as_dict()
     except Exception as e:
-        logging.error(f"Error getting statistics: {e}")
+        logging.error(f"Error importing firms: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@api_router.delete("/admin/reviews/{review_id}", dependencies=[Depends(require_admin)])
+async def delete_review(review_id: str):
+    """Remove a review and take it out of its firm's rating"""
+    try:
+        review = await catalog.remove_review(db.prop_firms, db.reviews, review_id)
+        if review is None:
+            raise HTTPException(status_code=404, detail="Review not found")
+        catalog_changed()
+        return {"deleted": review_id, "firm_id": review["firm_id"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error deleting review {review_id}: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
 # Include router
@@ -480,4 +1144,7 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await catalog_watcher.stop()
     client.close()
+    if _simulation_pool is not None:
+        _simulation_pool.shutdown(cancel_futures=True)
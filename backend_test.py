@@ -118,6 +118,27 @@ class PropFirmAPITester:
                 
         return success, response
 
+    def test_fuzzy_search(self, query, expected_name):
+        """Test typo-tolerant firm search"""
+        success, response = self.run_test(
+            f"Fuzzy Search for '{query}'",
+            "GET",
+            "api/firms/search",
+            200,
+            params={"q": query}
+        )
+        
+        if success:
+            names = [hit['firm']['name'] for hit in response.get('results', [])]
+            print(f"Search results for '{query}': {names}")
+            
+            if names and names[0] == expected_name:
+                print(f"✅ '{expected_name}' ranked first")
+            else:
+                print(f"❌ Expected '{expected_name}' first, got {names[:1]}")
+                
+        return success, response
+
     def test_filtered_firms(self, filter_params, expected_count=None):
         """Test filtering firms with various parameters"""
         param_desc = ", ".join([f"{k}={v}" for k, v in filter_params.items()])
@@ -174,6 +195,10 @@ def main():
     # Test 3: Search suggestions
     suggestions_success, suggestions = tester.test_search_suggestions("FTMO")
     
+    # Test 3b: Fuzzy search with typos and missing accents
+    tester.test_fuzzy_search("fundednex", "FundedNext")
+    tester.test_fuzzy_search("topstep", "TopStepTrader")
+    
     # If we have firms, use their IDs for further tests
     if all_firms_success and all_firms:
         # Get some firm IDs for testing
@@ -0,0 +1,79 @@
+import asyncio
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# The backend is run from its own directory (``import catalog``); do the same here
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+ADMIN_TOKEN = "test-admin-token"
+
+
+def _support_round(aggregate):
+    """Teach mongomock ``$round`` (half to even, like MongoDB), used by the rating pipelines"""
+    if "$round" in aggregate.arithmetic_operators:
+        return
+    handle = aggregate._Parser._handle_arithmetic_operator
+
+    def handle_round(parser, operator, values):
+        if operator != "$round":
+            return handle(parser, operator, values)
+        number, places = [*parser.parse_many(values), 0][:2]
+        return None if number is None else round(number, places)
+
+    aggregate.arithmetic_operators.add("$round")
+    aggregate._Parser._handle_arithmetic_operator = handle_round
+
+
+@pytest.fixture(scope="session")
+def server():
+    """The backend app module, talking to an in-memory MongoDB instead of a real server"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import motor.motor_asyncio
+    from mongomock import aggregate
+
+    _support_round(aggregate)
+    motor.motor_asyncio.AsyncIOMotorClient = mongomock_motor.AsyncMongoMockClient
+    import server as module
+
+    return module
+
+
+@pytest.fixture
+def db(server, monkeypatch):
+    """A fresh database, also used by the server's MongoDB code paths"""
+    database = server.client[f"test_{uuid.uuid4().hex}"]
+    monkeypatch.setattr(server, "db", database)
+    return database
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
+
+
+@pytest.fixture
+def api(server, db, monkeypatch):
+    """A client of the app on the test database, with a catalog of its own that starts unloaded.
+
+    Startup (seeding, watching) is skipped: tests store their firms and
+    call ``server.catalog_store.load()`` when they want the catalog.
+    """
+    from fastapi.testclient import TestClient
+
+    import catalog
+
+    store = catalog.CatalogStore(db.prop_firms, server.PropFirm)
+    events = catalog.CatalogEvents()
+    store.add_listener(events.on_publish)
+    monkeypatch.setattr(server, "catalog_store", store)
+    monkeypatch.setattr(server, "catalog_watcher", catalog.CatalogWatcher(store, db.prop_firms, "off"))
+    monkeypatch.setattr(server, "catalog_events", events)
+    monkeypatch.setattr(server, "response_cache", catalog.ResponseCache())
+    monkeypatch.setattr(server, "CATALOG_CACHE_ENABLED", True)
+    # Reloads after a write are triggered explicitly by the tests
+    monkeypatch.setattr(server, "catalog_changed", lambda: None)
+    monkeypatch.setattr(server, "ADMIN_TOKEN", ADMIN_TOKEN)
+    return TestClient(server.app)
@@ -0,0 +1,52 @@
+import random
+from typing import Any, Dict, List
+
+PLATFORMS = ["MetaTrader 4", "MetaTrader 5", "cTrader", "TradingView"]
+INSTRUMENTS = ["Forex", "Indices", "Commodities", "Crypto", "Futures"]
+COUNTRIES = ["USA", "Canada", "Iran", "North Korea", "Cuba"]
+
+
+def make_firm(rng: random.Random, index: int) -> Dict[str, Any]:
+    """A valid PropFirm document with values drawn from small sets, so sorts have ties and gaps"""
+    sizes = sorted(rng.sample([5000, 10000, 25000, 50000, 100000, 200000], rng.randint(1, 4)))
+    fees = {} if rng.random() < 0.1 else {str(size): size // rng.choice([50, 80, 100]) for size in sizes}
+    return {
+        "name": f"Firm {index:03d}",
+        "description": f"Empresa de fondeo número {index}",
+        "logo_url": "https://example.com/logo.png",
+        "website_url": f"https://firm{index}.example.com",
+        "founded_year": rng.randint(2010, 2023),
+        "headquarters": rng.choice(["Londres, Reino Unido", "Praga, República Checa", "Dubai"]),
+        "min_account_size": sizes[0],
+        "max_account_size": sizes[-1],
+        "account_sizes": sizes,
+        # Firms without a split or fees have no value for those sorts
+        "profit_split": [] if rng.random() < 0.1 else rng.choice([[80, 20], [85, 15], [90, 10]]),
+        "max_drawdown": rng.choice([4, 6, 8, 10, 12]),
+        "daily_drawdown": rng.choice([3, 4, 5]),
+        "profit_target": rng.choice([6, 8, 10]),
+        "trading_platforms": rng.sample(PLATFORMS, rng.randint(1, 3)),
+        "instruments": rng.sample(INSTRUMENTS, rng.randint(1, 3)),
+        "evaluation_fee": fees,
+        "monthly_fee": rng.choice([0, 0, 25]),
+        "payout_frequency": rng.choice(["weekly", "bi-weekly", "monthly"]),
+        "min_trading_days": rng.choice([0, 3, 4, 5]),
+        "max_trading_days": rng.choice([0, 30, 60]),
+        "scaling_plan": rng.random() < 0.5,
+        "news_trading": rng.random() < 0.5,
+        "weekend_holding": rng.random() < 0.5,
+        "expert_advisors": rng.random() < 0.5,
+        "copy_trading": rng.random() < 0.5,
+        "minimum_payout": 100,
+        "maximum_payout": rng.choice([None, 5000]),
+        "countries_restricted": rng.sample(COUNTRIES, rng.randint(0, 2)),
+        "pros": ["Pagos semanales"],
+        "cons": ["Empresa nueva"],
+        "rating": rng.choice([3.5, 4.0, 4.2, 4.5]),
+        "total_reviews": rng.choice([0, 100, 250]),
+    }
+
+
+def make_firms(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_firm(rng, index) for index in range(count)]
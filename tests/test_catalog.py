@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+QUERIES = [
+    {},
+    {"platform": "MetaTrader 5", "sort": "rating", "order": "desc"},
+    {"instrument": "Crypto", "min_profit_split": 85},
+    {"min_account_size": 25000, "max_account_size": 200000, "sort": "account_size"},
+    {"payout_frequency": "weekly", "news_trading": True, "expert_advisors": False},
+    {"min_rating": 4.2, "max_monthly_fee": 0, "sort": "evaluation_fee"},
+    {"country": "Cuba", "sort": "profit_split", "order": "desc"},
+    {"scaling_plan": True, "sort": "score", "weights": "split:3,fee:2,rating:1"},
+    {"platform": "TradingView", "min_rating": 9},
+]
+
+
+@pytest.fixture
+def stored(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(40, seed=21), server.PropFirm))
+
+
+@pytest.mark.parametrize("params", QUERIES, ids=repr)
+def test_catalog_serves_what_mongo_serves(server, run, api, stored, params, monkeypatch):
+    params = {**params, "limit": 100}
+    from_mongo = api.get("/api/firms", params=params)
+    run(server.catalog_store.load())
+    # Any MongoDB access from here on fails the request
+    monkeypatch.setattr(server, "db", None)
+    from_catalog = api.get("/api/firms", params=params)
+
+    assert from_mongo.status_code == from_catalog.status_code == 200
+    assert from_catalog.json() == from_mongo.json()
+    assert from_catalog.headers["ETag"] == from_mongo.headers["ETag"]
+
+
+def test_encoded_firms_are_model_dumps(server, db, run, stored):
+    store = catalog.CatalogStore(db.prop_firms, server.PropFirm)
+    run(store.load())
+    for document in run(db.prop_firms.find({}).to_list(length=None)):
+        expected = catalog.render_json(server.PropFirm(**document).dict())
+        assert store.get_json(document["id"]) == expected
+
+
+@pytest.mark.parametrize("trusted", [True, False], ids=["trusted", "validated"])
+def test_firm_reads_match_across_paths(server, db, run, api, stored, monkeypatch, trusted):
+    monkeypatch.setattr(server, "TRUSTED_READS", trusted)
+    firm_ids = run(db.prop_firms.distinct("id"))
+    from_mongo = [api.get(f"/api/firms/{firm_id}").content for firm_id in firm_ids]
+    run(server.catalog_store.load())
+    from_catalog = [api.get(f"/api/firms/{firm_id}").content for firm_id in firm_ids]
+
+    assert from_catalog == from_mongo
+    # Stored extras (_id, derived sort fields) never reach the response
+    assert set(json.loads(from_catalog[0])) == set(server.PropFirm.model_fields)
+
+
+# One value and a reference predicate per filter; a filter added without an entry here fails the test
+FILTER_CHECKS = {
+    "min_account_size": (25000, lambda firm, value: firm["min_account_size"] >= value),
+    "max_account_size": (50000, lambda firm, value: firm["max_account_size"] <= value),
+    "platform": ("cTrader", lambda firm, value: value in firm["trading_platforms"]),
+    "instrument": ("Futures", lambda firm, value: value in firm["instruments"]),
+    "min_profit_split": (85, lambda firm, value: bool(firm["profit_split"]) and firm["profit_split"][0] >= value),
+    "payout_frequency": ("monthly", lambda firm, value: firm["payout_frequency"] == value),
+    "news_trading": (True, lambda firm, value: firm["news_trading"] == value),
+    "expert_advisors": (False, lambda firm, value: firm["expert_advisors"] == value),
+    "scaling_plan": (True, lambda firm, value: firm["scaling_plan"] == value),
+    "weekend_holding": (False, lambda firm, value: firm["weekend_holding"] == value),
+    "copy_trading": (True, lambda firm, value: firm["copy_trading"] == value),
+    "min_rating": (4.2, lambda firm, value: firm["rating"] >= value),
+    "max_monthly_fee": (0, lambda firm, value: firm["monthly_fee"] <= value),
+    "max_evaluation_fee": (300, lambda firm, value: min(firm["evaluation_fee"].values(), default=value + 1) <= value),
+    "country": ("CU", lambda firm, value: "Cuba" not in firm["countries_restricted"]),
+}
+
+
+def test_every_filter_is_checked():
+    assert set(FILTER_CHECKS) == set(catalog.FILTER_SPECS)
+
+
+@pytest.mark.parametrize("name", list(FILTER_CHECKS))
+def test_each_filter_selects_the_matching_firms(server, db, run, api, stored, name):
+    value, matches = FILTER_CHECKS[name]
+    firms = run(db.prop_firms.find({}).to_list(length=None))
+    expected = sorted(firm["id"] for firm in firms if matches(firm, value))
+    assert 0 < len(expected) < len(firms)
+
+    params = {name: value, "limit": 100}
+    from_mongo = sorted(firm["id"] for firm in api.get("/api/firms", params=params).json())
+    run(server.catalog_store.load())
+    from_catalog = sorted(firm["id"] for firm in api.get("/api/firms", params=params).json())
+    assert from_mongo == from_catalog == expected
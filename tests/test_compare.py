@@ -0,0 +1,87 @@
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+
+@pytest.fixture
+def firm_ids(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(8, seed=13), server.PropFirm))
+    return [firm["id"] for firm in run(db.prop_firms.find({}).sort("_id", 1).to_list(length=None))]
+
+
+@pytest.mark.parametrize("loaded", [False, True], ids=["mongo", "catalog"])
+def test_compare_keeps_order_and_reports_missing_ids(server, run, api, firm_ids, loaded):
+    if loaded:
+        run(server.catalog_store.load())
+    requested = [firm_ids[3], "missing-1", firm_ids[0], firm_ids[3]]
+
+    response = api.post("/api/firms/compare", json={"firm_ids": requested})
+    assert response.status_code == 200
+    body = response.json()
+    assert [firm["id"] for firm in body["firms"]] == [firm_ids[3], firm_ids[0]]
+    assert body["comparison_count"] == 2
+    assert body["missing_ids"] == ["missing-1"]
+    assert set(body["firms"][0]) == set(server.PropFirm.model_fields)
+
+
+@pytest.mark.parametrize("loaded", [False, True], ids=["mongo", "catalog"])
+def test_compare_limits(server, run, api, firm_ids, loaded):
+    if loaded:
+        run(server.catalog_store.load())
+    assert api.post("/api/firms/compare", json={"firm_ids": ["nope", "other"]}).status_code == 404
+    too_many = firm_ids[:server.MAX_COMPARE_FIRMS + 1]
+    assert api.post("/api/firms/compare", json={"firm_ids": too_many}).status_code == 400
+
+
+def columns(server, *overrides):
+    base = make_firms(len(overrides), seed=3)
+    firms = [server.PropFirm(**{**firm, **override}).dict() for firm, override in zip(base, overrides)]
+    return catalog.ColumnStore.build(firms)
+
+
+def test_matrix_winners(server):
+    store = columns(
+        server,
+        {"evaluation_fee": {"10000": 100}, "profit_split": [80, 20], "max_drawdown": 10, "profit_target": 10,
+         "min_trading_days": 4, "rating": 4.0},
+        {"evaluation_fee": {"100000": 500}, "profit_split": [], "max_drawdown": 12, "profit_target": 8,
+         "min_trading_days": 0, "rating": 4.5},
+        {"evaluation_fee": {}, "profit_split": [90, 10], "max_drawdown": 6, "profit_target": 8,
+         "min_trading_days": 3, "rating": 4.5},
+    )
+    first, second, third = store.ids
+    matrix = catalog.comparison_matrix(store)
+    metrics = matrix["metrics"]
+
+    assert {name: metric["winner"] for name, metric in metrics.items()} == {
+        "fee_per_funded_dollar": second,  # lower is better, the firm without fees cannot win
+        "profit_split": third,  # the firm without a split cannot win either
+        "drawdown_headroom": second,
+        "days_to_pass": second,
+        "rating": second,  # ties go to the first firm
+    }
+    assert metrics["fee_per_funded_dollar"]["values"] == [0.01, 0.005, None]
+    assert metrics["fee_per_funded_dollar"]["normalized"] == [0.0, 1.0, 0.0]
+    assert metrics["days_to_pass"]["delta_to_best"] == [4.0, 0.0, 3.0]
+    assert matrix["overall_scores"][1] == 0.8 and matrix["overall_winner"] == second
+    # Wins of the row firm over the column firm, counted over every metric
+    assert matrix["pairwise_wins"] == [[0, 1, 2], [4, 0, 3], [3, 1, 0]]
+
+
+def test_metric_without_values_has_no_winner(server):
+    matrix = catalog.comparison_matrix(columns(server, {"profit_split": []}))
+    assert matrix["metrics"]["profit_split"]["winner"] is None
+    assert matrix["metrics"]["profit_split"]["values"] == [None]
+
+
+def test_matrix_from_mongo_matches_the_catalog(server, run, api, firm_ids):
+    requested = {"firm_ids": [firm_ids[5], firm_ids[1], "missing-1", firm_ids[5], firm_ids[2]]}
+    from_mongo = api.post("/api/firms/compare/matrix", json=requested)
+    run(server.catalog_store.load())
+    from_catalog = api.post("/api/firms/compare/matrix", json=requested)
+
+    assert from_mongo.status_code == from_catalog.status_code == 200
+    assert from_mongo.json() == from_catalog.json()
+    assert from_catalog.json()["firm_ids"] == [firm_ids[5], firm_ids[1], firm_ids[2]]
+    assert from_catalog.json()["missing_ids"] == ["missing-1"]
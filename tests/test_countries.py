@@ -0,0 +1,27 @@
+import pytest
+
+import catalog
+
+
+@pytest.mark.parametrize("name, code", [
+    ("DK", "DK"),
+    ("dnk", "DK"),
+    ("Switzerland", "CH"),
+    ("Suiza", "CH"),
+    ("  côte d'ivoire ", "CI"),
+    ("Ivory Coast", "CI"),
+    ("United States of America", "US"),
+    ("EE.UU.", "US"),
+])
+def test_country_names_resolve_to_alpha2(name, code):
+    assert catalog.country_code(name) == code
+
+
+@pytest.mark.parametrize("name", ["XX", "Atlantis", "", "Forex"])
+def test_non_countries_are_unknown(name):
+    assert catalog.country_code(name) is None
+
+
+def test_every_iso_code_and_name_resolves():
+    for code, (alpha3, name) in catalog.ISO_3166.items():
+        assert catalog.country_code(code) == catalog.country_code(alpha3) == catalog.country_code(name) == code
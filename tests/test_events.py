@@ -0,0 +1,102 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import catalog
+
+
+def snapshot(version, **firms):
+    return SimpleNamespace(version=version, by_id=firms, firms=tuple(firms.values()))
+
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait())
+    return messages
+
+
+def versions(messages):
+    return [json.loads(message.split(b"data: ", 1)[1])["version"] for message in messages]
+
+
+@pytest.fixture
+def events():
+    """Events after an initial load at version 1 and changes published as versions 2 to 4"""
+    events = catalog.CatalogEvents(history=3, queue_size=8)
+    states = [snapshot(0), snapshot(1, a={"id": "a", "rating": 4.0})]
+    for version in (2, 3, 4):
+        states.append(snapshot(version, a={"id": "a", "rating": float(version)}))
+    for previous, current in zip(states, states[1:]):
+        events.on_publish(previous, current)
+    return events
+
+
+def test_firm_diffs():
+    previous = snapshot(1, a={"id": "a", "rating": 4.0, "name": "A"}, b={"id": "b"})
+    current = snapshot(2, a={"id": "a", "rating": 4.5, "name": "A"}, c={"id": "c"})
+    assert catalog.firm_diffs(previous, current) == [
+        {"id": "a", "op": "update", "fields": {"rating": 4.5}},
+        {"id": "c", "op": "add", "firm": {"id": "c"}},
+        {"id": "b", "op": "remove"},
+    ]
+
+
+def test_initial_load_sends_nothing_and_sets_the_floor():
+    events = catalog.CatalogEvents()
+    queue = events.subscribe()
+    events.on_publish(snapshot(0), snapshot(1, a={"id": "a"}))
+    assert drain(queue) == []
+    assert events.version == 1
+    assert drain(events.subscribe(events.event_id(1))) == []
+
+
+def test_subscribers_receive_each_diff_once(events):
+    queue = events.subscribe()
+    events.on_publish(snapshot(4, a={"id": "a"}), snapshot(5, a={"id": "a"}))
+    events.on_publish(snapshot(5, a={"id": "a"}), snapshot(6, a={"id": "a", "rating": 1.0}))
+    [message] = drain(queue)
+    assert message.startswith(f"id: {events.event_id(6)}\nevent: changes\n".encode())
+    assert versions([message]) == [6]
+
+
+def test_replay_sends_only_later_changes(events):
+    assert versions(drain(events.subscribe(events.event_id(2)))) == [3, 4]
+    assert drain(events.subscribe(events.event_id(4))) == []
+
+
+@pytest.mark.parametrize("last_event_id", [
+    "0badbeef:3",  # another worker (or an earlier run of this one)
+    "{epoch}:x",
+    "{epoch}",
+    "{epoch}:9",  # newer than anything published
+])
+def test_unknown_positions_reset(events, last_event_id):
+    queue = events.subscribe(last_event_id.format(epoch=events.epoch))
+    assert drain(queue) == [catalog.CatalogEvents.RESET]
+
+
+def test_history_rollover_raises_the_floor(events):
+    # Version 1 is the initial load: all of 2, 3 and 4 are still in the history
+    assert versions(drain(events.subscribe(events.event_id(1)))) == [2, 3, 4]
+    events.on_publish(snapshot(4, a={"id": "a"}), snapshot(5, a={"id": "a", "rating": 0.0}))
+    assert drain(events.subscribe(events.event_id(1))) == [catalog.CatalogEvents.RESET]
+    assert versions(drain(events.subscribe(events.event_id(2)))) == [3, 4, 5]
+
+
+def test_slow_subscriber_gets_a_single_reset():
+    events = catalog.CatalogEvents(queue_size=2)
+    events.on_publish(snapshot(0), snapshot(1, a={"id": "a"}))
+    queue = events.subscribe()
+    for version in range(2, 6):
+        events.on_publish(snapshot(version - 1, a={"id": "a"}), snapshot(version, a={"id": "a", "v": version}))
+    # The backlog (versions 2 and 3) is dropped at the overflow; later changes keep flowing
+    reset, *later = drain(queue)
+    assert reset is catalog.CatalogEvents.RESET
+    assert versions(later) == [5]
+
+    events.unsubscribe(queue)
+    assert len(events) == 0
+    events.on_publish(snapshot(5, a={"id": "a"}), snapshot(6, a={"id": "a", "v": 0}))
+    assert queue.empty()
@@ -0,0 +1,48 @@
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+FILTERS = [
+    {},
+    {"platform": "cTrader"},
+    {"platform": "MetaTrader 5", "news_trading": True, "min_profit_split": 85},
+    {"instrument": "Crypto", "payout_frequency": "weekly", "country": "CU"},
+    {"min_account_size": 50000, "copy_trading": False},
+    {"min_rating": 9},
+]
+
+
+@pytest.fixture
+def stored(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(50, seed=17), server.PropFirm))
+    return run(db.prop_firms.find({}, {"_id": 0}).to_list(length=None))
+
+
+@pytest.mark.parametrize("params", FILTERS, ids=repr)
+def test_mongo_fallback_matches_the_catalog(server, run, api, stored, params):
+    from_mongo = api.get("/api/firms/facets", params=params)
+    run(server.catalog_store.load())
+    from_catalog = api.get("/api/firms/facets", params=params)
+
+    assert from_mongo.status_code == from_catalog.status_code == 200
+    assert from_mongo.json() == from_catalog.json()
+
+
+def test_facets_lift_their_own_filter(server, run, api, stored):
+    facets = api.get("/api/firms/facets", params={"platform": "cTrader", "news_trading": True}).json()
+
+    with_news = [firm for firm in stored if firm["news_trading"]]
+    platforms = {item["value"]: item["count"] for item in facets["facets"]["trading_platforms"]}
+    assert platforms == {
+        platform: sum(platform in firm["trading_platforms"] for firm in with_news)
+        for platform in {platform for firm in stored for platform in firm["trading_platforms"]}
+    }
+    news = {item["value"]: item["count"] for item in facets["facets"]["news_trading"]}
+    assert news == {value: sum(firm["news_trading"] == value and "cTrader" in firm["trading_platforms"]
+                               for firm in stored) for value in (True, False)}
+    assert facets["total"] == sum("cTrader" in firm["trading_platforms"] for firm in with_news)
+
+    buckets = facets["facets"]["account_size"]
+    assert [bucket["value"] for bucket in buckets] == list(range(6))
+    assert sum(bucket["count"] for bucket in buckets) >= facets["total"]
@@ -0,0 +1,66 @@
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+QUERIES = [
+    {},
+    {"min_size": 50000, "max_size": 100000, "max_fee": 1000},
+    {"min_size": 25000, "sort": "fee_per_1k", "limit": 7},
+    {"max_size": 10000, "limit": 3, "one_per_firm": True},
+    {"sort": "fee_per_1k", "one_per_firm": True},
+    {"min_size": 300000},
+]
+
+
+@pytest.fixture(scope="module")
+def firms(server):
+    return [server.PropFirm(**firm).dict() for firm in make_firms(60, seed=23)]
+
+
+def expected_cheapest(firms, min_size=None, max_size=None, max_fee=None, sort="fee", limit=20, one_per_firm=False):
+    """Reference: every row in range, ordered by the sort key, then account size, then catalog position"""
+    rows = [
+        (row[sort], row["account_size"], position, row["fee"])
+        for position, firm in enumerate(firms)
+        for row in catalog.fee_schedule(firm)
+        if (min_size is None or row["account_size"] >= min_size)
+        and (max_size is None or row["account_size"] <= max_size)
+        and (max_fee is None or row["fee"] <= max_fee)
+    ]
+    rows.sort()
+    if one_per_firm:
+        seen = set()
+        rows = [row for row in rows if not (row[2] in seen or seen.add(row[2]))]
+    return [(position, size, fee) for _, size, position, fee in rows[:limit]]
+
+
+@pytest.mark.parametrize("query", QUERIES, ids=repr)
+def test_cheapest_matches_a_sorted_scan(firms, query):
+    found = catalog.FeeTable.build(firms).cheapest(**query)
+    assert [(row["position"], row["account_size"], row["fee"]) for row in found] == expected_cheapest(firms, **query)
+
+
+def test_cheapest_breaks_fee_ties_by_size_then_firm(server):
+    base = make_firms(3, seed=1)
+    fees = [{"50000": 300, "10000": 300}, {"25000": 300}, {"10000": 300, "5000": 400}]
+    firms = [server.PropFirm(**{**firm, "evaluation_fee": fee}).dict() for firm, fee in zip(base, fees)]
+    found = catalog.FeeTable.build(firms).cheapest()
+    assert [(row["position"], row["account_size"]) for row in found] == [(0, 10000), (2, 10000), (1, 25000),
+                                                                         (0, 50000), (2, 5000)]
+    assert [row["fee_per_1k"] for row in found][:2] == [30.0, 30.0]
+
+
+@pytest.mark.parametrize("params", [
+    {"min_size": 50000, "max_size": 100000, "max_fee": 600},
+    {"platform": "MetaTrader 5", "sort": "fee_per_1k", "one_per_firm": True},
+], ids=repr)
+def test_cheapest_challenges_from_mongo_match_the_catalog(server, db, run, api, params):
+    run(catalog.sync_firms(db.prop_firms, make_firms(30, seed=23), server.PropFirm))
+    from_mongo = api.get("/api/challenges/cheapest", params=params)
+    run(server.catalog_store.load())
+    from_catalog = api.get("/api/challenges/cheapest", params=params)
+
+    assert from_mongo.status_code == from_catalog.status_code == 200
+    assert from_mongo.json() == from_catalog.json()
+    assert from_catalog.json()["challenges"]
@@ -0,0 +1,81 @@
+import catalog
+from tests.factories import make_firms
+
+
+def load(server, db, run, count=6):
+    run(catalog.sync_firms(db.prop_firms, make_firms(count, seed=14), server.PropFirm))
+    run(server.catalog_store.load())
+
+
+def test_repeat_request_is_not_modified(server, db, run, api):
+    load(server, db, run)
+    first = api.get("/api/firms", params={"limit": 2})
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('"')
+    assert first.headers["Cache-Control"] == server.API_CACHE_CONTROL
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        again = api.get("/api/firms", params={"limit": 2}, headers={"If-None-Match": if_none_match})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["ETag"] == etag
+        assert again.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    assert api.get("/api/firms", params={"limit": 2}, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_catalog_change_invalidates_etags(server, db, run, api):
+    load(server, db, run)
+    before = api.get("/api/firms")
+
+    # A new version with the same content keeps the strong validator
+    run(server.catalog_store.load())
+    assert api.get("/api/firms", headers={"If-None-Match": before.headers["ETag"]}).status_code == 304
+
+    run(db.prop_firms.update_one({}, {"$set": {"pros": ["Spreads bajos"]}}))
+    run(server.catalog_store.load())
+    after = api.get("/api/firms", headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert len(server.response_cache) == 1
+
+
+def test_next_cursor_is_part_of_the_etag(server, db, run, api):
+    load(server, db, run, count=4)
+    first = api.get("/api/firms", params={"limit": 3})
+    assert "X-Next-Cursor" in first.headers
+
+    # Same three firms, but now nothing follows them
+    last = run(db.prop_firms.find({}).sort("_id", -1).to_list(length=1))[0]
+    run(db.prop_firms.delete_one({"_id": last["_id"]}))
+    run(server.catalog_store.load())
+    second = api.get("/api/firms", params={"limit": 3}, headers={"If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert "X-Next-Cursor" not in second.headers
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+def test_mongo_fallback_is_validated_too(server, db, run, api):
+    run(catalog.sync_firms(db.prop_firms, make_firms(3, seed=14), server.PropFirm))
+    first = api.get("/api/firms")
+    assert not server.catalog_ready()
+    assert api.get("/api/firms", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert len(server.response_cache) == 0
+
+
+def test_response_cache_is_an_lru_per_catalog_version():
+    cache = catalog.ResponseCache(max_entries=2)
+    for key in "abc":
+        cache.put(key, 1, key.encode())
+    assert cache.get("a", 1) is None and cache.get("b", 1).body == b"b"
+    cache.put("d", 1, b"d")
+    assert cache.get("b", 1) is not None and cache.get("c", 1) is None
+    assert cache.get("b", 2) is None and len(cache) == 0
+
+
+def test_etag_covers_headers():
+    body = b"[]"
+    assert catalog.CachedResponse.for_body(body).etag == catalog.CachedResponse.for_body(body, {}).etag
+    assert catalog.CachedResponse.for_body(body, {"X-Next-Cursor": "a"}).etag != \
+        catalog.CachedResponse.for_body(body, {"X-Next-Cursor": "b"}).etag
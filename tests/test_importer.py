@@ -0,0 +1,63 @@
+import catalog
+from tests.factories import make_firms
+
+
+async def rows(items):
+    for number, item in enumerate(items, start=1):
+        yield number, item
+
+
+def test_bad_rows_are_reported_and_the_rest_imported(server, db, run):
+    good, bad_key, bad_size, missing_name = make_firms(4, seed=3)
+    bad_key["evaluation_fee"] = {"10k": 99}
+    bad_size["evaluation_fee"] = {"-5000": 99}
+    del missing_name["name"]
+
+    report = run(catalog.import_firms(
+        db.prop_firms, rows([good, bad_key, bad_size, missing_name, ValueError("Unterminated string")]), server.PropFirm,
+    ))
+
+    assert (report.rows, report.inserted, report.failed) == (5, 1, 4)
+    errors = {error["row"]: error["error"] for error in report.errors}
+    assert sorted(errors) == [2, 3, 4, 5]
+    assert "10k" in errors[2] and "-5000" in errors[3]
+    assert run(db.prop_firms.count_documents({})) == 1
+
+    # Importing the same content again changes nothing
+    again = run(catalog.import_firms(db.prop_firms, rows([good]), server.PropFirm))
+    assert (again.inserted, again.updated, again.unchanged) == (0, 0, 1)
+
+
+def test_id_collisions_are_row_errors(server, db, run):
+    stored, renamed, first, second = make_firms(4, seed=8)
+    run(catalog.ensure_indexes(db.prop_firms))
+    run(catalog.import_firms(db.prop_firms, rows([{**stored, "id": "acme"}]), server.PropFirm))
+
+    report = run(catalog.import_firms(db.prop_firms, rows([
+        {**renamed, "id": "acme"},
+        {**first, "id": "shared"},
+        {**second, "id": "shared"},
+    ]), server.PropFirm))
+
+    errors = {error["row"]: error["error"] for error in report.errors}
+    assert (report.inserted, report.failed) == (1, 2)
+    assert sorted(errors) == [1, 3]
+    assert stored["name"] in errors[1] and first["name"] in errors[3]
+
+
+def test_rejected_writes_are_row_errors(server, db, run):
+    stored, duplicate, fresh = make_firms(3, seed=9)
+    run(catalog.ensure_indexes(db.prop_firms))
+    # A unique key validation cannot know about: only the write can reject it
+    run(db.prop_firms.create_index("website_url", unique=True))
+    run(catalog.import_firms(db.prop_firms, rows([stored]), server.PropFirm))
+
+    report = run(catalog.import_firms(db.prop_firms, rows([
+        {**duplicate, "website_url": stored["website_url"]},
+        fresh,
+    ]), server.PropFirm))
+
+    assert (report.rows, report.inserted, report.updated, report.failed) == (2, 1, 0, 1)
+    assert report.errors[0]["row"] == 1
+    assert report.errors[0]["error"].startswith("Conflicts with a stored firm")
+    assert run(db.prop_firms.count_documents({})) == 2
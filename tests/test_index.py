@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pytest
+
+import catalog
+from catalog.index import RangeIndex, TermIndex, bitset_from_positions, mask_from_bitset, positions_from_bitset
+from tests.factories import make_firms
+
+
+def members(positions):
+    return bitset_from_positions(sorted(positions), 1000)
+
+
+@pytest.fixture(scope="module")
+def values():
+    """1000 firms over ~150 distinct values (several checkpoints), a tenth without one"""
+    rng = random.Random(11)
+    return [None if rng.random() < 0.1 else rng.randrange(0, 300, 2) for _ in range(1000)]
+
+
+def test_bitset_round_trip():
+    rng = random.Random(5)
+    for size in (1, 7, 8, 9, 1000):
+        positions = sorted(rng.sample(range(size), rng.randint(0, size)))
+        bits = bitset_from_positions(positions, size)
+        assert positions_from_bitset(bits, size) == positions
+        assert positions_from_bitset(bits, size, limit=3) == positions[:3]
+        assert mask_from_bitset(bits, size).tolist() == [position in positions for position in range(size)]
+
+
+def test_range_index_matches_a_scan(values):
+    index = RangeIndex.build([{"value": value} for value in values], lambda firm: firm["value"])
+    assert len(index.keys) > 3 * RangeIndex.CHECKPOINT
+
+    present = [(position, value) for position, value in enumerate(values) if value is not None]
+    for bound in [-1, 0, 1, 63, 64, 65, 150, 298, 299, 400]:
+        assert index.ge(bound) == members(p for p, value in present if value >= bound)
+        assert index.gt(bound) == members(p for p, value in present if value > bound)
+        assert index.le(bound) == members(p for p, value in present if value <= bound)
+        assert index.lt(bound) == members(p for p, value in present if value < bound)
+        assert index.count_ge(bound) == index.ge(bound).bit_count()
+        assert index.count_le(bound) == index.le(bound).bit_count()
+
+
+def test_empty_range_index():
+    index = RangeIndex.build([{"value": None}], lambda firm: firm["value"])
+    assert index.ge(0) == index.le(0) == index.count_ge(0) == index.count_le(0) == 0
+
+
+def test_term_index_unions_postings():
+    firms = [{"tags": ["a", "b"]}, {"tags": ["b"]}, {"tags": []}, {"tags": ["c", "a"]}]
+    index = TermIndex.build(firms, lambda firm: firm["tags"])
+    assert positions_from_bitset(index.eq("a"), 4) == [0, 3]
+    assert positions_from_bitset(index.any_of(["b", "c"]), 4) == [0, 1, 3]
+    assert index.eq("z") == index.count("z") == 0
+    assert index.count("b") == 2
+
+
+@pytest.mark.parametrize("filters", [
+    catalog.FirmFilters(min_profit_split=85, max_evaluation_fee=500),
+    catalog.FirmFilters(platform="cTrader", instrument="Crypto", max_monthly_fee=0),
+    catalog.FirmFilters(country="CU", min_account_size=100000, news_trading=False),
+])
+def test_filter_index_estimates_are_exact(filters):
+    index = catalog.FilterIndex.build(make_firms(200, seed=2))
+    for predicate in filters.predicates():
+        assert index.estimate(*predicate) == index.predicate_bits(*predicate).bit_count()
+    expected = index.all_bits
+    for predicate in filters.predicates():
+        expected &= index.predicate_bits(*predicate)
+    assert index.resolve(filters) == expected
+    assert index.mask(expected).sum() == np.int64(expected.bit_count())
@@ -0,0 +1,107 @@
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+import catalog
+
+
+def explained(stage, index=None, returned=10, docs=10):
+    plan = {"stage": stage}
+    if index:
+        plan = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": index, "keyPattern": {}}}
+    return {
+        "queryPlanner": {"winningPlan": plan},
+        "executionStats": {"nReturned": returned, "totalKeysExamined": docs, "totalDocsExamined": docs},
+    }
+
+
+class ExplainedCollection:
+    """Answers ``explain`` commands with canned plans, chosen per find command"""
+    name = "prop_firms"
+
+    def __init__(self, answer):
+        self.database = self
+        self.answer = answer
+        self.commands = []
+
+    async def command(self, command):
+        self.commands.append(command)
+        return self.answer(command["explain"])
+
+
+def indexed(find):
+    """What a well indexed collection answers: an index scan returning what it examines"""
+    return explained("IXSCAN", "_id_" if not find["filter"] else "some_index")
+
+
+def explain(run, answer, shapes=None):
+    shapes = shapes or catalog.firm_query_shapes()
+    collection = ExplainedCollection(answer)
+    return shapes, run(catalog.explain_shapes(collection, shapes)), collection
+
+
+def test_explain_reads_the_winning_plan_and_its_statistics(run):
+    shapes, plans, collection = explain(run, lambda find: explained("IXSCAN", "sort_rating", returned=4, docs=9))
+    assert collection.commands[0]["verbosity"] == "executionStats"
+    assert all(command["explain"]["find"] == "prop_firms" for command in collection.commands)
+    plan = plans[shapes[0].name]
+    assert plan.stages == {"FETCH", "IXSCAN"} and plan.indexes == {"sort_rating"}
+    assert (plan.returned, plan.keys_examined, plan.docs_examined) == (4, 9, 9)
+
+
+def test_indexed_plans_pass(run):
+    shapes, plans, _ = explain(run, indexed)
+    assert catalog.inefficient_shapes(shapes, plans) == {}
+
+
+def test_collection_scan_fails(run):
+    def answer(find):
+        if find["filter"] == catalog.FirmFilters(platform="MetaTrader 5").to_mongo():
+            return explained("COLLSCAN")
+        return indexed(find)
+
+    shapes, plans, _ = explain(run, answer)
+    assert catalog.inefficient_shapes(shapes, plans) == {
+        "filter_platform": ["collection scan", "filter is not narrowed by any index"],
+    }
+
+
+def test_filter_served_only_by_id_index_fails(run):
+    def answer(find):
+        if find["filter"] == catalog.FirmFilters(min_rating=4.5).to_mongo():
+            return explained("IXSCAN", "_id_")
+        return indexed(find)
+
+    shapes, plans, _ = explain(run, answer)
+    assert catalog.inefficient_shapes(shapes, plans) == {"filter_min_rating": ["filter is not narrowed by any index"]}
+
+
+def test_examined_ratio_fails_above_the_threshold(run):
+    def answer(find):
+        if "fee_schedule" in find["filter"]:
+            return explained("IXSCAN", "fee_schedule", returned=2, docs=40)
+        return indexed(find)
+
+    shapes, plans, _ = explain(run, answer)
+    problems = catalog.inefficient_shapes(shapes, plans)
+    assert problems["cheapest_challenges"] == ["examined 40 documents to return 2"]
+    assert "cheapest_challenges" not in catalog.inefficient_shapes(shapes, plans, max_examined_ratio=20)
+
+
+def test_accepted_scans_pass(run):
+    shapes, plans, _ = explain(run, lambda find: explained("COLLSCAN", returned=10, docs=100))
+    problems = catalog.inefficient_shapes(shapes, plans)
+    assert "filter_country" not in problems
+    assert set(problems) == {shape.name for shape in shapes if not shape.accepted_scan}
+
+
+@pytest.mark.parametrize("answer, status", [(indexed, 0), (lambda find: explained("COLLSCAN"), 1)])
+def test_check_script_exit_status(server, run, monkeypatch, capsys, answer, status):
+    sys.path.insert(0, str(server.ROOT_DIR))
+    import check_indexes
+
+    monkeypatch.setattr(check_indexes, "db", SimpleNamespace(prop_firms=ExplainedCollection(answer)))
+    monkeypatch.setattr(check_indexes, "client", SimpleNamespace(close=lambda: None))
+    assert run(check_indexes.main(create=False, max_examined_ratio=3.0)) == status
+    assert ("collection scan" in capsys.readouterr().out) == bool(status)
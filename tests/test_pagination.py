@@ -0,0 +1,120 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import catalog
+from catalog.pagination import SortIndex
+from tests.factories import make_firms
+
+SORTS = [
+    catalog.FirmSort(name, descending)
+    for name in [None, *catalog.SORT_FIELDS]
+    for descending in (False, True)
+]
+
+FILTERS = [
+    catalog.FirmFilters(),
+    catalog.FirmFilters(platform="MetaTrader 5"),
+    catalog.FirmFilters(min_profit_split=85, max_monthly_fee=0),
+    catalog.FirmFilters(max_evaluation_fee=300, news_trading=True),
+    catalog.FirmFilters(country="US"),
+]
+
+
+def walk(fetch, sort, limit):
+    """Every id of a paginated listing, passing each cursor through its wire format like a client"""
+    ids, cursor = [], None
+    while True:
+        firms, cursor = fetch(cursor)
+        ids += [firm["id"] for firm in firms]
+        assert len(firms) <= limit
+        if cursor is None:
+            return ids
+        cursor = catalog.decode_cursor(catalog.encode_cursor(cursor), sort)
+
+
+@pytest.fixture
+def stored(db, server, run):
+    """40 firms in MongoDB and a catalog loaded from them"""
+    run(catalog.sync_firms(db.prop_firms, make_firms(40, seed=7), server.PropFirm))
+    store = catalog.CatalogStore(db.prop_firms, server.PropFirm)
+    run(store.load())
+    return store
+
+
+def expected_order(documents, sort):
+    """Reference ordering: nulls before every value, ties broken on ``_id``"""
+    def key(document):
+        value = document.get(sort.field) if sort.field else None
+        return (value is not None, value if value is not None else 0, str(document["_id"]))
+
+    return [document["id"] for document in sorted(documents, key=key, reverse=sort.descending)]
+
+
+@pytest.mark.parametrize("sort", SORTS, ids=lambda sort: sort.token)
+@pytest.mark.parametrize("filters", FILTERS, ids=lambda filters: repr(filters.active()))
+def test_catalog_and_mongo_pages_match(server, db, run, stored, sort, filters):
+    matching = run(db.prop_firms.find(filters.to_mongo()).to_list(length=None))
+    expected = expected_order(matching, sort)
+
+    def from_catalog(cursor):
+        body, next_cursor = stored.page_json(filters, sort, cursor, 7)
+        return json.loads(body), next_cursor
+
+    def from_mongo(cursor):
+        return run(server.fetch_firms_page(filters, sort, cursor, 7))
+
+    assert walk(from_catalog, sort, 7) == expected
+    assert walk(from_mongo, sort, 7) == expected
+
+    # A cursor issued by one path continues on the other (the catalog can warm up mid-listing)
+    turns = iter(range(1000))
+    assert walk(lambda cursor: (from_catalog, from_mongo)[next(turns) % 2](cursor), sort, 7) == expected
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_index_pages_follow_value_then_id_order(descending):
+    rng = np.random.default_rng(3)
+    size = 500
+    values = rng.choice([np.nan, 1.0, 2.5, 4.0, 10.0], size)
+    object_ids = [f"{value:024x}" for value in random.Random(3).sample(range(10 ** 9), size)]
+    mask = rng.random(size) < 0.7
+    index = SortIndex(values, object_ids)
+    sort = catalog.FirmSort("rating", descending)
+
+    expected = sorted(
+        (position for position in range(size) if mask[position]),
+        key=lambda position: (-np.inf if np.isnan(values[position]) else values[position], object_ids[position]),
+        reverse=descending,
+    )
+    walked, cursor = [], None
+    while True:
+        page = index.page(mask, descending, cursor, 9)
+        walked += page
+        if len(page) < 9:
+            break
+        last = page[-1]
+        value = None if np.isnan(values[last]) else float(values[last])
+        cursor = catalog.Cursor(sort, value, object_ids[last])
+    assert walked == expected
+
+
+def test_cursor_round_trip():
+    sort = catalog.FirmSort("evaluation_fee", False)
+    for value in (None, 0, 155, 4.25):
+        cursor = catalog.Cursor(sort, value, "64b000000000000000000001")
+        assert catalog.decode_cursor(catalog.encode_cursor(cursor), sort) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not-base64!", "W10", "WyJyYXRpbmc6ZGVzYyIsIngiLDFd"])
+def test_malformed_cursors_are_rejected(token):
+    with pytest.raises(ValueError):
+        catalog.decode_cursor(token, catalog.FirmSort("rating", True))
+
+
+def test_cursor_for_another_sort_is_rejected():
+    token = catalog.encode_cursor(catalog.Cursor(catalog.FirmSort("rating", True), 4.5, "64b000000000000000000001"))
+    with pytest.raises(ValueError, match="different sort"):
+        catalog.decode_cursor(token, catalog.FirmSort("rating", False))
@@ -0,0 +1,52 @@
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+AVAILABLE = ("id", "name", "rating", "profit_split", "description")
+
+
+def test_parse_fields():
+    assert catalog.parse_fields("rating, name", AVAILABLE) == ("id", "name", "rating")
+    assert catalog.parse_fields("name,,name", AVAILABLE) == ("id", "name")
+    # Selecting everything, by name or through the full preset, is no selection
+    assert catalog.parse_fields("name,rating,profit_split,description", AVAILABLE) is None
+    assert catalog.parse_fields("name,full", AVAILABLE) is None
+    assert catalog.parse_fields(None, AVAILABLE) is None and catalog.parse_fields(" ", AVAILABLE) is None
+    with pytest.raises(ValueError, match="Unknown field 'ratings'"):
+        catalog.parse_fields("name,ratings", AVAILABLE)
+
+
+def test_card_preset_only_names_firm_fields(server):
+    assert set(catalog.FIELD_PRESETS["card"]) <= set(server.PropFirm.model_fields)
+
+
+@pytest.fixture
+def stored(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(12, seed=31), server.PropFirm))
+    return run(db.prop_firms.distinct("id"))
+
+
+@pytest.mark.parametrize("fields", ["name,rating", "card", "full", "evaluation_fee,total_reviews"])
+def test_fieldsets_match_across_paths(server, run, api, stored, fields):
+    params = {"fields": fields, "sort": "evaluation_fee", "limit": 100}
+    listing = api.get("/api/firms", params=params)
+    firm = api.get(f"/api/firms/{stored[0]}", params={"fields": fields})
+    run(server.catalog_store.load())
+    assert api.get("/api/firms", params=params).content == listing.content
+    assert api.get(f"/api/firms/{stored[0]}", params={"fields": fields}).content == firm.content
+
+    selected = catalog.parse_fields(fields, list(server.PropFirm.model_fields)) or tuple(server.PropFirm.model_fields)
+    # Selected fields in model order, without the sort key the MongoDB path had to read
+    assert all(list(item) == list(selected) for item in listing.json())
+    assert list(firm.json()) == list(selected)
+
+
+@pytest.mark.parametrize("loaded", [False, True], ids=["mongo", "catalog"])
+def test_unknown_fields_are_rejected(server, run, api, stored, loaded):
+    if loaded:
+        run(server.catalog_store.load())
+    for path in ("/api/firms", f"/api/firms/{stored[0]}"):
+        response = api.get(path, params={"fields": "name,secret"})
+        assert response.status_code == 400
+        assert "Unknown field 'secret'" in response.json()["detail"]
@@ -0,0 +1,115 @@
+import json
+
+import numpy as np
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+WEIGHTS = ["", "rating:1", "split:3,fee:2,rating:1", "reviews:1,drawdown:0.5"]
+
+
+def walk(page, sort, limit):
+    """Every position of a ranked listing, passing each cursor through its wire format"""
+    positions, cursor = [], None
+    while True:
+        found, cursor = page(cursor)
+        positions += found
+        assert len(found) <= limit
+        if cursor is None:
+            return positions
+        cursor = catalog.decode_cursor(catalog.encode_cursor(cursor), sort)
+
+
+@pytest.fixture(scope="module")
+def catalog_sorts(server):
+    firms = [server.PropFirm(**firm).dict() for firm in make_firms(300, seed=4)]
+    object_ids = [f"{position:024x}" for position in np.random.default_rng(4).permutation(10 ** 6)[:300]]
+    return catalog.SortIndexes(catalog.ColumnStore.build(firms), object_ids)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("weights", WEIGHTS)
+def test_score_pages_follow_score_then_id_order(catalog_sorts, weights, descending):
+    sort = catalog.FirmSort(catalog.SCORE_SORT, descending, catalog.RankWeights.parse(weights))
+    scores = catalog_sorts.ranking.scores(sort.weights)
+    object_ids = np.array(catalog_sorts.object_ids)
+    mask = np.random.default_rng(8).random(len(scores)) < 0.6
+
+    expected = np.lexsort((object_ids, scores))
+    if descending:
+        expected = expected[::-1]
+    expected = [position for position in expected.tolist() if mask[position]]
+
+    def page(cursor):
+        positions = catalog_sorts.page(mask, sort, cursor, 11)
+        if len(positions) < 11:
+            return positions, None
+        return positions, catalog_sorts.cursor_after(positions[-1], sort)
+
+    assert walk(page, sort, 11) == expected
+
+
+def test_catalog_and_mongo_rankings_match(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(40, seed=9), server.PropFirm))
+    store = catalog.CatalogStore(db.prop_firms, server.PropFirm)
+    run(store.load())
+    sort = catalog.FirmSort.parse(catalog.SCORE_SORT, None, "split:3,fee:2,rating:1")
+    filters = catalog.FirmFilters(max_monthly_fee=0)
+
+    def from_catalog(cursor):
+        body, next_cursor = store.page_json(filters, sort, cursor, 6)
+        return [firm["id"] for firm in json.loads(body)], next_cursor
+
+    def from_mongo(cursor):
+        firms, next_cursor = run(server.fetch_firms_page(filters, sort, cursor, 6))
+        return [firm["id"] for firm in firms], next_cursor
+
+    ranked = walk(from_catalog, sort, 6)
+    assert len(ranked) == run(db.prop_firms.count_documents(filters.to_mongo()))
+    assert walk(from_mongo, sort, 6) == ranked
+
+
+@pytest.mark.parametrize("value", ["speed:1", "fee:-1", "fee:x", "fee:0,split:0", "fee:nan"])
+def test_invalid_weights_are_rejected(value):
+    with pytest.raises(ValueError):
+        catalog.RankWeights.parse(value)
+
+
+def test_weights_canonical_token():
+    assert catalog.RankWeights.parse(" split:3 , fee:2").token == "split=3,fee=2"
+    assert catalog.FirmSort.parse("score", None, "fee:2,split:3").token == "score(split=3,fee=2):desc"
+
+
+def test_score_cursor_needs_a_score():
+    sort = catalog.FirmSort.parse("score", None, "rating:1")
+    token = catalog.encode_cursor(catalog.Cursor(sort, None, "64b000000000000000000001"))
+    with pytest.raises(ValueError):
+        catalog.decode_cursor(token, sort)
+
+
+def test_invalid_documents_are_skipped_by_both_paths(server, db, run, api):
+    firms = make_firms(8, seed=10)
+    run(catalog.sync_firms(db.prop_firms, firms[1:], server.PropFirm))
+    run(db.prop_firms.insert_one({**firms[0], "id": "broken", "evaluation_fee": {"10k": 99}}))
+    firm_id = run(db.prop_firms.find_one({"id": {"$ne": "broken"}}))["id"]
+    requests = [
+        ("get", "/api/firms", {"params": {"sort": "score", "weights": "split:2,fee:1"}}),
+        ("get", f"/api/firms/{firm_id}/similar", {"params": {"limit": 10}}),
+        ("get", "/api/calculator/funding-cost", {}),
+        ("post", "/api/firms/compare/matrix", {"json": {"firm_ids": [firm_id, "broken"]}}),
+        ("post", "/api/firms/compare", {"json": {"firm_ids": ["broken", firm_id]}}),
+    ]
+
+    def responses():
+        return [getattr(api, method)(path, **options) for method, path, options in requests]
+
+    from_mongo = responses()
+    run(server.catalog_store.load())
+    from_catalog = responses()
+
+    for mongo, cached in zip(from_mongo, from_catalog):
+        assert mongo.status_code == cached.status_code == 200
+        assert mongo.json() == cached.json()
+    assert "broken" not in [firm["id"] for firm in from_mongo[0].json()]
+    assert from_mongo[3].json()["missing_ids"] == from_mongo[4].json()["missing_ids"] == ["broken"]
@@ -0,0 +1,98 @@
+import catalog
+from tests.conftest import ADMIN_TOKEN
+from tests.factories import make_firms
+
+
+def store_firm(server, db, run, **values):
+    firm = {**make_firms(1, seed=12)[0], **values}
+    run(catalog.sync_firms(db.prop_firms, [firm], server.PropFirm))
+    return run(db.prop_firms.find_one({"name": firm["name"]}))["id"]
+
+
+def post(api, firm_id, rating, author="Ana"):
+    response = api.post(f"/api/firms/{firm_id}/reviews", json={"rating": rating, "author_name": author})
+    assert response.status_code == 201
+    return response.json()
+
+
+def delete(api, review_id):
+    return api.delete(f"/api/admin/reviews/{review_id}", headers={"X-Admin-Token": ADMIN_TOKEN})
+
+
+def summary(api, firm_id):
+    return api.get(f"/api/firms/{firm_id}/reviews").json()["summary"]
+
+
+def test_review_is_blended_with_the_baseline(server, db, run, api):
+    firm_id = store_firm(server, db, run, rating=4.0, total_reviews=100)
+
+    created = post(api, firm_id, 5)
+    post(api, firm_id, 2)
+
+    assert created["summary"]["rating"] == round((4.0 * 100 + 5) / 101, 2)
+    assert summary(api, firm_id) == {
+        "firm_id": firm_id,
+        "rating": round((4.0 * 100 + 5 + 2) / 102, 2),
+        "total_reviews": 102,
+        "user_reviews": 2,
+        "user_average": 3.5,
+        "histogram": {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1},
+    }
+    firm = run(db.prop_firms.find_one({"id": firm_id}))
+    assert (firm["rating"], firm["total_reviews"]) == (3.99, 102)
+
+
+def test_delete_restores_the_previous_rating(server, db, run, api):
+    for baseline_reviews in (100, 0):
+        firm_id = store_firm(server, db, run, name=f"Firm {baseline_reviews}", rating=4.5, total_reviews=baseline_reviews)
+        before = summary(api, firm_id)
+
+        kept = post(api, firm_id, 4)["review"]["id"]
+        removed = post(api, firm_id, 1)["review"]["id"]
+        assert delete(api, removed).json() == {"deleted": removed, "firm_id": firm_id}
+        assert delete(api, kept).status_code == 200
+
+        assert summary(api, firm_id) == before
+        assert delete(api, removed).status_code == 404
+
+
+def test_review_endpoints_reject_unknown_firms_and_tokens(server, db, run, api):
+    firm_id = store_firm(server, db, run)
+    response = api.post("/api/firms/missing/reviews", json={"rating": 5, "author_name": "Ana"})
+    assert response.status_code == 404
+    assert run(db.reviews.count_documents({})) == 0
+    assert api.get("/api/firms/missing/reviews").status_code == 404
+
+    review_id = post(api, firm_id, 3)["review"]["id"]
+    assert api.delete(f"/api/admin/reviews/{review_id}", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert api.post(f"/api/firms/{firm_id}/reviews", json={"rating": 6, "author_name": "Ana"}).status_code == 422
+
+
+def test_reviews_are_paged_newest_first(server, db, run, api):
+    firm_id = store_firm(server, db, run)
+    posted = [post(api, firm_id, rating, author=f"Author {rating}")["review"]["id"] for rating in (1, 2, 3, 4, 5)]
+
+    pages, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = api.get(f"/api/firms/{firm_id}/reviews", params=params).json()
+        pages.append([review["id"] for review in page["reviews"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [posted[4:2:-1], posted[2:0:-1], posted[:1]]
+    assert api.get(f"/api/firms/{firm_id}/reviews", params={"cursor": "nope"}).status_code == 400
+
+
+def test_baseline_change_republishes_the_rating(server, db, run, api):
+    firm = {**make_firms(1, seed=13)[0], "rating": 4.0, "total_reviews": 100}
+    run(catalog.sync_firms(db.prop_firms, [firm], server.PropFirm))
+    firm_id = run(db.prop_firms.find_one({}))["id"]
+    post(api, firm_id, 5)
+
+    report = run(catalog.sync_firms(db.prop_firms, [{**firm, "rating": 3.0, "total_reviews": 50}], server.PropFirm))
+
+    assert report.updated == 1
+    stored = summary(api, firm_id)
+    assert (stored["rating"], stored["total_reviews"], stored["user_reviews"]) == (round((3.0 * 50 + 5) / 51, 2), 51, 1)
@@ -0,0 +1,88 @@
+import pytest
+
+from catalog.search import FuzzySearchIndex, SuggestionIndex
+
+
+def firm(name, description="Empresa de fondeo", total_reviews=0, rating=4.0):
+    return {"name": name, "description": description, "total_reviews": total_reviews, "rating": rating}
+
+
+def test_suggestions_rank_by_tier_then_popularity():
+    firms = [
+        firm("Zeta Capital", "Reembolso con refund del primer pago", total_reviews=900),
+        firm("TopFundX", total_reviews=800),
+        firm("Alpha Funding", total_reviews=700),
+        firm("Funded Trader", total_reviews=10),
+        firm("Funding Pips", total_reviews=20),
+        firm("Beta Markets", total_reviews=1000),
+    ]
+    index = SuggestionIndex(firms)
+
+    names = [firms[position]["name"] for position in index.suggest("fund", limit=10)]
+    # Full name prefix, name word prefix, name substring, description substring
+    assert names == ["Funding Pips", "Funded Trader", "Alpha Funding", "TopFundX", "Zeta Capital"]
+    assert [firms[position]["name"] for position in index.suggest("fund", limit=2)] == names[:2]
+    assert index.suggest("  ") == [] and index.suggest("xyz") == []
+
+
+def test_suggestions_fold_case_and_accents():
+    firms = [firm("Über Funded"), firm("Fondeo México", "Cuentas en pesos")]
+    index = SuggestionIndex(firms)
+
+    assert index.suggest("UBER") == [0]
+    assert index.suggest("mexico") == [1]
+    assert index.suggest("PESOS") == [1]
+
+
+def document(name, description="Empresa de fondeo", platforms=("MetaTrader 4",), headquarters="Londres, Reino Unido",
+             pros=("Pagos semanales",), cons=("Reglas estrictas",)):
+    return {"name": name, "description": description, "trading_platforms": list(platforms),
+            "headquarters": headquarters, "pros": list(pros), "cons": list(cons)}
+
+
+@pytest.fixture
+def fuzzy():
+    firms = [
+        document("FTMO", headquarters="Praga, República Checa", platforms=("MetaTrader 5", "cTrader")),
+        document("TopStepTrader", description="Futuros con evaluación en dos fases", platforms=("TradingView",)),
+        document("The Funded Trader", description="Cuentas en cTrader y MetaTrader"),
+        document("Blue Guardian", description="Reglas parecidas a FTMO"),
+        document("Apex Trader Funding", headquarters="Austin, Texas"),
+    ]
+    return firms, FuzzySearchIndex(firms)
+
+
+def names(fuzzy, query):
+    firms, index = fuzzy
+    return [firms[position]["name"] for position, _ in index.search(query)]
+
+
+def test_bm25_ranks_field_weighted_hits_first(fuzzy):
+    firms, index = fuzzy
+    hits = index.search("ftmo")
+    # The name outweighs the same word in a description
+    assert [firms[position]["name"] for position, _ in hits] == ["FTMO", "Blue Guardian"]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.search("") == [] and index.search("zzzzzz") == []
+
+
+def test_typos_prefixes_and_accents_match(fuzzy):
+    assert names(fuzzy, "republica checa")[0] == "FTMO"
+    assert names(fuzzy, "REPÚBLICA")[0] == "FTMO"
+    assert names(fuzzy, "guardain")[0] == "Blue Guardian"
+    assert names(fuzzy, "gardian")[0] == "Blue Guardian"
+    assert names(fuzzy, "tradingviw") == ["TopStepTrader"]
+    assert names(fuzzy, "evalua") == ["TopStepTrader"]
+    # CamelCase names match by their parts
+    assert names(fuzzy, "top step")[0] == "TopStepTrader"
+    # Three letters leave no room for a typo
+    assert names(fuzzy, "ftx") == []
+
+
+def test_exact_terms_outrank_typo_matches(fuzzy):
+    firms, index = fuzzy
+    exact = dict(index.search("funded"))
+    typo = dict(index.search("fundet"))
+    funded = next(position for position, firm in enumerate(firms) if firm["name"] == "The Funded Trader")
+    assert next(iter(exact)) == funded
+    assert 0 < typo[funded] < exact[funded]
@@ -0,0 +1,25 @@
+import catalog
+from tests.factories import make_firms
+
+
+def test_sync_is_idempotent(server, db, run):
+    firms = make_firms(5, seed=1)
+    run(catalog.ensure_indexes(db.prop_firms))
+    first = run(catalog.sync_firms(db.prop_firms, firms, server.PropFirm))
+    again = run(catalog.sync_firms(db.prop_firms, firms, server.PropFirm))
+    assert (first.inserted, again.inserted, again.updated, again.unchanged) == (5, 0, 0, 5)
+    assert not again.changed
+
+
+def test_names_differing_in_case_are_separate_firms(server, db, run):
+    firm = make_firms(1, seed=1)[0]
+    run(catalog.ensure_indexes(db.prop_firms))
+    run(catalog.sync_firms(db.prop_firms, [{**firm, "name": "Acme Funding"}], server.PropFirm))
+    report = run(catalog.sync_firms(
+        db.prop_firms, [{**firm, "name": "Acme Funding"}, {**firm, "name": "ACME FUNDING "}], server.PropFirm))
+
+    assert (report.inserted, report.unchanged) == (1, 1)
+    stored = run(db.prop_firms.find({}, {"_id": 0, "name": 1, "id": 1}).to_list(length=None))
+    assert len({document["id"] for document in stored}) == 2
+    assert {document["id"] for document in stored} == {
+        catalog.stable_firm_id("Acme Funding"), catalog.stable_firm_id("ACME FUNDING ")}
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+
+@pytest.fixture(scope="module")
+def firms(server):
+    firms = [server.PropFirm(**firm).dict() for firm in make_firms(40, seed=29)]
+    # A second listing of firm 0 under another name: identical features
+    return firms + [{**firms[0], "id": "clone", "name": "Clone"}]
+
+
+def test_a_firm_is_never_similar_to_itself(firms):
+    index = catalog.SimilarityIndex.build(firms)
+    for position in range(len(firms)):
+        found = [other for other, _ in index.similar(position, limit=len(firms))]
+        assert position not in found
+        assert sorted(found) == [other for other in range(len(firms)) if other != position]
+
+    # The identical clone is the best match, not the firm itself
+    best, score = index.similar(0, limit=1)[0]
+    assert best == len(firms) - 1 and score == pytest.approx(1.0)
+    only_itself = np.zeros(len(firms), dtype=bool)
+    only_itself[3] = True
+    assert index.similar(3, members=only_itself) == []
+
+
+def test_similar_firms_are_ranked_by_cosine_similarity(firms):
+    index = catalog.SimilarityIndex.build(firms)
+    scores = index.matrix @ index.matrix[5]
+    expected = sorted((other for other in range(len(firms)) if other != 5), key=lambda other: (-scores[other], other))
+    assert [other for other, _ in index.similar(5, limit=8)] == expected[:8]
+
+
+@pytest.mark.parametrize("params", [{}, {"platform": "cTrader", "limit": 10}], ids=repr)
+def test_similar_endpoint_excludes_the_firm_on_both_paths(server, db, run, api, params):
+    run(catalog.sync_firms(db.prop_firms, make_firms(30, seed=29), server.PropFirm))
+    firm_id = run(db.prop_firms.find_one({"trading_platforms": "cTrader"}))["id"]
+    from_mongo = api.get(f"/api/firms/{firm_id}/similar", params=params)
+    run(server.catalog_store.load())
+    from_catalog = api.get(f"/api/firms/{firm_id}/similar", params=params)
+
+    assert from_mongo.status_code == from_catalog.status_code == 200
+    assert from_mongo.json() == from_catalog.json()
+    results = from_catalog.json()["results"]
+    assert results and all(result["firm"]["id"] != firm_id for result in results)
+    if "platform" in params:
+        assert all("cTrader" in result["firm"]["trading_platforms"] for result in results)
+    assert api.get("/api/firms/unknown/similar").status_code == 404
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+
+import catalog
+
+RULES = {
+    "profit_target": [10, 8, 10, 6],
+    "max_drawdown": [10, 8, 10, 12],
+    "daily_drawdown": [5, 4, 5, 3],
+    "min_trading_days": [4, 0, 4, 3],
+    "max_trading_days": [0, 30, 0, 60],
+}
+MODEL = catalog.ReturnModel(mean=0.2, volatility=1.5)
+
+
+def simulate(**options):
+    return catalog.simulate_challenges(RULES, MODEL, paths=3000, seed=1, horizon=60, **options)
+
+
+def test_chunking_does_not_change_the_results():
+    assert simulate(chunk_cells=5000) == simulate()
+
+
+def test_identical_rules_share_results():
+    results = simulate()
+    for values in results.values():
+        assert values[0] == values[2]
+    for name in ("pass_probability", "drawdown_breach_probability", "daily_breach_probability", "timeout_probability"):
+        assert all(0 <= value <= 1 for value in results[name])
+    outcomes = zip(*(results[name] for name in (
+        "pass_probability", "drawdown_breach_probability", "daily_breach_probability", "timeout_probability")))
+    assert all(sum(values) == pytest.approx(1) for values in outcomes)
+
+
+def test_past_deadline_raises():
+    with pytest.raises(TimeoutError):
+        simulate(deadline=time.time() - 1)
@@ -0,0 +1,78 @@
+from collections import Counter
+
+import catalog
+from catalog.stats import DEFAULT_HIGHEST_PAYOUT
+from tests.factories import make_firms
+
+
+def from_scratch(firms):
+    statistics = catalog.StatisticsAccumulator()
+    for firm in firms:
+        statistics.add(firm)
+    return statistics
+
+
+def test_incremental_statistics_match_a_rebuild(server, db, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(30, seed=15), server.PropFirm))
+    store = catalog.CatalogStore(db.prop_firms, server.PropFirm)
+    run(store.load())
+    documents = run(db.prop_firms.find({}).sort("_id", 1).to_list(length=None))
+
+    cheapest = min(documents, key=lambda document: document["lowest_evaluation_fee"] or float("inf"))
+    added = [
+        {**server.PropFirm(**{**firm, "name": f"Added {index}"}).dict(), "_id": f"ffff{index:020d}"}
+        for index, firm in enumerate(make_firms(3, seed=16))
+    ]
+    changes = [
+        # The cheapest firm gets more expensive, another one switches platforms
+        {**cheapest, "evaluation_fee": {size: fee * 10 for size, fee in cheapest["evaluation_fee"].items()}},
+        {**documents[1], "trading_platforms": ["cTrader"], "rating": 1.0, "maximum_payout": 250000},
+        *added,
+    ]
+    removed = [str(documents[2]["_id"]), str(documents[3]["_id"])]
+    run(store.apply_changes(changes, removed))
+
+    firms = store.snapshot.firms
+    assert len(firms) == 30 + 3 - 2
+    assert store.statistics.snapshot() == from_scratch(firms).snapshot()
+    assert store.statistics.platforms == Counter(platform for firm in firms for platform in firm["trading_platforms"])
+
+    expected = store.statistics.snapshot()
+    fees = [fee for firm in firms for fee in firm["evaluation_fee"].values()]
+    splits = [firm["profit_split"][0] for firm in firms if firm["profit_split"]]
+    assert expected["lowest_evaluation_fee"] == min(fees)
+    assert expected["highest_payout"] == 250000
+    assert expected["avg_profit_split"] == round(sum(splits) / len(splits), 1)
+    assert expected["avg_rating"] == round(sum(firm["rating"] for firm in firms) / len(firms), 1)
+
+
+def test_removing_extremes_falls_back_to_the_next_value():
+    firms = [
+        {"profit_split": [80, 20], "rating": 4.0, "trading_platforms": ["cTrader", "MetaTrader 4"],
+         "evaluation_fee": {"10000": 50}, "maximum_payout": 9000},
+        {"profit_split": [], "rating": 3.0, "trading_platforms": ["MetaTrader 4"],
+         "evaluation_fee": {"10000": 90, "50000": 300}, "maximum_payout": None},
+        {"profit_split": [90, 10], "rating": 5.0, "trading_platforms": ["cTrader"],
+         "evaluation_fee": {"10000": 50}, "maximum_payout": 12000},
+    ]
+    statistics = from_scratch(firms)
+    assert statistics.snapshot()["lowest_evaluation_fee"] == 50
+    assert statistics.snapshot()["most_popular_platform"] == "MetaTrader 4"
+
+    statistics.remove(firms[0])
+    # One firm still charges 50
+    assert statistics.snapshot()["lowest_evaluation_fee"] == 50
+    assert statistics.snapshot()["most_popular_platform"] == "MetaTrader 4"
+    statistics.replace(firms[2], {**firms[2], "evaluation_fee": {"10000": 120}, "maximum_payout": None})
+    assert statistics.snapshot() == {
+        "total_firms": 2,
+        "avg_profit_split": 90,
+        "avg_rating": 4.0,
+        "most_popular_platform": "MetaTrader 4",
+        "lowest_evaluation_fee": 90,
+        "highest_payout": DEFAULT_HIGHEST_PAYOUT,
+    }
+
+    for firm in (firms[1], {**firms[2], "evaluation_fee": {"10000": 120}, "maximum_payout": None}):
+        statistics.remove(firm)
+    assert statistics.snapshot()["total_firms"] == 0 and not statistics.fees and not statistics.platforms
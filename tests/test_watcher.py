@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import catalog
+from tests.factories import make_firms
+
+
+@pytest.fixture
+def stored(db, server, run):
+    run(catalog.sync_firms(db.prop_firms, make_firms(12, seed=5), server.PropFirm))
+    return catalog.CatalogStore(db.prop_firms, server.PropFirm)
+
+
+def documents(db, run):
+    return run(db.prop_firms.find({}).sort("_id", 1).to_list(length=None))
+
+
+def test_load_skips_unusable_documents(db, run, stored):
+    first, second = documents(db, run)[:2]
+    run(db.prop_firms.update_one({"_id": first["_id"]}, {"$set": {"evaluation_fee": {"10k": 99}}}))
+    run(db.prop_firms.update_one({"_id": second["_id"]}, {"$unset": {"name": ""}}))
+    run(stored.load())
+    assert len(stored.snapshot.firms) == 10
+    assert stored.get(first["id"]) is None and stored.get(second["id"]) is None
+
+
+def test_apply_changes_patches_only_what_changed(db, run, stored):
+    run(stored.load())
+    version = stored.version
+    current = documents(db, run)
+
+    assert not run(stored.apply_changes(current[:3]))
+    assert stored.version == version
+
+    changed = {**current[0], "rating": 1.5}
+    invalid = {**current[1], "evaluation_fee": {"abc": 100}}
+    assert run(stored.apply_changes([changed, invalid], [str(current[2]["_id"])]))
+    assert stored.version == version + 1
+    assert stored.get(current[0]["id"])["rating"] == 1.5
+    assert stored.get(current[1]["id"]) is None and stored.get(current[2]["id"]) is None
+    assert stored.snapshot.sorts.object_ids == [str(document["_id"]) for document in current[:1] + current[3:]]
+
+    # Removing what is already gone publishes nothing
+    assert not run(stored.apply_changes([], [str(current[2]["_id"])]))
+
+
+def test_change_events_are_applied_in_one_batch(db, run, stored):
+    watcher = catalog.CatalogWatcher(stored, db.prop_firms, mode="change_stream")
+    first, second, third = documents(db, run)[:3]
+
+    async def scenario():
+        await stored.load()
+        version = stored.version
+        assert await watcher._apply_events([
+            {"operationType": "update", "documentKey": {"_id": first["_id"]}, "fullDocument": {**first, "rating": 2.0}},
+            {"operationType": "delete", "documentKey": {"_id": second["_id"]}},
+            # Deleted before the update lookup ran
+            {"operationType": "update", "documentKey": {"_id": third["_id"]}, "fullDocument": None},
+            {"operationType": "delete", "documentKey": {"_id": first["_id"]}},
+            {"operationType": "insert", "documentKey": {"_id": first["_id"]}, "fullDocument": {**first, "rating": 2.5}},
+        ])
+        assert stored.version == version + 1
+        assert stored.get(first["id"])["rating"] == 2.5
+        assert stored.get(second["id"]) is None and stored.get(third["id"]) is None
+        assert not await watcher._apply_events([{"operationType": "drop"}])
+
+    run(scenario())
+
+
+def test_polling_picks_up_writes(server, db, run, stored):
+    watcher = catalog.CatalogWatcher(stored, db.prop_firms, poll_interval=0.02)
+    first, second = documents(db, run)[:2]
+    added = server.PropFirm(**make_firms(13, seed=6)[-1]).dict()
+
+    async def settle(condition):
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.02)
+        raise AssertionError("the catalog did not pick up the change")
+
+    async def scenario():
+        # No change streams without a replica set: "auto" falls back to polling
+        await watcher.start()
+        try:
+            assert watcher.active == "poll"
+            loaded = stored.version
+
+            await db.prop_firms.update_one(
+                {"_id": first["_id"]}, {"$set": {"rating": 1.0, "updated_at": datetime.utcnow()}})
+            await settle(lambda: stored.get(first["id"])["rating"] == 1.0)
+
+            await db.prop_firms.insert_one({**added, "updated_at": datetime.utcnow()})
+            await settle(lambda: stored.get(added["id"]) is not None)
+
+            await db.prop_firms.delete_one({"_id": second["_id"]})
+            await settle(lambda: stored.get(second["id"]) is None)
+            assert stored.version == loaded + 3
+        finally:
+            await watcher.stop()
+
+    run(scenario())
+
+
+def test_unknown_watch_mode_is_rejected(db, stored):
+    with pytest.raises(ValueError):
+        catalog.CatalogWatcher(stored, db.prop_firms, mode="tail")
+
+
+def test_polling_picks_up_backdated_writes(db, run, stored):
+    watcher = catalog.CatalogWatcher(stored, db.prop_firms, poll_interval=0.02)
+    first = documents(db, run)[0]
+
+    async def scenario():
+        await watcher.start()
+        try:
+            # Written by a worker whose clock runs an hour behind the newest stamp
+            stamp = first["updated_at"] - timedelta(hours=1)
+            await db.prop_firms.update_one({"_id": first["_id"]}, {"$set": {"rating": 1.0, "updated_at": stamp}})
+            for _ in range(100):
+                if stored.get(first["id"])["rating"] == 1.0:
+                    return
+                await asyncio.sleep(0.02)
+            raise AssertionError("the catalog did not pick up the backdated write")
+        finally:
+            await watcher.stop()
+
+    run(scenario())
+
+
+class FakeStream:
+    def __init__(self, events):
+        self.events = list(events)
+        self.resume_token = {"_data": "token"}
+
+    async def try_next(self):
+        if self.events:
+            return self.events.pop(0)
+        # Like max_await_time_ms on an idle stream
+        await asyncio.sleep(0.01)
+        return None
+
+    async def close(self):
+        pass
+
+
+def test_events_are_retried_when_applying_them_fails(db, run, stored, monkeypatch):
+    watcher = catalog.CatalogWatcher(stored, db.prop_firms, mode="change_stream", batch_delay=0.01)
+    first = documents(db, run)[0]
+    event = {"operationType": "update", "documentKey": {"_id": first["_id"]}, "fullDocument": {**first, "rating": 1.0}}
+    apply_changes = stored.apply_changes
+    failures = []
+
+    async def flaky_apply_changes(*args):
+        if not failures:
+            failures.append(args)
+            raise RuntimeError("catalog rebuild failed")
+        return await apply_changes(*args)
+
+    async def open_stream(token):
+        # Resumes after the failed batch: nothing new arrives
+        assert token is not None
+        return FakeStream([])
+
+    async def scenario():
+        await stored.load()
+        monkeypatch.setattr(stored, "apply_changes", flaky_apply_changes)
+        monkeypatch.setattr(watcher, "_open_stream", open_stream)
+        watcher._stream = FakeStream([event])
+        task = asyncio.ensure_future(watcher._follow())
+        try:
+            for _ in range(300):
+                if stored.get(first["id"])["rating"] == 1.0:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            task.cancel()
+        assert failures and stored.get(first["id"])["rating"] == 1.0
+
+    run(scenario())